@@ -0,0 +1,70 @@
+"""
+Seller dashboard summary: product, stock and sales figures for one seller,
+computed in a single aggregate query and cached per seller. Sales figures
+come from the daily rollups (reports.models), not from the order lines.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from cart.models import MONEY_FIELD
+from ecommerce_backend.routers import use_primary
+from products.cache import CatalogCache
+from reports.models import SellerDailySales
+from .models import User
+
+summary_cache = CatalogCache('seller_summary')
+
+
+def get_summary_queryset(seller_id):
+    threshold = settings.SELLER_LOW_STOCK_THRESHOLD
+    sold = SellerDailySales.objects.filter(seller=OuterRef('pk')).order_by().values('seller')
+
+    def sold_total(field, output_field=None):
+        return Subquery(sold.annotate(total=Sum(field)).values('total'), output_field=output_field)
+
+    return User.objects.filter(pk=seller_id).values('pk').annotate(
+        product_count=Count('products'),
+        total_stock=Coalesce(Sum('products__stock'), 0),
+        low_stock_count=Count('products', filter=Q(products__stock__gt=0, products__stock__lte=threshold)),
+        out_of_stock_count=Count('products', filter=Q(products__stock=0)),
+        units_sold=Coalesce(sold_total('units_sold'), 0),
+        order_count=Coalesce(sold_total('order_count'), 0),
+        revenue=Coalesce(
+            sold_total('revenue', MONEY_FIELD),
+            Value(Decimal('0.00')),
+            output_field=MONEY_FIELD,
+        ),
+    )
+
+
+def compute_summary(seller_id):
+    summary = get_summary_queryset(seller_id).get()
+    del summary['pk']
+    return summary
+
+
+def get_summary(seller_id):
+    """
+    Returns the seller's summary from the cache, computing it on a miss.
+    """
+    summary = summary_cache.get_object(seller_id)
+    if summary is None:
+        # From the primary, as a stale replica read would stay cached
+        with use_primary():
+            summary = compute_summary(seller_id)
+        summary_cache.set_object(seller_id, summary)
+    return summary
+
+
+def invalidate_summaries(seller_ids):
+    """
+    Drops the cached summaries of the given sellers once the current
+    transaction commits (immediately outside a transaction).
+    """
+    seller_ids = {seller_id for seller_id in seller_ids if seller_id is not None}
+    if seller_ids:
+        transaction.on_commit(lambda: summary_cache.delete_objects(seller_ids))
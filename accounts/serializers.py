@@ -20,6 +20,16 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'role', 'seller_profile']
 
 
+class SellerSummarySerializer(serializers.Serializer):
+    product_count = serializers.IntegerField()
+    total_stock = serializers.IntegerField()
+    low_stock_count = serializers.IntegerField()
+    out_of_stock_count = serializers.IntegerField()
+    units_sold = serializers.IntegerField()
+    order_count = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
 class CustomJWTLoginSerializer(LoginSerializer):
     access = serializers.CharField(read_only=True)
     refresh = serializers.CharField(read_only=True)
@@ -0,0 +1,24 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from orders.models import Order
+from products.models import Product
+from .dashboard import invalidate_summaries
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_seller_summary(sender, instance, **kwargs):
+    invalidate_summaries([instance.seller_id])
+
+
+@receiver(post_save, sender=Order)
+@receiver(pre_delete, sender=Order)
+def invalidate_summaries_of_order(sender, instance, created=False, **kwargs):
+    # Status changes (e.g. cancellation) move the sellers' sales figures. Runs
+    # before delete because the order's items are gone afterwards. A new order
+    # has no items yet; checkout invalidates once they are added.
+    if created:
+        return
+    invalidate_summaries(
+        Product.objects.filter(order_items__order=instance).values_list('seller_id', flat=True)
+    )
@@ -1,3 +1,141 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from accounts.dashboard import compute_summary
+from cart.models import Cart, CartItem
+from orders.models import Order, OrderItem
+from reports.rollups import record_order
+from products.models import Product, Category
+from django.contrib.auth import get_user_model
+User = get_user_model()
+
+
+@pytest.fixture
+def seller(db):
+    return User.objects.create_user(username='seller', password='Sellerpassword123', role='SELLER')
+
+
+@pytest.fixture
+def seller_headers(seller):
+    return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(seller)}'}
+
+
+@pytest.fixture
+def buyer(db):
+    return User.objects.create_user(username='buyer', password='Buyerpassword123')
+
+
+@pytest.fixture
+def catalog(seller):
+    category = Category.objects.create(name='Books')
+    other = User.objects.create_user(username='other', password='Otherpassword123', role='SELLER')
+    products = [
+        Product.objects.create(name='Atlas', price=10, stock=0, category=category, seller=seller),
+        Product.objects.create(name='Bible', price=20, stock=3, category=category, seller=seller),
+        Product.objects.create(name='Cookbook', price=30, stock=50, category=category, seller=seller),
+    ]
+    # Another seller's product and sales never show up in the summary
+    Product.objects.create(name='Dictionary', price=99, stock=1, category=category, seller=other)
+    return products
+
+
+def place_order(user, lines, status='Pending'):
+    order = Order.objects.create(user=user, status=status, total_amount=0)
+    for product, quantity in lines:
+        OrderItem.objects.create(
+            order=order, product=product, product_name=product.name,
+            product_price=product.price, quantity=quantity
+        )
+    # Checkout adds every new order to the sales rollups
+    record_order(order)
+    return order
+
+
+def test_summary_figures(seller, buyer, catalog):
+    atlas, bible, cookbook = catalog
+    place_order(buyer, [(atlas, 2), (bible, 1)])
+    place_order(buyer, [(cookbook, 1)])
+    place_order(buyer, [(cookbook, 10)], status='Cancelled')
+
+    assert compute_summary(seller.pk) == {
+        'product_count': 3,
+        'total_stock': 53,
+        'low_stock_count': 1,
+        'out_of_stock_count': 1,
+        'units_sold': 4,
+        'order_count': 2,
+        'revenue': Decimal('70.00'),
+    }
+
+
+def test_summary_is_a_single_query(seller, catalog):
+    with CaptureQueriesContext(connection) as context:
+        compute_summary(seller.pk)
+    assert len(context) == 1
+
+
+def test_summary_of_seller_without_products(seller):
+    summary = compute_summary(seller.pk)
+    assert summary['product_count'] == 0
+    assert summary['revenue'] == Decimal('0.00')
+
+
+@override_settings(SELLER_LOW_STOCK_THRESHOLD=2)
+def test_dashboard_response(client, seller_headers, catalog):
+    response = client.get('/seller/dashboard/', **seller_headers)
+    assert response.status_code == status.HTTP_200_OK
+
+    data = response.json()
+    assert data['profile']['username'] == 'seller'
+    assert 'products' not in data
+    assert data['stats']['product_count'] == 3
+    assert data['stats']['low_stock_count'] == 0
+    assert data['stats']['revenue'] == '0.00'
+    assert data['products_url'].endswith('/seller/dashboard/products/')
+
+
+def test_dashboard_requires_seller(client, buyer):
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(buyer)}'}
+    assert client.get('/seller/dashboard/', **headers).status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_summary_is_cached_until_products_change(client, seller, seller_headers, catalog, django_capture_on_commit_callbacks):
+    client.get('/seller/dashboard/', **seller_headers)
+    with CaptureQueriesContext(connection) as context:
+        cached = client.get('/seller/dashboard/', **seller_headers).json()
+    assert cached['stats']['product_count'] == 3
+    assert not any('COUNT(' in query['sql'] for query in context.captured_queries)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Product.objects.create(name='Encyclopedia', price=5, stock=1, seller=seller)
+    assert client.get('/seller/dashboard/', **seller_headers).json()['stats']['product_count'] == 4
+
+
+def test_checkout_refreshes_sales_figures(client, seller_headers, buyer, catalog, django_capture_on_commit_callbacks):
+    assert client.get('/seller/dashboard/', **seller_headers).json()['stats']['units_sold'] == 0
+
+    cart = Cart.objects.create(user=buyer)
+    CartItem.objects.create(cart=cart, product=catalog[2], quantity=2)
+    buyer_headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(buyer)}'}
+    with django_capture_on_commit_callbacks(execute=True):
+        assert client.post('/api/orders/', **buyer_headers).status_code == status.HTTP_201_CREATED
+
+    stats = client.get('/seller/dashboard/', **seller_headers).json()['stats']
+    assert stats['units_sold'] == 2
+    assert stats['revenue'] == '60.00'
+    assert stats['total_stock'] == 51
+
+
+@override_settings(PRODUCT_PAGE_SIZE=2)
+def test_dashboard_products_are_paginated(client, seller_headers, catalog):
+    first = client.get('/seller/dashboard/products/', **seller_headers).json()
+    assert [product['name'] for product in first['results']] == ['Atlas', 'Bible']
+
+    second = client.get(first['next'], **seller_headers).json()
+    assert [product['name'] for product in second['results']] == ['Cookbook']
+    assert second['next'] is None
@@ -1,10 +1,11 @@
 from django.urls import path
 
-from .views import Home, SellerDashboardView, SellerRegistrationView
+from .views import Home, SellerDashboardProductsView, SellerDashboardView, SellerRegistrationView
 
 urlpatterns = [
     path('', Home.as_view()),
     path('register/seller/', SellerRegistrationView.as_view(), name='seller_register'),
     path('seller/dashboard/', SellerDashboardView.as_view(), name='seller_dashboard'),
+    path('seller/dashboard/products/', SellerDashboardProductsView.as_view(), name='seller_dashboard_products'),
     # path('seller/dashboard/<int:pk>/', SellerDashboardView.as_view(), name='seller_dashboard'),
 ]
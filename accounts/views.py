@@ -1,15 +1,23 @@
+import logging
+
 from requests import api
 from rest_framework import status, generics
 from .permissions import IsSeller
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from .serializers import UserSerializer,SellerRegistrationSerializer
+from .serializers import UserSerializer,SellerRegistrationSerializer,SellerSummarySerializer
+from .dashboard import get_summary
 from dj_rest_auth.views import LoginView, LogoutView
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.conf import settings 
 from .models import User
-from products.serializers import ProductSerializer
+from django.urls import reverse
+from products.models import Product
+from products.pagination import KeysetPagination
+from products.serializers import ProductListSerializer
+
+logger = logging.getLogger(__name__)
 
 
 class Home(APIView):
@@ -50,12 +58,10 @@ class CustomLoginView(LoginView):
                 if 'key' in response.data:
                     del response.data['key']
 
-                print(f"DEBUG: Tokens successfully injected into response for user {user.username}")
-                print(f"DEBUG: Access Token: {access[:20]}...")
-                print(f"DEBUG: Refresh Token: {refresh_str[:20]}...")
+                logger.debug("Tokens injected into login response for user %s.", user.username)
 
-            except Exception as e:
-                print(f"CRITICAL ERROR: Failed to generate/inject tokens or user data: {e}")
+            except Exception:
+                logger.exception("Failed to generate/inject tokens or user data for user %s.", user.username)
                 # Might want to return an error response here instead of just printing
                 return Response(
                     {'detail': 'Authentication failed due to server token issue.'},
@@ -64,13 +70,13 @@ class CustomLoginView(LoginView):
         else:
             # If user is not authenticated after super().get_response(),
             # it means login failed, so no tokens should be in response.
-            print("DEBUG: CustomLoginView: User not authenticated after super().get_response(). No tokens added.")
+            logger.debug("User not authenticated after super().get_response(). No tokens added.")
        
         return response
 
     def post(self, request, *args, **kwargs):
-        print("DEBUG: Request data:", request.data)
-        print("DEBUG: Request content type:", request.content_type)
+        # Never log request.data here: it contains the password
+        logger.debug("Login attempt with content type %s.", request.content_type)
         return super().post(request, *args, **kwargs)
 
 
@@ -86,6 +92,11 @@ class SellerRegistrationView(generics.CreateAPIView):
     permission_classes = [AllowAny]
 
 class SellerDashboardView(APIView):
+    """
+    Seller profile and summary figures. The summary is one aggregate query,
+    cached per seller; the products themselves are paged separately at
+    products_url.
+    """
     permission_classes = [IsAuthenticated, IsSeller]
     
     def get(self, request, *args, **kwargs):
@@ -93,9 +104,18 @@ class SellerDashboardView(APIView):
         user = request.user
         return Response({
             'profile': UserSerializer(user).data,
-            'products': ProductSerializer(user.products.all(), many=True).data,
-            'stats': {
-                'product_count': user.products.count(),
-                # Add more stats as needed
-            }
+            'stats': SellerSummarySerializer(get_summary(user.pk)).data,
+            'products_url': request.build_absolute_uri(reverse('seller_dashboard_products')),
         })
+
+
+class SellerDashboardProductsView(generics.ListAPIView):
+    """
+    The seller's own products, keyset-paginated by name.
+    """
+    permission_classes = [IsAuthenticated, IsSeller]
+    serializer_class = ProductListSerializer
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        return Product.objects.filter(seller=self.request.user).order_by('name', 'id')
@@ -0,0 +1,121 @@
+"""
+Generator of realistic shop data for the benchmarks: sellers, buyers,
+categories, products, open carts and past orders, written with bulk inserts
+(which need primary keys back, as on PostgreSQL and SQLite) so a catalog of
+100k products takes seconds rather than minutes.
+
+    from benchmarks.data import generate
+    dataset = generate(products=50_000, buyers=200, seed=1)
+
+The same arguments and seed always produce the same rows. Signals do not
+fire for bulk inserts: caches and the sales rollups start empty, as on a
+freshly restored database.
+"""
+import random
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from benchmarks.search import BRANDS, WORDS  # sets up Django
+
+from django.contrib.auth.hashers import make_password  # noqa: E402
+
+from accounts.models import User  # noqa: E402
+from cart.models import Cart, CartItem  # noqa: E402
+from orders.models import Order, OrderItem  # noqa: E402
+from products.models import Category, Product  # noqa: E402
+
+PASSWORD = 'bench-password'
+
+
+@dataclass
+class Dataset:
+    sellers: list
+    buyers: list
+    category_ids: list
+    product_ids: list
+    counts: dict = field(default_factory=dict)
+    seconds: float = 0.0
+
+
+def sentence(rng, count):
+    return ' '.join(rng.choice(WORDS) for _ in range(count))
+
+
+def create_users(prefix, count, role, password):
+    return User.objects.bulk_create([
+        User(username=f'{prefix}-{i}', email=f'{prefix}-{i}@example.com', password=password, role=role)
+        for i in range(count)
+    ])
+
+
+def generate(sellers=20, categories=30, products=10_000, buyers=100, carts=50, orders=500,
+             items_per_cart=3, items_per_order=3, stock=10_000, batch_size=5000, seed=42):
+    """
+    Creates the rows and returns a Dataset with the created users and ids.
+    Buyers get the carts and orders in turn; products get a large `stock` so
+    benchmark checkouts do not run out.
+    """
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    # Hashing is deliberately slow: hash once and share it
+    password = make_password(PASSWORD)
+
+    seller_users = create_users('bench-seller', sellers, 'SELLER', password)
+    buyer_users = create_users('bench-buyer', buyers, 'BUYER', password)
+    category_objects = Category.objects.bulk_create([
+        Category(name=f'{sentence(rng, 2).title()} {i}', description=sentence(rng, 12)) for i in range(categories)
+    ])
+    category_ids = [category.pk for category in category_objects]
+
+    for start in range(0, products, batch_size):
+        Product.objects.bulk_create([
+            Product(
+                name=f'{rng.choice(BRANDS).title()} {sentence(rng, 3).title()} {i}',
+                description=sentence(rng, 25),
+                price=Decimal(rng.randint(100, 50_000)) / 100,
+                stock=stock,
+                # A few big categories and sellers, and a long tail
+                category_id=category_ids[min(int(rng.paretovariate(1.2)) - 1, categories - 1)],
+                seller=seller_users[min(int(rng.paretovariate(1.2)) - 1, sellers - 1)],
+            )
+            for i in range(start, min(start + batch_size, products))
+        ])
+    product_rows = list(Product.objects.order_by('id').values_list('id', 'name', 'price'))
+    product_ids = [pk for pk, name, price in product_rows]
+
+    cart_objects = Cart.objects.bulk_create([Cart(user=buyer) for buyer in buyer_users[:carts]])
+    CartItem.objects.bulk_create([
+        CartItem(cart=cart, product_id=product_id, quantity=rng.randint(1, 3))
+        for cart in cart_objects
+        for product_id in rng.sample(product_ids, min(items_per_cart, len(product_ids)))
+    ], batch_size=batch_size)
+
+    for start in range(0, orders, batch_size):
+        lines = []
+        batch = []
+        for i in range(start, min(start + batch_size, orders)):
+            items = rng.sample(product_rows, min(items_per_order, len(product_rows)))
+            quantities = [rng.randint(1, 3) for _ in items]
+            total = sum((price * quantity for (pk, name, price), quantity in zip(items, quantities)), Decimal('0.00'))
+            batch.append(Order(user=buyer_users[i % len(buyer_users)], total_amount=total,
+                               status=rng.choice(Order.STATUS_CHOICES)[0]))
+            lines.append(list(zip(items, quantities)))
+        batch = Order.objects.bulk_create(batch)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product_id=pk, product_name=name, product_price=price, quantity=quantity)
+            for order, order_lines in zip(batch, lines)
+            for (pk, name, price), quantity in order_lines
+        ], batch_size=batch_size)
+
+    return Dataset(
+        sellers=seller_users,
+        buyers=buyer_users,
+        category_ids=category_ids,
+        product_ids=product_ids,
+        counts={
+            'sellers': sellers, 'buyers': buyers, 'categories': categories, 'products': products,
+            'carts': len(cart_objects), 'orders': orders,
+        },
+        seconds=time.perf_counter() - started,
+    )
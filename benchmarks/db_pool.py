@@ -0,0 +1,119 @@
+"""
+Per-request latency with and without database connection reuse:
+
+    DATABASE_URL=postgres://... python -m benchmarks.db_pool --requests 2000 --users 8
+
+Runs the same requests through the WSGI application (see benchmarks.load)
+with the default database configured three ways:
+
+- none: CONN_MAX_AGE=0 and no pool, a new connection for every request;
+- persistent: CONN_MAX_AGE, one long-lived connection per thread;
+- pool: the psycopg pool (DB_POOL), as deployed.
+
+The difference is the connection setup (TCP, TLS, authentication), so run it
+against a database at a realistic network distance, e.g. the managed
+PostgreSQL instance rather than a local socket. On other databases the pool
+mode is skipped.
+"""
+import argparse
+import threading
+import time
+
+from benchmarks.data import generate  # sets up Django
+from benchmarks.load import WSGIClient
+
+from django.core.wsgi import get_wsgi_application  # noqa: E402
+from django.db import connection, connections  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from rest_framework_simplejwt.tokens import AccessToken  # noqa: E402
+
+from ecommerce_backend.db_pool import pool_stats  # noqa: E402
+from ecommerce_backend.profiling import percentile  # noqa: E402
+
+MODES = ['none', 'persistent', 'pool']
+
+
+def configure(mode, pool_size, pool_options):
+    """
+    Switches the default database (shared by every thread's connection) to
+    `mode`, dropping the connections and pool of the previous mode.
+    """
+    connections.close_all()
+    if connection.vendor == 'postgresql':
+        connection.close_pool()
+
+    settings_dict = connection.settings_dict
+    options = settings_dict.setdefault('OPTIONS', {})
+    options.pop('pool', None)
+    settings_dict['CONN_MAX_AGE'] = 0
+    if mode == 'persistent':
+        settings_dict['CONN_MAX_AGE'] = 600
+    elif mode == 'pool':
+        options['pool'] = {**pool_options, 'min_size': pool_size, 'max_size': pool_size}
+
+
+def run(application, token, path, requests, users):
+    timings = []
+    lock = threading.Lock()
+
+    def worker(count):
+        client = WSGIClient(application, token)
+        local = []
+        for _ in range(count):
+            started = time.perf_counter()
+            status, content = client.request('GET', path)
+            local.append((time.perf_counter() - started) * 1000)
+            assert status == 200, status
+        with lock:
+            timings.extend(local)
+        connections.close_all()
+
+    threads = [threading.Thread(target=worker, args=(requests // users,)) for _ in range(users)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(timings), time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=8, help='concurrent threads')
+    parser.add_argument('--path', default='/api/categories/')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    args = parser.parse_args()
+
+    setup_test_environment(debug=False)
+    application = get_wsgi_application()
+    # The deployment's pool options (if any), with one connection per thread
+    pool_options = dict(connection.settings_dict.get('OPTIONS', {}).get('pool') or {})
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        dataset = generate(products=1000, buyers=1, orders=0, carts=0)
+        token = AccessToken.for_user(dataset.buyers[0])
+
+        print(f'{args.requests} x GET {args.path} with {args.users} threads on {connection.vendor}\n')
+        print(f'{"mode":<12} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8}')
+        for mode in args.modes:
+            if mode == 'pool' and connection.vendor != 'postgresql':
+                print(f'{mode:<12} (skipped: PostgreSQL only)')
+                continue
+            configure(mode, args.users, pool_options)
+            run(application, token, args.path, args.users * 5, args.users)  # warm up
+            timings, seconds = run(application, token, args.path, args.requests, args.users)
+            print(f'{mode:<12} {len(timings) / seconds:>8.1f} {percentile(timings, 0.5):>8.2f}'
+                  f' {percentile(timings, 0.95):>8.2f} {percentile(timings, 0.99):>8.2f}')
+            if mode == 'pool':
+                stats = pool_stats().get('default', {})
+                print(f'{"":<12} pool: {stats.get("connections_num", 0)} connections opened,'
+                      f' {stats.get("requests_queued", 0)} waits, {stats.get("requests_wait_ms", 0)} ms waiting')
+        configure('none', args.users, pool_options)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Rows per second of the DRF serializers versus the fast-path serializers
+(products.fast_serializers) for product listings, carts and orders:
+
+    python -m benchmarks.fast_serializers --rows 2000 --repeat 10
+
+Each measurement fetches the rows and serializes and renders them, as the
+views do; the database is a throwaway test database.
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.search import generate_catalog  # sets up Django
+
+from django.db import connection  # noqa: E402
+from django.db.models import Prefetch  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from accounts.models import User  # noqa: E402
+from cart.fast_serializers import FastCartSerializer  # noqa: E402
+from cart.models import Cart, CartItem  # noqa: E402
+from cart.serializers import CartSerializer  # noqa: E402
+from orders.fast_serializers import FastOrderSerializer  # noqa: E402
+from orders.models import Order, OrderItem  # noqa: E402
+from orders.serializers import OrderSerializer  # noqa: E402
+from products.fast_serializers import FastProductListSerializer  # noqa: E402
+from products.models import Product  # noqa: E402
+from products.serializers import ProductListSerializer  # noqa: E402
+
+ITEMS_PER_ORDER = 10
+
+
+def generate_orders(products, buyer):
+    cart = Cart.objects.create(user=buyer)
+    CartItem.objects.bulk_create([CartItem(cart=cart, product=product, quantity=1) for product in products])
+
+    orders = Order.objects.bulk_create([
+        Order(user=buyer, total_amount=0) for _ in range(0, len(products), ITEMS_PER_ORDER)
+    ])
+    OrderItem.objects.bulk_create([
+        OrderItem(order=orders[i // ITEMS_PER_ORDER], product=product, product_name=product.name,
+                  product_price=product.price, quantity=2)
+        for i, product in enumerate(products)
+    ])
+
+
+def timed(build, repeat):
+    renderer = JSONRenderer()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        renderer.render(build())
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        generate_catalog(args.rows)
+        Product.objects.update(image='products/images/sample.jpg')
+        buyer = User.objects.create_user(username='bench-buyer', password='bench-password')
+        generate_orders(list(Product.objects.order_by('id')), buyer)
+
+        request = Request(APIRequestFactory().get('/api/products/'))
+        products = Product.objects.order_by('name', 'id')
+        carts = Cart.objects.with_totals().filter(user=buyer)
+        item_prefetch = Prefetch('items', queryset=CartItem.objects.select_related('product').with_subtotal())
+        orders = Order.objects.filter(user=buyer).select_related('user').prefetch_related(
+            Prefetch('items', queryset=OrderItem.objects.select_related('product').order_by('pk'))
+        )
+
+        cases = [
+            ('product list', args.rows,
+             lambda: ProductListSerializer(products, many=True, context={'request': request}).data,
+             lambda: FastProductListSerializer(request).serialize(FastProductListSerializer(request).values(products))),
+            ('cart items', args.rows,
+             lambda: CartSerializer(carts.prefetch_related(item_prefetch), many=True).data,
+             lambda: FastCartSerializer().serialize(carts)),
+            ('order items', args.rows,
+             lambda: OrderSerializer(orders, many=True, context={'request': request}).data,
+             lambda: FastOrderSerializer(request).serialize(orders)),
+        ]
+
+        print(f'{"endpoint data":<14} {"rows":>6} {"DRF rows/s":>12} {"fast rows/s":>12} {"speedup":>8}')
+        for label, rows, drf, fast in cases:
+            drf_seconds = timed(drf, args.repeat)
+            fast_seconds = timed(fast, args.repeat)
+            print(f'{label:<14} {rows:>6} {rows / drf_seconds:>12,.0f} {rows / fast_seconds:>12,.0f}'
+                  f' {drf_seconds / fast_seconds:>7.1f}x')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
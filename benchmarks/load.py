@@ -0,0 +1,283 @@
+"""
+Load test of the core shopping flow, driven in-process through the WSGI
+application (the full middleware stack and URL routes, no HTTP server):
+
+    python -m benchmarks.load --users 8 --iterations 20 --output run.json
+    python -m benchmarks.load --users 8 --iterations 20 --baseline run.json --max-regression 20
+
+Each virtual user is a thread with its own buyer (JWT) and repeats a
+scenario:
+
+- browse: product list, a category, a product page, a search, anonymously
+  as shoppers browse (a signed-in user's product list only shows the
+  products they sell, and is not cached);
+- shop: browse, then sign in to add products to the cart, view it, check
+  out and view the order history.
+
+Data comes from benchmarks.data in a throwaway test database, and every user
+has its own seeded random choices, so two runs with the same arguments send
+the same requests. The report gives requests, errors, throughput and
+p50/p95/p99 latency per endpoint and is written as JSON. With --baseline, a
+previous report is compared against this run, and --max-regression makes
+the command fail when an endpoint's p95 grew by more than that percentage.
+"""
+import argparse
+import datetime
+import io
+import json
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from wsgiref.util import setup_testing_defaults
+
+from benchmarks.data import generate  # sets up Django
+
+from django.core.wsgi import get_wsgi_application  # noqa: E402
+from django.db import connection, connections  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from rest_framework_simplejwt.tokens import AccessToken  # noqa: E402
+
+from ecommerce_backend.profiling import percentile  # noqa: E402
+
+SEARCH_TERMS = ['laptop', 'wireless head', 'organic coffee', 'kalomi', 'leather wallet', 'yoga']
+
+
+class WSGIClient:
+    """
+    Sends requests straight to a WSGI application, as one user when `auth` is set.
+    """
+
+    def __init__(self, application, token):
+        self.application = application
+        self.token = token
+
+    def request(self, method, path, query='', data=None, auth=True):
+        body = json.dumps(data).encode() if data is not None else b''
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(body)),
+            'HTTP_ACCEPT': 'application/json',
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.multithread': True,
+        }
+        if auth:
+            environ['HTTP_AUTHORIZATION'] = f'Bearer {self.token}'
+        setup_testing_defaults(environ)
+
+        status = []
+        result = self.application(environ, lambda line, headers, exc_info=None: status.append(line))
+        try:
+            content = b''.join(result)
+        finally:
+            # Fires request_finished, as a real server does
+            if hasattr(result, 'close'):
+                result.close()
+        return int(status[0].split()[0]), content
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timings = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, label, milliseconds, ok):
+        with self._lock:
+            self.timings[label].append(milliseconds)
+            if not ok:
+                self.errors[label] += 1
+
+
+class VirtualUser:
+    def __init__(self, client, rng, dataset, recorder):
+        self.client = client
+        self.rng = rng
+        self.dataset = dataset
+        self.recorder = recorder
+
+    def call(self, label, method, path, query='', data=None, expect=200, auth=True):
+        started = time.perf_counter()
+        status, content = self.client.request(method, path, query, data, auth)
+        self.recorder.record(label, (time.perf_counter() - started) * 1000, status == expect)
+        return json.loads(content) if content else None
+
+    def browse(self):
+        self.call('GET /api/products/', 'GET', '/api/products/', auth=False)
+        self.call('GET /api/products/?category=', 'GET', '/api/products/',
+                  f'category={self.rng.choice(self.dataset.category_ids)}', auth=False)
+        self.call('GET /api/products/{id}/', 'GET', f'/api/products/{self.rng.choice(self.dataset.product_ids)}/',
+                  auth=False)
+        self.call('GET /api/products/?search=', 'GET', '/api/products/', f'search={self.rng.choice(SEARCH_TERMS)}',
+                  auth=False)
+
+    def shop(self):
+        self.browse()
+        for product_id in self.rng.sample(self.dataset.product_ids, self.rng.randint(1, 3)):
+            self.call('POST /api/cart/items/', 'POST', '/api/cart/items/',
+                      data={'product_id': product_id, 'quantity': self.rng.randint(1, 2)}, expect=201)
+        self.call('GET /api/cart/', 'GET', '/api/cart/')
+        self.call('POST /api/orders/', 'POST', '/api/orders/', expect=201)
+        self.call('GET /api/orders/', 'GET', '/api/orders/')
+
+
+SCENARIOS = {
+    'browse': VirtualUser.browse,
+    'shop': VirtualUser.shop,
+}
+
+
+def run_users(application, dataset, scenario, users, iterations, seed, recorder):
+    errors = []
+
+    def worker(index):
+        buyer = dataset.buyers[index % len(dataset.buyers)]
+        user = VirtualUser(WSGIClient(application, AccessToken.for_user(buyer)),
+                           random.Random(seed * 1000 + index), dataset, recorder)
+        try:
+            for _ in range(iterations):
+                SCENARIOS[scenario](user)
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(users)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return time.perf_counter() - started
+
+
+def summarize(timings, errors, seconds):
+    ordered = sorted(timings)
+    return {
+        'requests': len(ordered),
+        'errors': errors,
+        'throughput_rps': round(len(ordered) / seconds, 2),
+        'mean_ms': round(statistics.fmean(ordered), 3),
+        'p50_ms': round(percentile(ordered, 0.50), 3),
+        'p95_ms': round(percentile(ordered, 0.95), 3),
+        'p99_ms': round(percentile(ordered, 0.99), 3),
+        'max_ms': round(ordered[-1], 3),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline, max_regression):
+    """
+    Prints p95 and throughput changes per endpoint; returns the endpoints
+    whose p95 regressed by more than max_regression percent.
+    """
+    print(f'\nAgainst {baseline.get("git_commit") or "baseline"} ({baseline["started_at"]}):')
+    if (baseline['scenario'], baseline['parameters']) != (report['scenario'], report['parameters']):
+        print('Warning: the baseline ran another scenario or other parameters; the numbers are not comparable.')
+    print(f'{"endpoint":<32} {"p95 ms":>20} {"change":>8} {"req/s change":>13}')
+    regressions = []
+    for label, current in report['endpoints'].items():
+        previous = baseline['endpoints'].get(label)
+        if previous is None:
+            print(f'{label:<32} {"(new)":>20}')
+            continue
+        change = (current['p95_ms'] / previous['p95_ms'] - 1) * 100 if previous['p95_ms'] else 0.0
+        throughput = (current['throughput_rps'] / previous['throughput_rps'] - 1) * 100 if previous['throughput_rps'] else 0.0
+        print(f'{label:<32} {previous["p95_ms"]:>9.1f} -> {current["p95_ms"]:<7.1f} {change:>+7.1f}% {throughput:>+12.1f}%')
+        if max_regression is not None and change > max_regression:
+            regressions.append(label)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='shop')
+    parser.add_argument('--users', type=int, default=8, help='concurrent virtual users (threads)')
+    parser.add_argument('--iterations', type=int, default=20, help='scenario runs per user')
+    parser.add_argument('--warmup', type=int, default=1, help='unmeasured scenario runs before the test')
+    parser.add_argument('--products', type=int, default=10_000)
+    parser.add_argument('--sellers', type=int, default=20)
+    parser.add_argument('--categories', type=int, default=30)
+    parser.add_argument('--buyers', type=int, default=100)
+    parser.add_argument('--orders', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write the report to this JSON file')
+    parser.add_argument('--baseline', help='JSON report of an earlier run to compare with')
+    parser.add_argument('--max-regression', type=float, help='fail when an endpoint p95 grew by more (percent)')
+    args = parser.parse_args()
+
+    # Production-like: no query logging, which DEBUG turns on
+    setup_test_environment(debug=False)
+    application = get_wsgi_application()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        dataset = generate(sellers=args.sellers, categories=args.categories, products=args.products,
+                           buyers=max(args.buyers, args.users), orders=args.orders, seed=args.seed)
+        print(f'Generated {dataset.counts} on {connection.vendor} in {dataset.seconds:.1f}s')
+
+        if args.warmup:
+            run_users(application, dataset, args.scenario, args.users, args.warmup, args.seed + 1, Recorder())
+        recorder = Recorder()
+        seconds = run_users(application, dataset, args.scenario, args.users, args.iterations, args.seed, recorder)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    total = [timing for timings in recorder.timings.values() for timing in timings]
+    report = {
+        'benchmark': 'load',
+        'scenario': args.scenario,
+        'started_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'git_commit': git_commit(),
+        'database': connection.vendor,
+        'python': sys.version.split()[0],
+        'parameters': {
+            'users': args.users, 'iterations': args.iterations, 'warmup': args.warmup, 'seed': args.seed,
+            'dataset': dataset.counts,
+        },
+        'duration_s': round(seconds, 3),
+        'total': summarize(total, sum(recorder.errors.values()), seconds),
+        'endpoints': {
+            label: summarize(timings, recorder.errors[label], seconds)
+            for label, timings in recorder.timings.items()
+        },
+    }
+
+    print(f'\n{report["total"]["requests"]} requests in {seconds:.1f}s, {report["total"]["throughput_rps"]:.1f} req/s,'
+          f' {report["total"]["errors"]} errors\n')
+    print(f'{"endpoint":<32} {"requests":>8} {"errors":>6} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8}')
+    for label, stats in report['endpoints'].items():
+        print(f'{label:<32} {stats["requests"]:>8} {stats["errors"]:>6} {stats["throughput_rps"]:>8.1f}'
+              f' {stats["p50_ms"]:>8.1f} {stats["p95_ms"]:>8.1f} {stats["p99_ms"]:>8.1f}')
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f'\nReport written to {args.output}')
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(report, baseline, args.max_regression)
+        if regressions:
+            print(f'\np95 regressed by more than {args.max_regression:g}%: {", ".join(regressions)}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Rendering (and parsing back) product and order list payloads with DRF's
+stdlib JSONRenderer versus FastJSONRenderer/FastJSONParser (orjson):
+
+    python -m benchmarks.renderers --rows 1000 10000 --repeat 10
+
+Payloads are built in memory with the shapes and types the serializers
+produce (prices as strings, order line totals as Decimals, timestamps as
+strings), plus raw .values()-style rows holding Decimal and datetime
+objects. No database is needed. Without orjson installed both columns
+measure the stdlib.
+"""
+import argparse
+import datetime
+import io
+import os
+import statistics
+import time
+from decimal import Decimal
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ecommerce_backend.settings')
+django.setup()
+
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from ecommerce_backend import renderers  # noqa: E402
+from ecommerce_backend.parsers import FastJSONParser  # noqa: E402
+from ecommerce_backend.renderers import FastJSONRenderer  # noqa: E402
+
+NOW = datetime.datetime(2025, 5, 1, 12, 30, 5, 123456, tzinfo=datetime.timezone.utc)
+
+
+def product(i):
+    return {
+        'id': i, 'name': f'Wireless Gaming Laptop {i}', 'price': f'{i % 500 + 0.99:.2f}', 'stock': i % 100,
+        'category': i % 20, 'image': f'https://res.cloudinary.com/demo/image/upload/products/{i}.jpg', 'seller': 1,
+    }
+
+
+def product_list(rows):
+    return {'next': 'https://api.example.com/api/products/?cursor=abc', 'previous': None,
+            'results': [product(i) for i in range(rows)]}
+
+
+def order_list(rows):
+    # 10 lines per order
+    orders = []
+    for start in range(0, rows, 10):
+        items = [
+            {
+                'id': i, 'order': start, 'product': {'id': i, 'name': f'Product {i}', 'price': '19.99', 'stock': 4,
+                                                     'image': None},
+                'product_name': f'Product {i}', 'product_price': '19.99', 'quantity': 2,
+                'get_total_item_price': Decimal('39.98'),
+                'created_at': '2025-05-01T12:30:05.123456Z', 'updated_at': '2025-05-01T12:30:05.123456Z',
+            }
+            for i in range(start, start + 10)
+        ]
+        orders.append({'id': start, 'user': 'buyer', 'items': items, 'total_amount': '399.80', 'status': 'Pending',
+                       'created_at': '2025-05-01T12:30:05.123456Z', 'updated_at': '2025-05-01T12:30:05.123456Z'})
+    return orders
+
+
+def raw_rows(rows):
+    return [{'id': i, 'price': Decimal('19.99'), 'revenue': Decimal(i) / 4, 'created_at': NOW, 'day': NOW.date()}
+            for i in range(rows)]
+
+
+def timed(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f'orjson: {"available" if renderers.orjson is not None else "not installed (stdlib fallback)"}\n')
+    print(f'{"payload":<14} {"rows":>6} {"bytes":>10} {"render ms":>18} {"parse ms":>18}')
+    print(f'{"":<14} {"":>6} {"":>10} {"stdlib":>8} {"fast":>9} {"stdlib":>8} {"fast":>9}')
+    for rows in args.rows:
+        for label, build in (('product list', product_list), ('order list', order_list), ('raw rows', raw_rows)):
+            data = build(rows)
+            payload = JSONRenderer().render(data)
+            assert FastJSONRenderer().render(data) == payload
+            render_std = timed(lambda: JSONRenderer().render(data), args.repeat)
+            render_fast = timed(lambda: FastJSONRenderer().render(data), args.repeat)
+            parse_std = timed(lambda: JSONParser().parse(io.BytesIO(payload)), args.repeat)
+            parse_fast = timed(lambda: FastJSONParser().parse(io.BytesIO(payload)), args.repeat)
+            print(f'{label:<14} {rows:>6} {len(payload):>10,} {render_std:>8.1f} {render_fast:>9.1f}'
+                  f' {parse_std:>8.1f} {parse_fast:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
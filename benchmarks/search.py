@@ -0,0 +1,134 @@
+"""
+Compares product search latency of DRF's SearchFilter (ILIKE over name and
+description) with the full-text FullTextSearchFilter.
+
+Runs against a throwaway test database, so it never touches real data:
+
+    python -m benchmarks.search --products 100000 --repeat 20
+
+Both variants go through ProductViewSet.list (filtering, keyset pagination and
+serialization) with the catalog cache turned off. Full-text search ranks every
+match, so very common terms cost more than selective ones; SearchFilter can stop
+at the first page in name order but has to scan the table when matches are rare.
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ecommerce_backend.settings')
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django_filters.rest_framework import DjangoFilterBackend  # noqa: E402
+from rest_framework import filters  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from accounts.models import User  # noqa: E402
+from products.models import Category, Product  # noqa: E402
+from products.search import FullTextSearchFilter  # noqa: E402
+from products.views import ProductViewSet  # noqa: E402
+
+WORDS = (
+    'wireless gaming laptop mechanical keyboard mouse monitor ultra slim portable charger cable '
+    'leather wallet running shoes cotton shirt denim jacket organic coffee green tea ceramic mug '
+    'stainless bottle kitchen knife garden hose camping tent hiking boots yoga mat travel backpack '
+    'smart watch bluetooth speaker noise cancelling headphones vintage novel cookbook puzzle board game'
+).split()
+
+# A long tail of brand names, so some queries are selective and some are not
+SYLLABLES = 'ka lo mi ra zen tor vex qua dri bel nox sul pim'.split()
+BRANDS = [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES]
+
+QUERIES = ['laptop', 'wireless head', 'organic coffee', 'kalomi', 'zenvex laptop', 'zzzz']
+
+
+class UncachedProductViewSet(ProductViewSet):
+    def use_list_cache(self, request):
+        return False
+
+
+class LegacySearchProductViewSet(UncachedProductViewSet):
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    search_fields = ['name', 'description']
+
+
+class FullTextProductViewSet(UncachedProductViewSet):
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter]
+
+
+def sentence(rng, count):
+    return ' '.join(rng.choice(WORDS) for _ in range(count))
+
+
+def generate_catalog(products, batch_size=5000, seed=42):
+    rng = random.Random(seed)
+    seller = User.objects.create_user(username='bench-seller', password='bench-password', role='SELLER')
+    categories = Category.objects.bulk_create([Category(name=f'Category {i}') for i in range(20)])
+
+    for start in range(0, products, batch_size):
+        Product.objects.bulk_create([
+            Product(
+                name=f'{rng.choice(BRANDS).title()} {sentence(rng, 3).title()} {i}',
+                description=sentence(rng, 25),
+                price=rng.randint(1, 500),
+                stock=rng.randint(0, 100),
+                category=rng.choice(categories),
+                seller=seller,
+            )
+            for i in range(start, min(start + batch_size, products))
+        ])
+
+
+def time_view(view_class, query, repeat):
+    view = view_class.as_view({'get': 'list'})
+    factory = APIRequestFactory()
+    timings = []
+    for _ in range(repeat):
+        request = factory.get('/api/products/', {'search': query})
+        started = time.perf_counter()
+        response = view(request)
+        response.render()
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.status_code
+    return timings
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--products', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        started = time.perf_counter()
+        generate_catalog(args.products)
+        print(f'Generated {args.products} products on {connection.vendor} in {time.perf_counter() - started:.1f}s\n')
+
+        print(f'{"query":<16} {"SearchFilter p50/p95 ms":>24} {"full-text p50/p95 ms":>22} {"speedup":>8}')
+        for query in QUERIES:
+            legacy = time_view(LegacySearchProductViewSet, query, args.repeat)
+            fulltext = time_view(FullTextProductViewSet, query, args.repeat)
+            speedup = statistics.median(legacy) / statistics.median(fulltext)
+            print(
+                f'{query:<16} {percentile(legacy, 50):>12.1f} / {percentile(legacy, 95):<9.1f}'
+                f' {percentile(fulltext, 50):>10.1f} / {percentile(fulltext, 95):<9.1f} {speedup:>7.1f}x'
+            )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
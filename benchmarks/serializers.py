@@ -0,0 +1,95 @@
+"""
+Measures per-row serialization cost (time and JSON bytes) of product
+representations, before and after the compact listing, sparse fieldsets and
+slim nested products:
+
+    python -m benchmarks.serializers --rows 1000 --repeat 20
+
+Rows are loaded once from a throwaway test database; only serializing and
+rendering are timed. Every product has an image, so image URLs are built
+as they are in production (with whatever storage is configured).
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.search import generate_catalog  # sets up Django
+
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from accounts.models import User  # noqa: E402
+from cart.models import Cart, CartItem  # noqa: E402
+from cart.serializers import CartItemSerializer  # noqa: E402
+from products.models import Product  # noqa: E402
+from products.serializers import ProductListSerializer, ProductSerializer  # noqa: E402
+
+
+class FullProductCartItemSerializer(CartItemSerializer):
+    # Cart items as they were serialized before, with the full product nested
+    product = ProductSerializer(read_only=True)
+
+
+def make_request(params=None):
+    return Request(APIRequestFactory().get('/api/products/', params or {}))
+
+
+def measure(serializer_class, rows, repeat, params=None):
+    renderer = JSONRenderer()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        data = serializer_class(rows, many=True, context={'request': make_request(params)}).data
+        payload = renderer.render(data)
+        timings.append(time.perf_counter() - started)
+    per_row_us = statistics.median(timings) / len(rows) * 1_000_000
+    return per_row_us, len(payload) / len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        generate_catalog(args.rows)
+        Product.objects.update(image='products/images/sample.jpg')
+        products = list(Product.objects.order_by('id'))
+
+        cart = Cart.objects.create(user=User.objects.create_user(username='bench-buyer', password='bench-password'))
+        CartItem.objects.bulk_create([CartItem(cart=cart, product=product, quantity=1) for product in products])
+        items = list(cart.items.select_related('product').with_subtotal())
+
+        cases = [
+            ('product list', [
+                ('before: full ProductSerializer', ProductSerializer, products, None),
+                ('after: compact listing', ProductListSerializer, products, None),
+                ('after: ?fields=id,name,price', ProductListSerializer, products, {'fields': 'id,name,price'}),
+            ]),
+            ('cart items', [
+                ('before: full nested product', FullProductCartItemSerializer, items, None),
+                ('after: product summary', CartItemSerializer, items, None),
+            ]),
+        ]
+        for title, variants in cases:
+            print(f'{title} ({len(products)} rows)')
+            print(f'  {"variant":<34} {"us/row":>8} {"bytes/row":>10} {"speedup":>8}')
+            baseline = None
+            for label, serializer_class, rows, params in variants:
+                per_row_us, per_row_bytes = measure(serializer_class, rows, args.repeat, params)
+                baseline = baseline or per_row_us
+                print(f'  {label:<34} {per_row_us:>8.1f} {per_row_bytes:>10.0f} {baseline / per_row_us:>7.1f}x')
+            print()
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
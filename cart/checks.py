@@ -0,0 +1,31 @@
+"""
+System checks for the cart store settings.
+"""
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+from .store import CART_STORES
+
+# Cache backends that live in one process: each worker would see its own carts
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches)
+def check_cart_store(app_configs, **kwargs):
+    if settings.CART_STORE not in CART_STORES:
+        return [Error(
+            f"CART_STORE must be one of {', '.join(CART_STORES)}, not '{settings.CART_STORE}'.",
+            id='cart.E001',
+        )]
+
+    backend = settings.CACHES.get('carts', {}).get('BACKEND')
+    if settings.CART_STORE == 'cache' and backend in PROCESS_LOCAL_CACHES:
+        return [Error(
+            f"CART_STORE='cache' needs a 'carts' cache shared between processes, not {backend}.",
+            hint='Set CART_CACHE_URL (e.g. redis://...), or use CART_STORE=database.',
+            id='cart.E002',
+        )]
+    return []
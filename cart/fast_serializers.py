@@ -0,0 +1,69 @@
+"""
+Fast-path CartSerializer built from .values() rows (see products.fast_serializers).
+"""
+from collections import defaultdict
+
+from ecommerce_backend.routers import use_primary
+from products.fast_serializers import FastProductSummarySerializer, FastSerializer
+from .models import Cart, CartItem
+
+
+class FastCartItemSerializer(FastSerializer):
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.product = FastProductSummarySerializer(request, prefix='product__')
+        self.columns = ['id', 'cart', 'quantity', 'subtotal', 'created_at', 'updated_at', *self.product.columns]
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'cart': row['cart'],
+            'product': self.product.to_representation(row),
+            'quantity': row['quantity'],
+            'subtotal': round(row['subtotal'], 2),
+            'created_at': self.datetime(row['created_at']),
+            'updated_at': self.datetime(row['updated_at']),
+        }
+
+
+class FastCartSerializer(FastSerializer):
+    """
+    Carts (a Cart.objects.with_totals() queryset) with their items, in two queries.
+    """
+    columns = ['id', 'user', 'total_price', 'item_count', 'created_at', 'updated_at']
+
+    def serialize(self, carts):
+        rows = list(self.values(carts))
+        item_serializer = FastCartItemSerializer(self.request)
+        items = defaultdict(list)
+        item_rows = item_serializer.values(
+            CartItem.objects.filter(cart_id__in=[row['id'] for row in rows]).with_subtotal()
+        )
+        for item in item_rows:
+            items[item['cart']].append(item_serializer.to_representation(item))
+
+        return [
+            {
+                'id': row['id'],
+                'user': row['user'],
+                'items': items[row['id']],
+                'total_price': round(row['total_price'], 2),
+                'item_count': row['item_count'],
+                'created_at': self.datetime(row['created_at']),
+                'updated_at': self.datetime(row['updated_at']),
+            }
+            for row in rows
+        ]
+
+    def user_cart(self, user):
+        """
+        The user's cart, created if needed.
+        """
+        carts = Cart.objects.with_totals().filter(user=user)
+        data = self.serialize(carts)
+        if not data:
+            Cart.objects.get_or_create(user=user)
+            # The new cart is not on the replicas yet
+            with use_primary():
+                data = self.serialize(carts)
+        return data[0]
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from cart.store import get_cart_store
+
+
+class Command(BaseCommand):
+    help = ('Writes carts held in the cart cache (CART_STORE=cache) to the database. '
+            'Flushes every --interval seconds until stopped, or once with --once.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Flush the carts that are currently pending, then exit.')
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help='Seconds to wait between flushes.')
+
+    def handle(self, *args, **options):
+        store = get_cart_store()
+        if options['once']:
+            flushed = store.flush_dirty()
+            self.stdout.write(self.style.SUCCESS(f'Flushed {flushed} cart(s).'))
+            return
+
+        self.stdout.write(self.style.SUCCESS('Cart flusher started.'))
+        try:
+            while True:
+                close_old_connections()
+                store.flush_dirty()
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            # Write what is pending before exiting
+            store.flush_dirty()
+            self.stdout.write('Cart flusher stopped.')
@@ -1,4 +1,8 @@
+from decimal import Decimal
+
 from django.db import models
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum, Value
+from django.db.models.functions import Coalesce
 from django.conf import settings
 
 from products.models import Product
@@ -6,12 +10,45 @@ from django.core.validators import MinValueValidator
 
 User = settings.AUTH_USER_MODEL
 
+# Output type for price * quantity expressions
+MONEY_FIELD = DecimalField(max_digits=12, decimal_places=2)
+
+
+class CartQuerySet(models.QuerySet):
+    def with_totals(self):
+        """
+        Annotates each cart with `total_price` (sum of price * quantity) and
+        `item_count` (number of units), computed in the database. Works for any
+        number of carts in one query, e.g. Cart.objects.with_totals().filter(...).
+        """
+        return self.annotate(
+            total_price=Coalesce(
+                Sum(F('items__product__price') * F('items__quantity'), output_field=MONEY_FIELD),
+                Value(Decimal('0.00')),
+                output_field=MONEY_FIELD,
+            ),
+            item_count=Coalesce(Sum('items__quantity'), Value(0)),
+        )
+
+
+class CartItemQuerySet(models.QuerySet):
+    def with_subtotal(self):
+        """
+        Annotates each item with its line `subtotal` (price * quantity).
+        """
+        return self.annotate(
+            subtotal=ExpressionWrapper(F('product__price') * F('quantity'), output_field=MONEY_FIELD)
+        )
+
+
 class Cart(models.Model):
      
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='cart')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CartQuerySet.as_manager()
+
     def __str__(self):
         return f"Cart of {self.user.username}"
 
@@ -23,10 +60,16 @@ class CartItem(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CartItemQuerySet.as_manager()
+
     class Meta:
         # Ensure a product can only appear once in a specific cart(prevents duplicate entries)
         unique_together = ('cart', 'product')
         ordering = ['created_at']
+        indexes = [
+            # A cart's items in the order they were added
+            models.Index(fields=['cart', 'created_at'], name='cartitem_cart_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.quantity} x {self.product.name} in {self.cart.user.username}'s cart"
@@ -0,0 +1,82 @@
+"""
+Cart mutations applied with database upserts on the (cart, product) unique
+constraint, so they never read the items first and cannot lose concurrent
+updates.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from ecommerce_backend.upsert import upsert
+from .models import CartItem
+
+ADD = 'add'
+SET = 'set'
+REMOVE = 'remove'
+OPERATIONS = [ADD, SET, REMOVE]
+
+
+def add_item(cart, product, quantity):
+    """
+    Adds `quantity` units of `product` to `cart` with a single
+    INSERT ... ON CONFLICT (cart, product) DO UPDATE SET quantity = quantity + n
+    ... RETURNING statement. Returns (cart_item, created).
+    """
+    now = timezone.now()
+    [(pk, total, created_at)] = upsert(
+        CartItem,
+        [{'cart_id': cart.pk, 'product_id': product.pk, 'quantity': quantity, 'created_at': now, 'updated_at': now}],
+        ['cart_id', 'product_id'],
+        increment=['quantity'],
+        update=['updated_at'],
+        returning=['id', 'quantity', 'created_at'],
+    )
+    item = CartItem(pk=pk, cart=cart, product=product, quantity=total, created_at=created_at, updated_at=now)
+    # Stored quantities are at least 1, so the total only equals the amount
+    # added when there was no row before.
+    return item, total == quantity
+
+
+def fold_operations(operations):
+    """
+    Reduces a sequence of {'product_id', 'quantity', 'op'} operations to one
+    outcome per product: ('add', n) when only adds were seen (added to the
+    stored quantity), ('set', n) for an absolute quantity, or ('remove', None).
+    """
+    outcomes = {}
+    for operation in operations:
+        product_id, quantity, op = operation['product_id'], operation.get('quantity', 1), operation.get('op', ADD)
+        kind, current = outcomes.get(product_id, (ADD, 0))
+        if op == REMOVE:
+            outcomes[product_id] = (REMOVE, None)
+        elif op == SET:
+            outcomes[product_id] = (SET, quantity)
+        elif kind == REMOVE:
+            # Removed earlier in the batch, so the add starts from zero
+            outcomes[product_id] = (SET, quantity)
+        else:
+            outcomes[product_id] = (kind, current + quantity)
+    return outcomes
+
+
+def apply_operations(cart, operations):
+    """
+    Applies a batch of operations to `cart` in one transaction with at most
+    three statements: a DELETE, an upsert of absolute quantities and an
+    upsert adding to the stored quantities.
+    """
+    outcomes = fold_operations(operations)
+    now = timezone.now()
+
+    def rows(kind):
+        return [
+            {'cart_id': cart.pk, 'product_id': product_id, 'quantity': quantity, 'created_at': now, 'updated_at': now}
+            for product_id, (outcome, quantity) in outcomes.items()
+            if outcome == kind
+        ]
+
+    removed = [product_id for product_id, (outcome, _) in outcomes.items() if outcome == REMOVE]
+    with transaction.atomic():
+        if removed:
+            CartItem.objects.filter(cart=cart, product_id__in=removed).delete()
+        upsert(CartItem, rows(SET), ['cart_id', 'product_id'], update=['quantity', 'updated_at'])
+        upsert(CartItem, rows(ADD), ['cart_id', 'product_id'], increment=['quantity'], update=['updated_at'])
@@ -1,10 +1,14 @@
 from rest_framework import serializers
-from products.serializers import ProductSerializer
+from products.serializers import ProductSummarySerializer
 from products.models import Product
 from .models import Cart, CartItem
+from .operations import ADD, OPERATIONS
+
+# Largest number of operations accepted in one batch request
+MAX_BATCH_OPERATIONS = 100
 
 class CartItemSerializer(serializers.ModelSerializer):
-    product = ProductSerializer(read_only=True)
+    product = ProductSummarySerializer(read_only=True)
 
     product_id = serializers.PrimaryKeyRelatedField(
         queryset=Product.objects.all(),
@@ -12,21 +16,60 @@ class CartItemSerializer(serializers.ModelSerializer):
         write_only=True
     )
 
+    subtotal = serializers.SerializerMethodField()
+
+    def get_subtotal(self, obj: CartItem):
+        # Annotated by CartItem.objects.with_subtotal(); single items fall back to Python
+        subtotal = getattr(obj, 'subtotal', None)
+        if subtotal is None:
+            subtotal = obj.product.price * obj.quantity
+        return round(subtotal, 2)
+
     class Meta:
         model = CartItem
-        fields = ['id', 'cart', 'product', 'quantity', 'product_id', 'created_at', 'updated_at']
+        fields = ['id', 'cart', 'product', 'quantity', 'product_id', 'subtotal', 'created_at', 'updated_at']
         read_only_fields = ('cart', 'created_at', 'updated_at')
 
 
 class CartSerializer(serializers.ModelSerializer):
     items = CartItemSerializer(many=True, read_only=True)
     total_price = serializers.SerializerMethodField()
+    item_count = serializers.SerializerMethodField()
+
+    def get_total_price(self, obj: Cart):
+        return round(self._get_totals(obj)['total_price'], 2)
+
+    def get_item_count(self, obj: Cart):
+        return self._get_totals(obj)['item_count']
 
-    def get_total_price(self, obj: Cart): 
-        total = sum(item.product.price * item.quantity for item in obj.items.all() if item.product) # type: ignore
-        return round(total, 2)
+    def _get_totals(self, obj: Cart):
+        # Carts fetched with Cart.objects.with_totals() already carry the totals
+        if hasattr(obj, 'total_price') and hasattr(obj, 'item_count'):
+            return {'total_price': obj.total_price, 'item_count': obj.item_count}
+        return Cart.objects.with_totals().values('total_price', 'item_count').get(pk=obj.pk)
 
     class Meta:
         model = Cart
-        fields = ['id', 'user', 'items', 'total_price', 'created_at', 'updated_at']
+        fields = ['id', 'user', 'items', 'total_price', 'item_count', 'created_at', 'updated_at']
         read_only_fields = ('user', 'created_at', 'updated_at')
+
+
+class CartOperationSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1, default=1)
+    op = serializers.ChoiceField(choices=OPERATIONS, default=ADD)
+
+
+class CartBatchSerializer(serializers.Serializer):
+    items = CartOperationSerializer(many=True, allow_empty=False, max_length=MAX_BATCH_OPERATIONS)
+
+    def validate_items(self, items):
+        # One query for every product in the batch
+        product_ids = {item['product_id'] for item in items}
+        found = set(Product.objects.filter(pk__in=product_ids).values_list('pk', flat=True))
+        missing = sorted(product_ids - found)
+        if missing:
+            raise serializers.ValidationError(
+                [f'Invalid pk "{product_id}" - object does not exist.' for product_id in missing]
+            )
+        return items
@@ -0,0 +1,379 @@
+"""
+Cart storage backends used by the cart views and checkout.
+
+DatabaseCartStore (the default) reads and writes Cart/CartItem rows on every
+request. CacheCartStore keeps each active cart as one entry in the 'carts'
+cache (local memory by default, Redis via CART_CACHE_URL) and writes it
+behind to the database: the flush_carts command persists the carts changed
+since their last flush, and checkout works from a snapshot of the entry.
+
+Select the backend with CART_STORE = 'database' or 'cache'.
+"""
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Prefetch, Value, When, prefetch_related_objects
+from django.utils import timezone
+
+from ecommerce_backend.upsert import upsert
+from products.models import Product
+from .models import Cart, CartItem
+from .operations import add_item, apply_operations, fold_operations, REMOVE, SET
+
+logger = logging.getLogger(__name__)
+
+
+class CartStoreBusy(Exception):
+    """
+    Raised when a cart stays locked by another request for too long.
+    """
+
+
+@dataclass
+class CartSnapshot:
+    """
+    The contents of a cart at one point in time, as checkout sees them.
+    `lines` holds (product, quantity) pairs.
+    """
+    cart_id: int
+    lines: list
+    item_ids: list = field(default_factory=list)
+    version: int = 0
+
+    @property
+    def quantities(self):
+        return {product.pk: quantity for product, quantity in self.lines}
+
+
+class DatabaseCartStore:
+    hot = False
+
+    def get_cart(self, user):
+        """
+        The user's cart (created if needed) with totals and items loaded, ready for CartSerializer.
+        """
+        cart, created = Cart.objects.with_totals().get_or_create(user=user)
+        if created:
+            # A new cart is empty, and not on the replicas yet to compute the totals
+            cart.total_price, cart.item_count = Decimal('0.00'), 0
+        # Items and their products in one query, so serializing does not query per item
+        prefetch_related_objects(
+            [cart],
+            Prefetch('items', queryset=CartItem.objects.select_related('product').with_subtotal()),
+        )
+        return cart
+
+    def add_item(self, user, product, quantity):
+        cart, created = Cart.objects.get_or_create(user=user)
+        return add_item(cart, product, quantity)
+
+    def apply(self, user, operations):
+        cart, created = Cart.objects.get_or_create(user=user)
+        apply_operations(cart, operations)
+
+    def snapshot(self, user):
+        """
+        Returns a CartSnapshot, or None when the user has no cart.
+        """
+        try:
+            cart = Cart.objects.get(user=user)
+        except Cart.DoesNotExist:
+            return None
+        items = list(cart.items.select_related('product'))
+        return CartSnapshot(
+            cart_id=cart.pk,
+            lines=[(item.product, item.quantity) for item in items],
+            item_ids=[item.pk for item in items],
+        )
+
+    def consume(self, user, snapshot):
+        """
+        Takes the checked-out quantities out of the cart. Call inside the
+        checkout transaction. Units added while checkout was running stay in
+        the cart.
+        """
+        if not snapshot.item_ids:
+            return
+        checked_out = Case(
+            *[When(pk=pk, then=Value(quantity)) for pk, (product, quantity) in zip(snapshot.item_ids, snapshot.lines)],
+            output_field=IntegerField(),
+        )
+        items = CartItem.objects.filter(pk__in=snapshot.item_ids)
+        # Delete first: a decremented line could otherwise match the delete
+        items.filter(quantity__lte=checked_out).delete()
+        items.filter(quantity__gt=checked_out).update(quantity=F('quantity') - checked_out, updated_at=timezone.now())
+
+    def flush(self, user_id):
+        return False
+
+    def flush_dirty(self):
+        return 0
+
+    def discard(self, user_id):
+        pass
+
+
+class CacheCartStore:
+    """
+    Each cart is one cache entry, {product_id: item} plus bookkeeping,
+    replaced as a whole under a short per-cart lock (cache.add), so reads
+    always see a consistent cart and concurrent writes are not lost.
+
+    A changed cart gets a per-cart dirty flag, and is listed under the
+    'dirty' key when the flag is first set; both are removed under the cart
+    lock once a flush has committed, so a failed flush is retried and a
+    change made meanwhile is flushed next time.
+    """
+    hot = True
+    alias = 'carts'
+    dirty_key = 'carts:dirty'
+    lock_timeout = 10
+    lock_wait = 5
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def timeout(self):
+        return settings.CART_STORE_TIMEOUT
+
+    def key(self, user_id):
+        return f'carts:{user_id}'
+
+    def dirty_flag_key(self, user_id):
+        return f'carts:{user_id}:dirty'
+
+    @contextmanager
+    def lock(self, key):
+        lock_key = f'{key}:lock'
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_wait
+        while not self.cache.add(lock_key, token, self.lock_timeout):
+            if time.monotonic() > deadline:
+                raise CartStoreBusy(f'Timed out waiting for {key}.')
+            time.sleep(0.005)
+        try:
+            yield
+        finally:
+            if self.cache.get(lock_key) == token:
+                self.cache.delete(lock_key)
+
+    # Reading
+    def load(self, user):
+        record = self.cache.get(self.key(user.pk))
+        if record is None:
+            # Another request may hydrate at the same time; add() keeps the first copy
+            self.cache.add(self.key(user.pk), self.hydrate(user), self.timeout)
+            record = self.cache.get(self.key(user.pk))
+        return record
+
+    def hydrate(self, user):
+        cart, created = Cart.objects.get_or_create(user=user)
+        items = list(cart.items.all())
+        return {
+            'cart_id': cart.pk,
+            'created_at': cart.created_at,
+            'updated_at': cart.updated_at,
+            'items': {
+                item.product_id: {'quantity': item.quantity, 'created_at': item.created_at, 'updated_at': item.updated_at}
+                for item in items
+            },
+            'item_ids': {item.product_id: item.pk for item in items},
+            'version': 0,
+            'flushed_version': 0,
+        }
+
+    def build_item(self, record, product, entry):
+        item = CartItem(
+            pk=record['item_ids'].get(product.pk),
+            cart_id=record['cart_id'],
+            product=product,
+            quantity=entry['quantity'],
+            created_at=entry['created_at'],
+            updated_at=entry['updated_at'],
+        )
+        item.subtotal = product.price * entry['quantity']
+        return item
+
+    def get_cart(self, user):
+        record = self.load(user)
+        products = Product.objects.in_bulk(record['items'].keys())
+        items = sorted(
+            (self.build_item(record, products[product_id], entry)
+             for product_id, entry in record['items'].items() if product_id in products),
+            key=lambda item: item.created_at,
+        )
+        cart = Cart(pk=record['cart_id'], user=user, created_at=record['created_at'], updated_at=record['updated_at'])
+        cart.total_price = sum((item.subtotal for item in items), Decimal('0.00'))
+        cart.item_count = sum(item.quantity for item in items)
+        # Serve cart.items.all() from the cached entry
+        cart._prefetched_objects_cache = {'items': items}
+        return cart
+
+    def snapshot(self, user):
+        record = self.load(user)
+        products = Product.objects.in_bulk(record['items'].keys())
+        return CartSnapshot(
+            cart_id=record['cart_id'],
+            lines=[(products[product_id], entry['quantity'])
+                   for product_id, entry in record['items'].items() if product_id in products],
+            version=record['version'],
+        )
+
+    # Writing
+    def mutate(self, user, change):
+        key = self.key(user.pk)
+        with self.lock(key):
+            record = self.load(user)
+            result = change(record['items'], timezone.now())
+            record['version'] += 1
+            record['updated_at'] = timezone.now()
+            self.cache.set(key, record, self.timeout)
+        self.mark_dirty(user.pk)
+        return record, result
+
+    def apply(self, user, operations):
+        outcomes = fold_operations(operations)
+
+        def change(items, now):
+            for product_id, (kind, quantity) in outcomes.items():
+                if kind == REMOVE:
+                    items.pop(product_id, None)
+                    continue
+                entry = items.get(product_id)
+                if entry is None:
+                    items[product_id] = {'quantity': quantity, 'created_at': now, 'updated_at': now}
+                else:
+                    entry['quantity'] = quantity if kind == SET else entry['quantity'] + quantity
+                    entry['updated_at'] = now
+
+        self.mutate(user, change)
+
+    def add_item(self, user, product, quantity):
+        def change(items, now):
+            created = product.pk not in items
+            entry = items.setdefault(product.pk, {'quantity': 0, 'created_at': now, 'updated_at': now})
+            entry['quantity'] += quantity
+            entry['updated_at'] = now
+            return created
+
+        record, created = self.mutate(user, change)
+        return self.build_item(record, product, record['items'][product.pk]), created
+
+    def consume(self, user, snapshot):
+        """
+        Takes the checked-out quantities out of the cart once the order
+        commits. Units added while checkout was running stay in the cart.
+        """
+        quantities = snapshot.quantities
+
+        def change(items, now):
+            for product_id, quantity in quantities.items():
+                entry = items.get(product_id)
+                if entry is None:
+                    continue
+                entry['quantity'] -= quantity
+                if entry['quantity'] <= 0:
+                    del items[product_id]
+
+        transaction.on_commit(lambda: self.mutate(user, change))
+
+    # Write-behind
+    def mark_dirty(self, user_id):
+        # Only a clean cart takes the shared lock; listed before it is
+        # flagged, so a flag never hides an unlisted cart
+        if self.cache.get(self.dirty_flag_key(user_id)) is not None:
+            return
+        with self.lock(self.dirty_key):
+            dirty = self.cache.get(self.dirty_key) or set()
+            dirty.add(user_id)
+            self.cache.set(self.dirty_key, dirty, None)
+        self.cache.set(self.dirty_flag_key(user_id), True, None)
+
+    def mark_clean(self, user_id):
+        # Called under the cart lock, so no change can slip in between
+        with self.lock(self.dirty_key):
+            dirty = self.cache.get(self.dirty_key) or set()
+            dirty.discard(user_id)
+            self.cache.set(self.dirty_key, dirty, None)
+        self.cache.delete(self.dirty_flag_key(user_id))
+
+    def flush(self, user_id):
+        """
+        Writes the user's cached cart to Cart/CartItem if it changed since the
+        last flush. Returns True when something was written.
+        """
+        with self.lock(self.key(user_id)):
+            return self._flush(user_id)
+
+    def _flush(self, user_id):
+        key = self.key(user_id)
+        record = self.cache.get(key)
+        if record is None or record['version'] == record['flushed_version']:
+            self.mark_clean(user_id)
+            return False
+
+        # Products deleted since they were added cannot be stored
+        items = record['items']
+        existing = set(Product.objects.filter(pk__in=items.keys()).values_list('pk', flat=True))
+        with transaction.atomic():
+            CartItem.objects.filter(cart_id=record['cart_id']).exclude(product_id__in=existing).delete()
+            returned = upsert(
+                CartItem,
+                [
+                    {'cart_id': record['cart_id'], 'product_id': product_id, 'quantity': entry['quantity'],
+                     'created_at': entry['created_at'], 'updated_at': entry['updated_at']}
+                    for product_id, entry in items.items() if product_id in existing
+                ],
+                ['cart_id', 'product_id'],
+                update=['quantity', 'updated_at'],
+                returning=['id', 'product_id'],
+            )
+            Cart.objects.filter(pk=record['cart_id']).update(updated_at=record['updated_at'])
+
+        record['item_ids'] = {product_id: pk for pk, product_id in returned}
+        record['flushed_version'] = record['version']
+        self.cache.set(key, record, self.timeout)
+        self.mark_clean(user_id)
+        return True
+
+    def flush_dirty(self):
+        """
+        Flushes every cart changed since the last run. Returns the number of
+        carts written. Carts that fail stay dirty for the next run.
+        """
+        flushed = 0
+        for user_id in self.cache.get(self.dirty_key) or set():
+            try:
+                flushed += self.flush(user_id)
+            except Exception:
+                logger.exception("Failed to flush cart of user %s; will retry.", user_id)
+        return flushed
+
+    def discard(self, user_id):
+        """
+        Flushes the cart and drops it from the cache, so the next request
+        reloads it from the database (used after direct CartItem changes).
+        """
+        key = self.key(user_id)
+        with self.lock(key):
+            self._flush(user_id)
+            self.cache.delete(key)
+
+
+CART_STORES = {
+    'database': DatabaseCartStore,
+    'cache': CacheCartStore,
+}
+
+
+def get_cart_store():
+    return CART_STORES[settings.CART_STORE]()
@@ -1,3 +1,391 @@
-from django.test import TestCase
+import io
+import logging
+import threading
 
-# Create your tests here.
+import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from products.models import Product, Category
+from cart.models import Cart, CartItem
+from cart.checks import check_cart_store
+from cart.store import CacheCartStore, DatabaseCartStore
+from django.contrib.auth import get_user_model
+User = get_user_model()
+
+# Requests made by these tests fail them when they run N+1 queries
+pytestmark = pytest.mark.usefixtures('query_detector')
+
+
+@pytest.fixture
+def buyer(db):
+    return User.objects.create_user(username='buyer', password='Buyerpassword123')
+
+
+@pytest.fixture
+def auth_headers(buyer):
+    return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(buyer)}'}
+
+
+def fill_cart(user, count):
+    """Puts `count` distinct products into the user's cart."""
+    seller = User.objects.get_or_create(username='seller', defaults={'role': 'SELLER'})[0]
+    category = Category.objects.get_or_create(name='Books')[0]
+    cart = Cart.objects.get_or_create(user=user)[0]
+    for i in range(count):
+        product = Product.objects.create(
+            name=f'Book {seller.products.count()}', price=10, stock=5, category=category, seller=seller
+        )
+        CartItem.objects.create(cart=cart, product=product, quantity=2)
+    return cart
+
+
+def count_queries(client, url, headers):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, **headers)
+    assert response.status_code == status.HTTP_200_OK
+    return len(context)
+
+
+def test_cart_view_query_count_is_constant(client, buyer, auth_headers):
+    fill_cart(buyer, 1)
+    one_item = count_queries(client, '/api/cart/', auth_headers)
+
+    fill_cart(buyer, 10)
+    many_items = count_queries(client, '/api/cart/', auth_headers)
+
+    assert one_item == many_items
+    # user lookup, cart, items joined with products
+    assert many_items <= 3
+
+
+def test_cart_item_detail_loads_product_in_same_query(client, buyer, auth_headers):
+    cart = fill_cart(buyer, 1)
+    item = cart.items.get()
+
+    queries = count_queries(client, f'/api/cart/items/{item.id}/', auth_headers)
+
+    # user lookup, cart, item joined with its product
+    assert queries <= 3
+
+
+def test_cart_view_total_price(client, buyer, auth_headers):
+    fill_cart(buyer, 3)
+
+    data = client.get('/api/cart/', **auth_headers).json()
+
+    assert len(data['items']) == 3
+    assert float(data['total_price']) == 60.0
+
+
+def test_cart_view_exposes_line_subtotals_and_item_count(client, buyer, auth_headers):
+    fill_cart(buyer, 2)
+
+    data = client.get('/api/cart/', **auth_headers).json()
+
+    assert [float(item['subtotal']) for item in data['items']] == [20.0, 20.0]
+    assert data['item_count'] == 4
+
+
+def test_cart_item_update_returns_the_new_subtotal(client, buyer, auth_headers):
+    item = fill_cart(buyer, 1).items.get()
+
+    response = client.patch(f'/api/cart/items/{item.id}/', {'quantity': 5}, content_type='application/json', **auth_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert float(response.json()['subtotal']) == 50.0
+
+
+def test_empty_cart_totals(client, buyer, auth_headers):
+    data = client.get('/api/cart/', **auth_headers).json()
+
+    assert data['items'] == []
+    assert float(data['total_price']) == 0
+    assert data['item_count'] == 0
+
+
+def test_with_totals_fetches_many_carts_in_one_query(buyer, django_assert_num_queries):
+    other = User.objects.create_user(username='other', password='Otherpassword123')
+    fill_cart(buyer, 3)
+    fill_cart(other, 1)
+    Cart.objects.create(user=User.objects.create_user(username='empty', password='Emptypassword123'))
+
+    with django_assert_num_queries(1):
+        totals = {
+            cart.user_id: (cart.total_price, cart.item_count)
+            for cart in Cart.objects.with_totals()
+        }
+
+    assert totals[buyer.id] == (60, 6)
+    assert totals[other.id] == (20, 2)
+    assert len(totals) == 3
+    assert (0, 0) in totals.values()
+
+
+def test_cart_view_logs_nothing_above_debug(client, buyer, auth_headers, caplog):
+    fill_cart(buyer, 1)
+
+    with caplog.at_level(logging.INFO, logger='cart'):
+        client.get('/api/cart/', **auth_headers)
+    assert not [record for record in caplog.records if record.name.startswith('cart')]
+
+    with caplog.at_level(logging.DEBUG, logger='cart'):
+        client.get('/api/cart/', **auth_headers)
+    assert any(record.name == 'cart.views' and record.levelno == logging.DEBUG for record in caplog.records)
+
+
+def batch(client, headers, items):
+    return client.post('/api/cart/items/batch/', {'items': items}, content_type='application/json', **headers)
+
+
+def test_batch_applies_operations_in_order(client, buyer, auth_headers):
+    cart = fill_cart(buyer, 3)
+    first, second, third = [item.product for item in cart.items.order_by('id')]
+    seller = User.objects.get(username='seller')
+    new = Product.objects.create(name='New book', price=5, stock=5, seller=seller)
+
+    response = batch(client, auth_headers, [
+        {'product_id': first.id, 'quantity': 3},                 # 2 + 3
+        {'product_id': second.id, 'quantity': 7, 'op': 'set'},
+        {'product_id': third.id, 'op': 'remove'},
+        {'product_id': new.id},                                   # new item, quantity 1
+        {'product_id': new.id, 'quantity': 2},
+    ])
+    assert response.status_code == status.HTTP_200_OK, response.content
+
+    data = response.json()
+    quantities = {item['product']['id']: item['quantity'] for item in data['items']}
+    assert quantities == {first.id: 5, second.id: 7, new.id: 3}
+    assert data['item_count'] == 15
+    assert float(data['total_price']) == 5 * 10 + 7 * 10 + 3 * 5
+
+
+def test_batch_add_after_remove_starts_from_zero(client, buyer, auth_headers):
+    product = fill_cart(buyer, 1).items.get().product
+    batch(client, auth_headers, [
+        {'product_id': product.id, 'op': 'remove'},
+        {'product_id': product.id, 'quantity': 4},
+    ])
+    assert CartItem.objects.get(product=product).quantity == 4
+
+
+def test_batch_with_unknown_product_changes_nothing(client, buyer, auth_headers):
+    product = fill_cart(buyer, 1).items.get().product
+    response = batch(client, auth_headers, [
+        {'product_id': product.id, 'op': 'remove'},
+        {'product_id': 999999},
+    ])
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert '999999' in str(response.json()['items'])
+    assert CartItem.objects.filter(product=product).exists()
+
+
+def test_batch_rejects_invalid_operations(client, auth_headers):
+    assert batch(client, auth_headers, []).status_code == status.HTTP_400_BAD_REQUEST
+    assert batch(client, auth_headers, [{'product_id': 1, 'op': 'double'}]).status_code == status.HTTP_400_BAD_REQUEST
+    assert batch(client, auth_headers, [{'product_id': 1, 'quantity': 0}]).status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_batch_query_count_does_not_grow_with_batch_size(client, buyer, auth_headers):
+    seller = User.objects.create_user(username='seller', password='Sellerpassword123', role='SELLER')
+    products = [Product.objects.create(name=f'Book {i}', price=10, stock=5, seller=seller) for i in range(20)]
+
+    def run(items):
+        with CaptureQueriesContext(connection) as context:
+            assert batch(client, auth_headers, items).status_code == status.HTTP_200_OK
+        return len(context)
+
+    small = run([{'product_id': products[0].id}])
+    large = run([{'product_id': product.id, 'op': 'set', 'quantity': 2} for product in products[1:]]
+                + [{'product_id': product.id} for product in products[:10]])
+    assert large <= small + 1  # the extra upsert statement for absolute quantities
+
+
+def add_to_cart(client, headers, product, quantity=1):
+    return client.post('/api/cart/items/', {'product_id': product.id, 'quantity': quantity},
+                       content_type='application/json', **headers)
+
+
+def test_add_creates_then_increments_with_one_write(client, buyer, auth_headers):
+    product = fill_cart(User.objects.create_user(username='other'), 1).items.get().product
+
+    created = add_to_cart(client, auth_headers, product, 2)
+    assert created.status_code == status.HTTP_201_CREATED
+    assert created.json()['quantity'] == 2
+    assert created.json()['product']['id'] == product.id
+
+    with CaptureQueriesContext(connection) as context:
+        updated = add_to_cart(client, auth_headers, product, 3)
+    assert updated.status_code == status.HTTP_202_ACCEPTED
+    assert updated.json()['id'] == created.json()['id']
+    assert updated.json()['quantity'] == 5
+    assert updated.json()['created_at'] == created.json()['created_at']
+
+    writes = [query['sql'] for query in context.captured_queries if not query['sql'].startswith('SELECT')]
+    assert len(writes) == 1 and 'ON CONFLICT' in writes[0]
+    assert CartItem.objects.get(cart__user=buyer).quantity == 5
+
+
+def add_concurrently(threads_count=8, adds_per_thread=5):
+    """
+    Has `threads_count` clients of one buyer add the same product to the
+    buyer's (initially empty) cart at once, `adds_per_thread` times each.
+    Returns the buyer, the product and the response status codes.
+    """
+    buyer = User.objects.create_user(username='buyer', password='Buyerpassword123')
+    product = fill_cart(User.objects.create_user(username='other'), 1).items.get().product
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(buyer)}'}
+
+    barrier = threading.Barrier(threads_count)
+    results = []
+
+    def add_repeatedly():
+        client = Client()
+        barrier.wait()
+        try:
+            for _ in range(adds_per_thread):
+                results.append(add_to_cart(client, headers, product).status_code)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=add_repeatedly) for _ in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return buyer, product, results
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_adds_of_the_same_product_are_all_counted():
+    """
+    Many requests add the same product to the same (initially empty) cart at
+    once. Every unit must be counted and no request may fail.
+    """
+    buyer, product, results = add_concurrently(threads_count=8, adds_per_thread=5)
+
+    assert len(results) == 40
+    assert results.count(status.HTTP_201_CREATED) == 1
+    assert results.count(status.HTTP_202_ACCEPTED) == 39
+    assert CartItem.objects.get(cart__user=buyer, product=product).quantity == 40
+
+
+def test_checkout_keeps_units_added_after_the_snapshot(buyer):
+    store = DatabaseCartStore()
+    kept, consumed = [item.product for item in fill_cart(buyer, 2).items.all()]
+    snapshot = store.snapshot(buyer)
+
+    # Added while the checkout is running
+    store.add_item(buyer, kept, 3)
+    store.consume(buyer, snapshot)
+
+    assert dict(CartItem.objects.filter(cart__user=buyer).values_list('product_id', 'quantity')) == {kept.id: 3}
+
+
+@pytest.fixture
+def cart_cache(settings):
+    """Keeps carts in the 'carts' cache, written behind by flush_carts."""
+    settings.CART_STORE = 'cache'
+    caches['carts'].clear()
+    yield caches['carts']
+    caches['carts'].clear()
+
+
+def flush_carts():
+    call_command('flush_carts', once=True, stdout=io.StringIO())
+
+
+def test_cached_cart_is_written_behind(client, buyer, auth_headers, cart_cache):
+    first, second = [item.product for item in fill_cart(User.objects.create_user(username='other'), 2).items.all()]
+
+    assert add_to_cart(client, auth_headers, first, 2).status_code == status.HTTP_201_CREATED
+    assert add_to_cart(client, auth_headers, first, 1).status_code == status.HTTP_202_ACCEPTED
+    response = batch(client, auth_headers, [{'product_id': second.id, 'quantity': 4}])
+    assert response.json()['item_count'] == 7
+    assert not CartItem.objects.filter(cart__user=buyer).exists()
+
+    data = client.get('/api/cart/', **auth_headers).json()
+    assert {item['product']['id']: item['quantity'] for item in data['items']} == {first.id: 3, second.id: 4}
+    assert float(data['total_price']) == 70.0
+
+    flush_carts()
+    assert dict(CartItem.objects.filter(cart__user=buyer).values_list('product_id', 'quantity')) == {first.id: 3, second.id: 4}
+
+    batch(client, auth_headers, [{'product_id': first.id, 'op': 'remove'}])
+    flush_carts()
+    assert dict(CartItem.objects.filter(cart__user=buyer).values_list('product_id', 'quantity')) == {second.id: 4}
+
+
+def test_checkout_from_cached_cart(client, buyer, auth_headers, cart_cache, django_capture_on_commit_callbacks):
+    product = fill_cart(User.objects.create_user(username='other'), 1).items.get().product
+    add_to_cart(client, auth_headers, product, 2)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post('/api/orders/', **auth_headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()['items'][0]['quantity'] == 2
+    assert client.get('/api/cart/', **auth_headers).json()['item_count'] == 0
+
+    flush_carts()
+    assert not CartItem.objects.filter(cart__user=buyer).exists()
+
+
+def test_item_endpoints_see_cached_changes(client, buyer, auth_headers, cart_cache):
+    product = fill_cart(User.objects.create_user(username='other'), 1).items.get().product
+    add_to_cart(client, auth_headers, product, 2)
+
+    flush_carts()
+    item = CartItem.objects.get(cart__user=buyer)
+    assert client.get('/api/cart/', **auth_headers).json()['items'][0]['id'] == item.id
+
+    response = client.patch(f'/api/cart/items/{item.id}/', {'quantity': 5}, content_type='application/json', **auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert client.get('/api/cart/', **auth_headers).json()['items'][0]['quantity'] == 5
+
+    assert client.delete(f'/api/cart/items/{item.id}/', **auth_headers).status_code == status.HTTP_204_NO_CONTENT
+    assert client.get('/api/cart/', **auth_headers).json()['item_count'] == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_adds_to_a_cached_cart_are_all_counted(cart_cache):
+    buyer, product, results = add_concurrently(threads_count=8, adds_per_thread=5)
+
+    assert len(results) == 40
+    assert results.count(status.HTTP_201_CREATED) == 1
+    flush_carts()
+    assert CartItem.objects.get(cart__user=buyer, product=product).quantity == 40
+
+
+def test_failed_flush_keeps_the_cart_dirty(client, buyer, auth_headers, cart_cache, monkeypatch):
+    product = fill_cart(User.objects.create_user(username='other'), 1).items.get().product
+    add_to_cart(client, auth_headers, product, 2)
+
+    def fail(*args, **kwargs):
+        raise DatabaseError('database unavailable')
+
+    with monkeypatch.context() as patch:
+        patch.setattr('cart.store.upsert', fail)
+        flush_carts()
+    assert not CartItem.objects.filter(cart__user=buyer).exists()
+
+    flush_carts()
+    assert CartItem.objects.get(cart__user=buyer).quantity == 2
+    # Flushed carts are no longer listed
+    assert CacheCartStore().flush_dirty() == 0
+
+
+def test_cache_cart_store_needs_a_shared_cache(settings):
+    settings.CART_STORE = 'cache'
+    settings.CACHES = {**settings.CACHES, 'carts': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    assert [error.id for error in check_cart_store(None)] == ['cart.E002']
+
+    settings.CACHES = {**settings.CACHES, 'carts': {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                                                    'LOCATION': 'redis://localhost:6379/1'}}
+    assert check_cart_store(None) == []
+
+    settings.CART_STORE = 'redis'
+    assert [error.id for error in check_cart_store(None)] == ['cart.E001']
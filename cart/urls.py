@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from .views import CartItemAddView, UserCartView, CartItemViewSet
+from .views import CartBatchView, CartItemAddView, UserCartView, CartItemViewSet
 
 router = DefaultRouter()
 router.register(r'items', CartItemViewSet, basename='cartitem')
@@ -9,5 +9,7 @@ router.register(r'items', CartItemViewSet, basename='cartitem')
 urlpatterns = [
     path('', UserCartView.as_view(), name='user-cart'),
     path('items/', CartItemAddView.as_view(), name='cart-item-add'),
+    # Before the router, whose items/<pk>/ route would match 'batch'
+    path('items/batch/', CartBatchView.as_view(), name='cart-item-batch'),
     path('', include(router.urls)),
 ]
@@ -1,24 +1,32 @@
+import logging
+
 from dj_rest_auth.views import APIView
 
 from rest_framework.permissions import IsAuthenticated
 
 from rest_framework.response import Response 
 from rest_framework import status,  viewsets
-from cart.serializers import CartItemSerializer, CartSerializer
+from cart.serializers import CartBatchSerializer, CartItemSerializer, CartSerializer
 from .models import Cart, CartItem
-from django.db import transaction 
+from .fast_serializers import FastCartSerializer
+from .store import get_cart_store
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
 
 # helper function to get or create the user's cart
-def get_or_create_cart(user):
+def get_or_create_cart(user, queryset=None):
     """Gets the cart for the given user, creating one if it doesn't exist."""
-    cart, created = Cart.objects.get_or_create(user=user)
+    if queryset is None:
+        queryset = Cart.objects.all()
+    cart, created = queryset.get_or_create(user=user)
 
-    # Log
-    print(f"Cart for user {user.username} {'created' if created else 'fetched'}.")
+    logger.debug("Cart for user %s %s.", user.username, 'created' if created else 'fetched')
 
     return cart
 
+
 class UserCartView(APIView):
     """
     API endpoint to view the authenticated user's shopping cart.
@@ -28,9 +36,14 @@ class UserCartView(APIView):
 
     def get(self, request ):
         """Handles GET requests to view the user's cart."""
-        cart = get_or_create_cart(request.user)
-        serializer = CartSerializer(cart)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        store = get_cart_store()
+        if settings.FAST_READ_SERIALIZERS and not store.hot:
+            # No request, like CartSerializer(cart) below (image URLs stay relative)
+            data = FastCartSerializer().user_cart(request.user)
+        else:
+            data = CartSerializer(store.get_cart(request.user)).data
+        logger.debug("Cart for user %s loaded.", request.user.username)
+        return Response(data, status=status.HTTP_200_OK)
 
 class CartItemAddView(APIView):
     """
@@ -45,7 +58,6 @@ class CartItemAddView(APIView):
     def post(self, request ):
         """Handles POST requests to add a product to the cart."""
 
-        cart = get_or_create_cart(request.user)
         serializer = CartItemSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
@@ -56,27 +68,39 @@ class CartItemAddView(APIView):
         if quantity < 1:
             return Response({"quantity": "Quantity must be at least 1."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # logic to add/ update item
-        with transaction.atomic():
-            try:
-                # check if item already exists
-                cart_item = CartItem.objects.get(cart=cart, product__id=product_id)
+        # Insert the item or add to its quantity in one atomic step (a database
+        # upsert, or a locked update of the cached cart), so no concurrent add is lost.
+        cart_item, created = get_cart_store().add_item(request.user, serializer.validated_data['product'], quantity)
+        logger.debug("Cart item for product %s %s.", product_id, 'created' if created else 'updated')
 
-                # if item exists update its quantity
-                cart_item.quantity += quantity
-                cart_item.save()
+        response_serializer = CartItemSerializer(cart_item)
+        return Response(
+            response_serializer.data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_202_ACCEPTED
+        )
 
-                response_serializer = CartItemSerializer(cart_item)
+class CartBatchView(APIView):
+    """
+    API endpoint to apply several cart changes in one request, e.g. to merge
+    a guest cart on login.
+    Accepts POST requests with 'items': a list of {'product_id', 'quantity',
+    'op'} where op is 'add' (default, adds to the quantity in the cart),
+    'set' (replaces it) or 'remove'. Operations apply in order and the batch
+    is all-or-nothing. Returns the resulting cart.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = CartBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
 
-                return Response(response_serializer.data, status=status.HTTP_202_ACCEPTED)
-            
-            except CartItem.DoesNotExist:
-                # if doenst exist create a new cartItem
-                serializer.save(cart=cart)
+        store = get_cart_store()
+        store.apply(request.user, serializer.validated_data['items'])
+        logger.debug("Applied %d cart operations for user %s.", len(serializer.validated_data['items']), request.user.username)
 
-                response_serializer = CartItemSerializer(serializer.instance)
+        cart = store.get_cart(request.user)
+        return Response(CartSerializer(cart).data, status=status.HTTP_200_OK)
 
-                return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
 class CartItemViewSet(viewsets.ModelViewSet):
     """
@@ -87,9 +111,15 @@ class CartItemViewSet(viewsets.ModelViewSet):
     serializer_class = CartItemSerializer
     permission_classes = [IsAuthenticated]
 
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # These endpoints work on CartItem rows: write a cached cart back first
+        if request.user.is_authenticated:
+            get_cart_store().flush(request.user.pk)
+
     def get_queryset(self):
         cart = get_or_create_cart(self.request.user)
-        return CartItem.objects.filter(cart=cart)
+        return CartItem.objects.filter(cart=cart).select_related('product').with_subtotal()
 
     def perform_update(self, serializer):
         quantity = serializer.validated_data.get('quantity', serializer.instance.quantity)
@@ -97,6 +127,14 @@ class CartItemViewSet(viewsets.ModelViewSet):
         if quantity < 1:
            return Response({"quantity": "Quantity must be at least 1."}, status=status.HTTP_400_BAD_REQUEST)
         
-        serializer.save()
+        item = serializer.save()
+        # The subtotal annotated by get_queryset() predates the change
+        item.subtotal = item.product.price * item.quantity
+        # Reload a cached cart from the database on its next use
+        get_cart_store().discard(self.request.user.pk)
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        get_cart_store().discard(self.request.user.pk)
 
 
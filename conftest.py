@@ -0,0 +1,57 @@
+import pytest
+from django.core.cache import caches
+
+from ecommerce_backend.query_detector import queries_flagged
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers',
+        'query_budget(repeat_threshold=None, slow_query_ms=None): thresholds for the query_detector fixture',
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """
+    Cache entries outlive the per-test database rollback, so start every test
+    with empty caches.
+    """
+    for cache in caches.all():
+        cache.clear()
+    yield
+
+
+@pytest.fixture
+def query_detector(request, settings):
+    """
+    Fails the test when a request it makes runs N+1 queries, or slow queries
+    when the test settings or a query_budget marker set slow_query_ms (see
+    ecommerce_backend.query_detector). Yields the list of flagged problems.
+    """
+    marker = request.node.get_closest_marker('query_budget')
+    if marker is not None:
+        if marker.kwargs.get('repeat_threshold') is not None:
+            settings.QUERY_DETECTOR_REPEAT_THRESHOLD = marker.kwargs['repeat_threshold']
+        if marker.kwargs.get('slow_query_ms') is not None:
+            settings.QUERY_DETECTOR_SLOW_QUERY_MS = marker.kwargs['slow_query_ms']
+    settings.QUERY_DETECTOR_ENABLED = True
+
+    flagged = request.node.flagged_queries = []
+
+    def collect(sender, view, request, problems, **kwargs):
+        flagged.extend((view, problem) for problem in problems)
+
+    queries_flagged.connect(collect, weak=False)
+    yield flagged
+    queries_flagged.disconnect(collect)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    # Report query problems as a failure of the test itself, not of its teardown
+    result = yield
+    flagged = getattr(item, 'flagged_queries', None)
+    if flagged:
+        pytest.fail('\n\n'.join(f'{view}: {problem.describe()}' for view, problem in flagged), pytrace=False)
+    return result
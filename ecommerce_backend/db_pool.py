@@ -0,0 +1,53 @@
+"""
+Metrics of the psycopg connection pools configured in DATABASES (OPTIONS
+'pool'), for the metrics endpoint. Each server process has its own pools.
+"""
+from django.db import connections
+
+# Keys of psycopg_pool's get_stats(). The gauges describe the pool now; the
+# other values are counters since the pool was opened.
+DESCRIPTIONS = {
+    'pool_min': ('gauge', 'Minimum number of connections in the pool.'),
+    'pool_max': ('gauge', 'Maximum number of connections in the pool.'),
+    'pool_size': ('gauge', 'Connections currently managed by the pool (in use or idle).'),
+    'pool_available': ('gauge', 'Idle connections ready to be handed out.'),
+    'requests_waiting': ('gauge', 'Requests waiting for a connection.'),
+    'requests_num': ('counter', 'Connection requests made to the pool.'),
+    'requests_queued': ('counter', 'Connection requests that had to wait.'),
+    'requests_wait_ms': ('counter', 'Total time spent waiting for a connection.'),
+    'requests_errors': ('counter', 'Connection requests that failed (e.g. timed out).'),
+    'returns_bad': ('counter', 'Connections returned to the pool in a bad state.'),
+    'connections_num': ('counter', 'Connection attempts made by the pool.'),
+    'connections_ms': ('counter', 'Total time spent establishing connections.'),
+    'connections_errors': ('counter', 'Failed connection attempts.'),
+    'connections_lost': ('counter', 'Connections found broken by health checks.'),
+    'usage_ms': ('counter', 'Total time connections were in use by the application.'),
+}
+
+
+def pool_stats():
+    """
+    {alias: psycopg_pool stats} of the pooled databases.
+    """
+    stats = {}
+    for alias in connections:
+        connection = connections[alias]
+        if connection.vendor == 'postgresql' and connection.settings_dict['OPTIONS'].get('pool'):
+            stats[alias] = connection.pool.get_stats()
+    return stats
+
+
+def prometheus(stats):
+    """
+    The stats in the Prometheus text exposition format, labelled by alias.
+    """
+    lines = []
+    for key in sorted({key for values in stats.values() for key in values}):
+        kind, description = DESCRIPTIONS.get(key, ('gauge', key.replace('_', ' ').capitalize() + '.'))
+        metric = f'db_pool_{key}' + ('_total' if kind == 'counter' else '')
+        lines.append(f'# HELP {metric} {description}')
+        lines.append(f'# TYPE {metric} {kind}')
+        for alias, values in sorted(stats.items()):
+            if key in values:
+                lines.append(f'{metric}{{alias="{alias}"}} {values[key]}')
+    return ''.join(f'{line}\n' for line in lines)
@@ -0,0 +1,45 @@
+"""
+Logging helpers referenced from the LOGGING setting.
+"""
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
+class StartedQueueListener(QueueListener):
+    """
+    QueueListener that starts as soon as it is built and is stopped (flushing
+    queued records) at interpreter exit.
+
+    Request threads only put records on the queue; formatting the output and
+    writing to stdout happens on the listener's thread.
+    """
+
+    def __init__(self, queue, *handlers, respect_handler_level=False):
+        super().__init__(queue, *handlers, respect_handler_level=respect_handler_level)
+        self.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        # Safe to call again at exit after an explicit stop
+        if self._thread is not None:
+            super().stop()
+
+
+def queue_handler(format, stream=None):
+    """
+    Handler factory for dictConfig ('()' key): a QueueHandler feeding a
+    StartedQueueListener that writes formatted records to `stream` (stderr by
+    default).
+
+    The 'handlers' and 'listener' dictConfig keys that wire this up natively
+    only exist on Python 3.12+, so the pair is built here instead.
+    """
+    console = logging.StreamHandler(stream)
+    console.setFormatter(logging.Formatter(format))
+
+    records = queue.SimpleQueue()
+    handler = QueueHandler(records)
+    handler.listener = StartedQueueListener(records, console, respect_handler_level=True)
+    return handler
@@ -0,0 +1,228 @@
+"""
+Per-view request profiling.
+
+ProfilingMiddleware times every request and attributes it to the view that
+handled it (e.g. 'ProductViewSet.list', 'OrderListCreateView.create'). For
+each request it records:
+
+- total wall time,
+- number and total time of the database queries (through
+  connection.execute_wrapper, on every configured database),
+- time spent rendering the response (DRF's JSON rendering; the work done by
+  serializer.data inside the view counts towards the view),
+- response size in bytes.
+
+The numbers are sent back in a Server-Timing header and kept in memory: a
+count and sum per metric plus the last PROFILING_WINDOW samples per view,
+from which percentiles are computed when the metrics endpoint is scraped.
+Recording a request is a few perf_counter() calls and a deque append, so
+the middleware stays on in production. Like the catalog cache stats, the
+numbers are per server process.
+"""
+import contextlib
+import math
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import connections
+
+# Actions of the generic views, which have no action mapping of their own
+GENERIC_ACTIONS = {
+    'post': 'create',
+    'put': 'update',
+    'patch': 'partial_update',
+    'delete': 'destroy',
+}
+
+# Name, help text and scale (from the recorded unit, ms, to the exported one)
+# of each metric, in the order of the sample tuples
+METRICS = [
+    ('http_view_duration_seconds', 'Wall time of the request.', 1e-3),
+    ('http_view_db_duration_seconds', 'Time spent in database queries.', 1e-3),
+    ('http_view_db_queries', 'Number of database queries.', 1),
+    ('http_view_render_duration_seconds', 'Time spent rendering the response.', 1e-3),
+    ('http_view_response_size_bytes', 'Size of the response body.', 1),
+]
+
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+def view_name(request):
+    """
+    'ViewClass.action' for the view that handled the request, or the dotted
+    path of a function view.
+    """
+    match = request.resolver_match
+    if match is None:
+        return '<unresolved>'
+    view = getattr(match.func, 'cls', None) or getattr(match.func, 'view_class', None)
+    if view is None:
+        return match._func_path
+
+    method = request.method.lower()
+    if method == 'head':
+        method = 'get'
+    # ViewSets: as_view() was given the method -> action mapping
+    action = (getattr(match.func, 'actions', None) or {}).get(method)
+    if action is None:
+        if method == 'get':
+            action = 'list' if hasattr(view, 'list') else 'retrieve' if hasattr(view, 'retrieve') else method
+        else:
+            action = GENERIC_ACTIONS.get(method, method)
+            if not hasattr(view, action):
+                action = method
+    return f'{view.__name__}.{action}'
+
+
+def percentile(ordered, q):
+    # Nearest rank on already sorted values
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+class ViewStats:
+    def __init__(self, window):
+        self.count = 0
+        self.sums = [0] * len(METRICS)
+        self.samples = deque(maxlen=window)
+
+
+class ProfileStats:
+    """
+    Rolling per-view request metrics for this server process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view, sample):
+        with self._lock:
+            stats = self._views.get(view)
+            if stats is None:
+                stats = self._views[view] = ViewStats(settings.PROFILING_WINDOW)
+            stats.count += 1
+            for index, value in enumerate(sample):
+                stats.sums[index] += value
+            stats.samples.append(sample)
+
+    def snapshot(self):
+        """
+        {view: {metric: {'count', 'sum', 'quantiles': {q: value}}}}, with
+        the values in the metric's unit (seconds, queries, bytes).
+        """
+        with self._lock:
+            views = {
+                view: (stats.count, list(stats.sums), list(stats.samples))
+                for view, stats in self._views.items()
+            }
+
+        result = {}
+        for view, (count, sums, samples) in views.items():
+            result[view] = {}
+            for index, (metric, help_text, scale) in enumerate(METRICS):
+                ordered = sorted(sample[index] for sample in samples)
+                result[view][metric] = {
+                    'count': count,
+                    'sum': sums[index] * scale,
+                    'quantiles': {q: percentile(ordered, q) * scale for q in QUANTILES} if ordered else {},
+                }
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def prometheus(self):
+        """
+        The snapshot in the Prometheus text exposition format, one summary
+        per metric labelled by view.
+        """
+        snapshot = self.snapshot()
+        lines = []
+        for metric, help_text, scale in METRICS:
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} summary')
+            for view in sorted(snapshot):
+                values = snapshot[view][metric]
+                label = f'view="{escape_label(view)}"'
+                for q, value in values['quantiles'].items():
+                    lines.append(f'{metric}{{{label},quantile="{q}"}} {value:.6g}')
+                lines.append(f'{metric}_sum{{{label}}} {values["sum"]:.6g}')
+                lines.append(f'{metric}_count{{{label}}} {values["count"]}')
+        return '\n'.join(lines) + '\n'
+
+
+def escape_label(value):
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+profile_stats = ProfileStats()
+
+
+class RequestProfile:
+    """
+    Timings of one request; also the execute_wrapper counting its queries.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_start = None
+        self.render_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+    def rendered(self, response):
+        self.render_time = time.perf_counter() - self.render_start
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Records the per-view metrics described above and adds a Server-Timing
+    header. Goes first in MIDDLEWARE so the total covers the whole stack.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.PROFILING_ENABLED:
+            return self.get_response(request)
+
+        profile = request._profile = RequestProfile()
+        start = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile))
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        size = len(response.content) if not response.streaming else 0
+        profile_stats.record(view_name(request), (
+            total * 1000, profile.db_time * 1000, profile.queries, profile.render_time * 1000, size,
+        ))
+
+        if settings.PROFILING_SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'total;dur={total * 1000:.2f}, '
+                f'db;dur={profile.db_time * 1000:.2f};desc="{profile.queries} queries", '
+                f'render;dur={profile.render_time * 1000:.2f}'
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns; time that step
+        profile = getattr(request, '_profile', None)
+        if profile is not None:
+            profile.render_start = time.perf_counter()
+            response.add_post_render_callback(profile.rendered)
+        return response
@@ -0,0 +1,166 @@
+"""
+Detection of N+1 and slow queries.
+
+QueryDetector is a database execute_wrapper that groups the queries it sees
+by their structure (the SQL with placeholder lists collapsed and literals
+removed, so 'WHERE id = 1' and 'WHERE id = 2' are the same query) and
+flags:
+
+- repeated queries: the same structure run at least `repeat_threshold`
+  times, typically a serializer looking up a relation once per row;
+- slow queries: a single execution over `slow_query_ms`.
+
+Each problem carries the stack (project frames only) of the query that
+first made it a problem.
+
+QueryDetectorMiddleware runs a detector around every request when
+QUERY_DETECTOR_ENABLED is set (e.g. on staging), logs the problems with the
+offending view and sends the queries_flagged signal. The query_detector
+pytest fixture (see conftest.py) turns the same checks into test failures.
+"""
+import contextlib
+import logging
+import re
+import time
+import traceback
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.dispatch import Signal
+
+from .profiling import view_name
+
+logger = logging.getLogger(__name__)
+
+# Sent by the middleware with view (its name), request and problems
+queries_flagged = Signal()
+
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+
+# Transaction bookkeeping repeats by design
+IGNORED = re.compile(r'^\s*(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT|BEGIN|COMMIT|ROLLBACK)\b', re.I)
+
+PLACEHOLDER_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """
+    The structure of a query: equal for queries that only differ in their
+    parameters, literals or IN (...) list lengths.
+    """
+    sql = PLACEHOLDER_LIST.sub('(%s...)', sql)
+    sql = STRING_LITERAL.sub('?', sql)
+    sql = NUMBER_LITERAL.sub('?', sql)
+    return WHITESPACE.sub(' ', sql).strip()
+
+
+def project_stack():
+    # Frames of our own code, without this module and the installed packages
+    return [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(PROJECT_ROOT)
+        and 'site-packages' not in frame.filename
+        and frame.filename != __file__
+    ]
+
+
+@dataclass
+class QueryProblem:
+    kind: str  # 'repeated' or 'slow'
+    sql: str
+    count: int = 1
+    duration_ms: float = 0.0
+    stack: list = field(default_factory=list, repr=False)
+
+    def describe(self):
+        if self.kind == 'repeated':
+            summary = f'{self.count} structurally identical queries: {self.sql}'
+        else:
+            summary = f'Query took {self.duration_ms:.1f} ms: {self.sql}'
+        return summary + '\n' + ''.join(traceback.format_list(self.stack))
+
+
+class QueryDetector:
+    """
+    Records the queries run on every configured database while active:
+
+        with QueryDetector() as detector:
+            ...
+        detector.problems
+
+    Thresholds default to QUERY_DETECTOR_REPEAT_THRESHOLD and
+    QUERY_DETECTOR_SLOW_QUERY_MS; a slow_query_ms of None skips the slow
+    query check.
+    """
+
+    def __init__(self, repeat_threshold=None, slow_query_ms=None):
+        self.repeat_threshold = repeat_threshold or settings.QUERY_DETECTOR_REPEAT_THRESHOLD
+        self.slow_query_ms = slow_query_ms if slow_query_ms is not None else settings.QUERY_DETECTOR_SLOW_QUERY_MS
+        self.counts = {}
+        self.repeated = {}
+        self.slow = []
+        self._stack = None
+
+    def __enter__(self):
+        self._stack = contextlib.ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record(sql, (time.perf_counter() - start) * 1000)
+
+    def record(self, sql, duration_ms):
+        if IGNORED.match(sql):
+            return
+        key = fingerprint(sql)
+        count = self.counts[key] = self.counts.get(key, 0) + 1
+        if count == self.repeat_threshold:
+            # The stack is only captured once a query becomes a problem
+            self.repeated[key] = QueryProblem('repeated', key, count, stack=project_stack())
+        elif count > self.repeat_threshold:
+            self.repeated[key].count = count
+        if self.slow_query_ms is not None and duration_ms > self.slow_query_ms:
+            self.slow.append(QueryProblem('slow', sql, duration_ms=duration_ms, stack=project_stack()))
+
+    @property
+    def problems(self):
+        return [*self.repeated.values(), *self.slow]
+
+
+class QueryDetectorMiddleware:
+    """
+    Runs a QueryDetector around each request when QUERY_DETECTOR_ENABLED is
+    set and logs the problems found with the view that caused them.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.QUERY_DETECTOR_ENABLED:
+            return self.get_response(request)
+
+        with QueryDetector() as detector:
+            response = self.get_response(request)
+
+        problems = detector.problems
+        if problems:
+            view = view_name(request)
+            for problem in problems:
+                logger.warning('%s %s: %s', request.method, view, problem.describe())
+            queries_flagged.send(sender=self.__class__, view=view, request=request, problems=problems)
+        return response
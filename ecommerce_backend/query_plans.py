@@ -0,0 +1,198 @@
+"""
+EXPLAIN checks for the queries behind the API views, used by the
+check_query_plans management command.
+
+Each canonical query is built the way its view builds it and explained on the
+target database. A full table scan of a table holding more than a threshold of
+rows is reported, so a dropped or unusable index fails the check instead of
+surfacing as a slow endpoint.
+"""
+import re
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connections
+
+# "SCAN products_product" (or "SCAN TABLE products_product" before SQLite 3.36);
+# index scans read "SCAN products_product USING INDEX ...".
+SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?(?P<table>\w+)$')
+
+
+class QueryPlanError(Exception):
+    """
+    Raised when the query plans cannot be checked on a database.
+    """
+
+
+@dataclass
+class SeqScan:
+    table: str
+    rows: int
+
+
+@dataclass
+class PlanReport:
+    name: str
+    sql: str
+    plan: list
+    seq_scans: list
+
+    def failures(self, max_rows):
+        return [scan for scan in self.seq_scans if scan.rows > max_rows]
+
+
+def sample_value(queryset, field):
+    # Plans hardly depend on the looked-up value, but use a real one when there is one
+    return queryset.exclude(**{f'{field}__isnull': True}).values_list(field, flat=True).first() or 0
+
+
+def product_queries(using):
+    from products.models import Product
+    from products.pagination import KeysetPagination
+
+    page = settings.PRODUCT_PAGE_SIZE + 1
+    products = Product.objects.using(using).order_by(*KeysetPagination.ordering)
+    pagination = KeysetPagination()
+    pagination.current_ordering = KeysetPagination.ordering
+    after = pagination.get_position_filter('m', 0, reverse=False)
+
+    seller_id = sample_value(Product.objects.using(using), 'seller_id')
+    category_id = sample_value(Product.objects.using(using), 'category_id')
+    return {
+        # ProductViewSet.list, anonymous
+        'products.list': products[:page],
+        'products.list.next_page': products.filter(after)[:page],
+        # ProductViewSet.list, authenticated seller
+        'products.list.seller': products.filter(seller_id=seller_id)[:page],
+        'products.list.seller.next_page': products.filter(after, seller_id=seller_id)[:page],
+        # ProductViewSet.list?category=
+        'products.list.category': products.filter(category_id=category_id)[:page],
+    }
+
+
+def order_queries(using):
+    from orders.models import Order
+
+    user_id = sample_value(Order.objects.using(using), 'user_id')
+    return {
+        # OrderListCreateView.get_queryset
+        'orders.list': Order.objects.using(using).filter(user_id=user_id).order_by('-created_at'),
+    }
+
+
+def cart_queries(using):
+    from cart.models import CartItem
+
+    cart_id = sample_value(CartItem.objects.using(using), 'cart_id')
+    return {
+        # UserCartView / cart serializer prefetch of the cart's items
+        'cart.items': CartItem.objects.using(using).filter(cart_id=cart_id).select_related('product').order_by('created_at'),
+    }
+
+
+def report_queries(using):
+    import datetime
+    from reports.models import ProductDailySales, SellerDailySales
+
+    seller_id = sample_value(SellerDailySales.objects.using(using), 'seller_id')
+    days = (datetime.date.today() - datetime.timedelta(days=29), datetime.date.today())
+    return {
+        # SalesReportView ?by=day and the dashboard summary
+        'reports.sales.by_day': SellerDailySales.objects.using(using).filter(seller_id=seller_id, day__range=days).order_by('day'),
+        # SalesReportView ?by=product
+        'reports.sales.by_product': ProductDailySales.objects.using(using).filter(seller_id=seller_id, day__range=days),
+    }
+
+
+# Builders of {name: queryset}; extend this list when a view gains a new hot query
+CANONICAL_QUERIES = [product_queries, order_queries, cart_queries, report_queries]
+
+
+def get_canonical_queries(using):
+    queries = {}
+    for builder in CANONICAL_QUERIES:
+        queries.update(builder(using))
+    return queries
+
+
+def count_rows(connection, table, cache):
+    if table not in cache:
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}')
+            cache[table] = cursor.fetchone()[0]
+    return cache[table]
+
+
+def explain_postgresql(connection, sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+
+    lines, tables = [], []
+
+    def walk(node, depth):
+        label = node['Node Type']
+        if 'Relation Name' in node:
+            label += f" on {node['Relation Name']}"
+        if 'Index Name' in node:
+            label += f" using {node['Index Name']}"
+        lines.append(f"{'  ' * depth}{label} (rows={node.get('Plan Rows')})")
+        if node['Node Type'] == 'Seq Scan':
+            tables.append(node['Relation Name'])
+        for child in node.get('Plans', []):
+            walk(child, depth + 1)
+
+    walk(plan[0]['Plan'], 0)
+    return lines, tables
+
+
+def explain_sqlite(connection, sql, params, alias_map):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        rows = cursor.fetchall()
+
+    lines, tables = [], []
+    for row in rows:
+        detail = row[-1]
+        lines.append(detail)
+        match = SQLITE_SCAN.match(detail)
+        if match:
+            table = match['table']
+            # Subqueries refer to tables by alias (U0, T2, ...)
+            if table in alias_map:
+                table = alias_map[table].table_name
+            tables.append(table)
+    return lines, tables
+
+
+def explain(name, queryset, row_counts=None):
+    """
+    Explains `queryset` on its database and returns a PlanReport listing the
+    sequentially scanned tables with their row counts.
+    """
+    connection = connections[queryset.db]
+    sql, params = queryset.query.get_compiler(using=queryset.db).as_sql()
+    row_counts = {} if row_counts is None else row_counts
+
+    if connection.vendor == 'postgresql':
+        lines, tables = explain_postgresql(connection, sql, params)
+    elif connection.vendor == 'sqlite':
+        lines, tables = explain_sqlite(connection, sql, params, queryset.query.alias_map)
+    else:
+        raise QueryPlanError(
+            f"Query plan checks support PostgreSQL and SQLite; database '{queryset.db}' is {connection.display_name}."
+        )
+
+    seq_scans = [SeqScan(table, count_rows(connection, table, row_counts)) for table in tables]
+    return PlanReport(name=name, sql=sql % tuple(repr(p) for p in params), plan=lines, seq_scans=seq_scans)
+
+
+def check_query_plans(using='default'):
+    """
+    Explains every canonical query; returns a list of PlanReports.
+    """
+    row_counts = {}
+    return [
+        explain(name, queryset, row_counts)
+        for name, queryset in get_canonical_queries(using).items()
+    ]
@@ -0,0 +1,65 @@
+"""
+JSON renderer built on orjson, falling back to DRF's stdlib JSONRenderer
+when orjson is not installed.
+
+orjson serializes datetimes, dates, times and UUIDs natively; Decimals,
+lazy strings and the other types DRF's JSONEncoder knows are passed to that
+encoder, so the output matches JSONRenderer's (compact, UTF-8, datetimes
+in UTC with a 'Z' suffix, Decimals as numbers, U+2028/U+2029 escaped).
+Indented output (e.g. for the browsable API), anything orjson rejects and
+data with NaN or infinite floats, which orjson writes as null where the
+stdlib refuses them (STRICT_JSON), are rendered by the stdlib.
+"""
+import math
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_encoder = JSONEncoder()
+
+
+def default(obj):
+    # Types orjson does not handle natively: Decimal, lazy strings, querysets...
+    return _encoder.default(obj)
+
+
+def has_non_finite_floats(data):
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=default, option=OPTIONS)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits: let the stdlib decide
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Only look for the floats orjson turned into null when there is one
+        if self.strict and b'null' in ret and has_non_finite_floats(data):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped like JSONRenderer does, as they end lines in JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -0,0 +1,139 @@
+"""
+Read-replica routing.
+
+With DATABASE_REPLICAS configured, ReplicaRouter sends reads to one of the
+replicas (picked at random) and writes to 'default'. Reads stay on the
+primary:
+
+- inside a transaction on the primary (checkout, imports, get_or_create),
+  which must see its own writes and the rows it locked;
+- for the whole of an unsafe (POST, PUT, PATCH, DELETE) request;
+- for REPLICA_STICKY_SECONDS after a client's last unsafe request, so it
+  reads its own writes despite replication lag (PrimaryAfterWriteMiddleware);
+- within `with use_primary():`;
+- for sessions, which are read on the request right after the login that
+  wrote them.
+
+Related objects are read from the database their instance came from.
+Without replicas, everything goes to 'default'.
+"""
+import contextlib
+import contextvars
+import random
+import time
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+PIN_COOKIE = 'primary_pin'
+
+_use_primary = contextvars.ContextVar('use_primary', default=False)
+
+
+@contextlib.contextmanager
+def use_primary():
+    """
+    Routes the reads made inside the block to the primary.
+    """
+    token = _use_primary.set(True)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or _use_primary.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if model._meta.app_label == 'sessions':
+            return DEFAULT_DB_ALIAS
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+def pin_key(request):
+    """
+    Cache key identifying the client's user: the one named by its JWT
+    (validated, not loaded) or logged in to its session. None for anonymous
+    clients, and for invalid tokens, which the view will reject anyway.
+    """
+    user_id = request.session.get(SESSION_KEY) if hasattr(request, 'session') else None
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header:
+        try:
+            raw_token = authentication.get_raw_token(header)
+            if raw_token is not None:
+                user_id = authentication.get_validated_token(raw_token)[jwt_settings.USER_ID_CLAIM]
+        except (AuthenticationFailed, KeyError):
+            return None
+    if user_id is None:
+        return None
+    return f'primary:{user_id}'
+
+
+def pinned_by_cookie(request):
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class PrimaryAfterWriteMiddleware:
+    """
+    Reads from the primary during unsafe requests and, for
+    REPLICA_STICKY_SECONDS afterwards, during the same client's requests.
+
+    A client is recognised by its user, so the pin survives a refreshed JWT
+    and holds across devices, and by a cookie set on the write, which also
+    covers writes made before the client has a user (registration, login).
+    The user pins live in the 'replica_pins' cache, which must be shared
+    between workers.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        pins = caches['replica_pins']
+        key = pin_key(request)
+        unsafe = request.method not in SAFE_METHODS
+        if unsafe or pinned_by_cookie(request) or (key is not None and pins.get(key) is not None):
+            with use_primary():
+                response = self.get_response(request)
+        else:
+            response = self.get_response(request)
+
+        if unsafe:
+            sticky = settings.REPLICA_STICKY_SECONDS
+            # Again, as the request may have logged the client in to a session
+            key = pin_key(request)
+            if key is not None:
+                pins.set(key, True, sticky)
+            # The expiry is the value, for clients that keep expired cookies
+            response.set_cookie(PIN_COOKIE, str(time.time() + sticky), max_age=sticky,
+                                secure=request.is_secure(), httponly=True, samesite='Lax')
+        return response
@@ -1,3 +1,4 @@
+import logging
 import os
 
 # Get the DJANGO_ENV environment variable, default to 'development' if not set
@@ -5,11 +6,11 @@ SETTINGS_MODULE = os.environ.get('DJANGO_ENV', 'development')
 
 if SETTINGS_MODULE == 'production':
     from .production import *
-    print("Loading production settings...")
 elif SETTINGS_MODULE == 'development':
     from .local import *
-    print("Loading local development settings...")
 else:
     # Fallback to local settings if DJANGO_ENV is set to something unexpected
     from .local import *
-    print(f"WARNING: Unknown DJANGO_ENV '{SETTINGS_MODULE}'. Loading local development settings.")
+    logging.getLogger(__name__).warning(
+        "Unknown DJANGO_ENV '%s'. Loading local development settings.", SETTINGS_MODULE
+    )
@@ -52,6 +52,8 @@ INSTALLED_APPS = [
     'products.apps.ProductsConfig',
     'cart.apps.CartConfig',
     'orders.apps.OrdersConfig',
+    'jobs.apps.JobsConfig',
+    'reports.apps.ReportsConfig',
 
     # image hosting cloudinary
     'cloudinary_storage',
@@ -59,6 +61,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the rest of the stack (see ecommerce_backend.profiling)
+    'ecommerce_backend.profiling.ProfilingMiddleware',
+    'ecommerce_backend.query_detector.QueryDetectorMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     "corsheaders.middleware.CorsMiddleware",
@@ -66,6 +71,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # After the session middleware: clients are also recognised by their session
+    'ecommerce_backend.routers.PrimaryAfterWriteMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
@@ -104,6 +111,97 @@ DATABASES = {
     "default": env.db("DATABASE_URL", default="sqlite:///db.sqlite3")
 }
 
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # Take the write lock when a transaction begins, so concurrent writers wait
+    # on the busy timeout instead of failing with "database is locked".
+    DATABASES['default'].setdefault('OPTIONS', {}).setdefault('transaction_mode', 'IMMEDIATE')
+    # The in-memory test database uses shared-cache table locks, which are never
+    # retried; a file lets concurrency tests behave like a real server.
+    DATABASES['default'].setdefault('TEST', {}).setdefault('NAME', 'test_db.sqlite3')
+
+# Read replicas (see ecommerce_backend.routers): DATABASE_REPLICA_URLS lists
+# their URLs, which become the 'replica1', 'replica2', ... databases. Reads go
+# to a replica, except during and for REPLICA_STICKY_SECONDS after a client's
+# writes. Tests run the replicas against the test database.
+for index, url in enumerate(env.list('DATABASE_REPLICA_URLS', default=[]), start=1):
+    DATABASES[f'replica{index}'] = {**env.db_url_config(url), 'TEST': {'MIRROR': 'default'}}
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['ecommerce_backend.routers.ReplicaRouter']
+REPLICA_STICKY_SECONDS = env.int('REPLICA_STICKY_SECONDS', default=10)
+
+for database in DATABASES.values():
+    if database['ENGINE'] != 'django.db.backends.postgresql':
+        continue
+    # Connection reuse. With DB_POOL (the default) each process keeps a psycopg
+    # pool per database of DB_POOL_MIN_SIZE..DB_POOL_MAX_SIZE connections; a request waits up to
+    # DB_POOL_TIMEOUT seconds for one. Size it per process: every gunicorn worker
+    # (and the run_jobs/flush_carts commands) has its own pool. Without the pool,
+    # DB_CONN_MAX_AGE keeps one persistent connection per thread (0 reconnects on
+    # every request). DB_HEALTH_CHECKS pings a reused connection before handing it
+    # out, at the cost of a round trip.
+    database['CONN_HEALTH_CHECKS'] = env.bool('DB_HEALTH_CHECKS', default=True)
+    if env.bool('DB_POOL', default=True):
+        database['CONN_MAX_AGE'] = 0  # Pooled connections go back to the pool
+        database.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': env.int('DB_POOL_MIN_SIZE', default=2),
+            'max_size': env.int('DB_POOL_MAX_SIZE', default=10),
+            'timeout': env.float('DB_POOL_TIMEOUT', default=10.0),
+            # Recycle connections, so restarts and failovers are picked up
+            'max_idle': env.float('DB_POOL_MAX_IDLE', default=600.0),
+            'max_lifetime': env.float('DB_POOL_MAX_LIFETIME', default=3600.0),
+        }
+    else:
+        database['CONN_MAX_AGE'] = env.int('DB_CONN_MAX_AGE', default=60)
+
+# Caches. The 'catalog' alias holds serialized product/category payloads
+# (see products.cache); set CATALOG_CACHE_URL=redis://... to share it between workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'catalog': env.cache('CATALOG_CACHE_URL', default='locmemcache://catalog'),
+    'carts': env.cache('CART_CACHE_URL', default='locmemcache://carts'),
+    # Clients reading from the primary after a write (see ecommerce_backend.routers)
+    'replica_pins': env.cache('REPLICA_PIN_CACHE_URL', default='locmemcache://replica-pins'),
+}
+CATALOG_CACHE_TIMEOUT = env.int('CATALOG_CACHE_TIMEOUT', default=300)
+
+# Cart storage (see cart.store). 'database' writes every cart change to the
+# database; 'cache' keeps carts in the 'carts' cache and writes them behind with
+# the flush_carts command. The cache must be shared between workers (Redis; a
+# system check rejects local memory) and keep carts for longer than the flush
+# interval.
+CART_STORE = env('CART_STORE', default='database')
+CART_STORE_TIMEOUT = env.int('CART_STORE_TIMEOUT', default=7 * 24 * 3600)
+
+# Logging. Each app logs to its own logger (logging.getLogger(__name__)).
+# Records go through a QueueHandler so request threads never block on stdout;
+# a background listener formats and writes them. Request hot paths log at
+# DEBUG, which is skipped entirely at the default INFO level.
+LOG_LEVEL = env('DJANGO_LOG_LEVEL', default='INFO')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'queue': {
+            '()': 'ecommerce_backend.log.queue_handler',
+            'format': 'time=%(asctime)s level=%(levelname)s logger=%(name)s pid=%(process)d msg="%(message)s"',
+        },
+    },
+    'root': {
+        'handlers': ['queue'],
+        'level': 'WARNING',
+    },
+    'loggers': {
+        'ecommerce_backend': {'level': LOG_LEVEL},
+        'accounts': {'level': LOG_LEVEL},
+        'products': {'level': LOG_LEVEL},
+        'cart': {'level': LOG_LEVEL},
+        'orders': {'level': LOG_LEVEL},
+    },
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -148,8 +246,60 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated', # Adjust per view if needed
     ),
+    # orjson-backed JSON (stdlib fallback when orjson is missing); see ecommerce_backend.renderers
+    'DEFAULT_RENDERER_CLASSES': (
+        'ecommerce_backend.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'ecommerce_backend.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
+# Keyset pagination for the product listing (see products.pagination).
+# Clients may ask for a smaller or larger page with ?page_size=, capped at the max.
+PRODUCT_PAGE_SIZE = env.int('PRODUCT_PAGE_SIZE', default=20)
+PRODUCT_MAX_PAGE_SIZE = env.int('PRODUCT_MAX_PAGE_SIZE', default=100)
+
+# Build product, cart and order list responses straight from .values() rows
+# (see products.fast_serializers) instead of through the DRF serializers.
+FAST_READ_SERIALIZERS = env.bool('FAST_READ_SERIALIZERS', default=False)
+
+# Per-view request profiling (see ecommerce_backend.profiling): timings are
+# kept for the last PROFILING_WINDOW requests of each view and scraped from
+# /api/metrics/. PROFILING_SERVER_TIMING adds them to responses as a
+# Server-Timing header; it exposes query counts and timings to every client,
+# so it is only on by default in development.
+PROFILING_ENABLED = env.bool('PROFILING_ENABLED', default=True)
+PROFILING_WINDOW = env.int('PROFILING_WINDOW', default=1000)
+PROFILING_SERVER_TIMING = env.bool('PROFILING_SERVER_TIMING', default=False)
+
+# N+1 and slow query detection (see ecommerce_backend.query_detector). When
+# enabled (e.g. on staging), requests running one query structure at least
+# QUERY_DETECTOR_REPEAT_THRESHOLD times, or a query slower than
+# QUERY_DETECTOR_SLOW_QUERY_MS (None turns the check off), are logged with a
+# stack trace. Tests using the query_detector fixture fail on the same
+# conditions.
+QUERY_DETECTOR_ENABLED = env.bool('QUERY_DETECTOR_ENABLED', default=False)
+QUERY_DETECTOR_REPEAT_THRESHOLD = env.int('QUERY_DETECTOR_REPEAT_THRESHOLD', default=3)
+QUERY_DETECTOR_SLOW_QUERY_MS = env.float('QUERY_DETECTOR_SLOW_QUERY_MS', default=100.0)
+
+# Products with at most this many units left count as low stock on the seller dashboard.
+SELLER_LOW_STOCK_THRESHOLD = env.int('SELLER_LOW_STOCK_THRESHOLD', default=5)
+
+# Idempotency-Key support for checkout (see orders.idempotency): how long a
+# key's response is kept for replay, and how long a retry waits for the first
+# request with the same key to finish.
+IDEMPOTENCY_KEY_TTL = env.int('IDEMPOTENCY_KEY_TTL', default=24 * 3600)
+IDEMPOTENCY_WAIT = env.float('IDEMPOTENCY_WAIT', default=10.0)
+
+# Background jobs (see jobs.worker). A Running job that has not reported
+# progress for JOB_STALE_SECONDS is taken to belong to a worker that died, and
+# is failed by the next worker poll.
+JOB_STALE_SECONDS = env.int('JOB_STALE_SECONDS', default=15 * 60)
+
 REST_AUTH = {
     'USE_JWT': True,
     # Set JWT cookie settings to
@@ -10,6 +10,9 @@ ALLOWED_HOSTS = ['localhost', '127.0.0.1', '[::1]'] # Added IPv6 localhost
 # If you comment this out, it will use the default from base.py, which is sqlite.
 # If you want to use a local PostgreSQL for local dev, ensure DATABASE_URL is set in your .env.
 
+# Send request timings back in a Server-Timing header (browser dev tools)
+PROFILING_SERVER_TIMING = env.bool('PROFILING_SERVER_TIMING', default=True)
+
 # CORS settings for local frontend
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000", # Next.js frontend local dev server
@@ -30,6 +33,7 @@ CSRF_TRUSTED_ORIGINS = [
 # CSRF_COOKIE_SAMESITE = 'Lax'
 
 REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
     'DEFAULT_AUTHENTICATION_CLASSES': (
         # 'rest_framework.authentication.SessionAuthentication', # Keep for Django Admin
         'rest_framework_simplejwt.authentication.JWTAuthentication', # For Bearer tokens
@@ -38,4 +42,3 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated', # Adjust per view if needed
     ),
 }
-print("DEBUG: Using local settings.") # For debugging purposes
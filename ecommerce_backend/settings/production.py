@@ -30,5 +30,3 @@ SECURE_SSL_REDIRECT = True # Redirect HTTP to HTTPS (Render handles HTTPS usuall
 CLOUDINARY_URL = env('CLOUDINARY_URL', default=None)
 if CLOUDINARY_URL:
     DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
-
-print("DEBUG: Using production settings.")
@@ -0,0 +1,13 @@
+from .local import * # Import all settings from local.py
+
+# The test suite (see pytest.ini). Reads are not routed to replicas unless a
+# test turns routing on. On SQLite, a second file stands in for a read
+# replica; the router tests route to it by asking for the 'replica' database.
+DATABASE_REPLICAS = []
+
+# Query timings vary too much between machines (CI) to fail tests on. The
+# query_detector fixture checks for N+1 queries only; a test opts in to the
+# slow query check with @pytest.mark.query_budget(slow_query_ms=...).
+QUERY_DETECTOR_SLOW_QUERY_MS = None
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3' and 'replica' not in DATABASES:
+    DATABASES['replica'] = {**DATABASES['default'], 'TEST': {'NAME': 'test_replica.sqlite3'}}
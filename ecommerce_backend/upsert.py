@@ -0,0 +1,73 @@
+"""
+Multi-row INSERT ... ON CONFLICT DO UPDATE for PostgreSQL and SQLite.
+
+Django's bulk_create(update_conflicts=True) can only overwrite columns with
+the new values. Counters (cart quantities, sales totals) need the stored
+value plus the new one, computed by the database, so that concurrent writers
+never lose an increment and no row has to be read first.
+"""
+from django.db import connections, router
+
+# Rows per statement (keeps SQLite below its bound parameter limit)
+BATCH_SIZE = 500
+
+
+def upsert(model, rows, conflict_fields, increment=(), update=(), returning=(), using=None):
+    """
+    Inserts `rows` (dicts of column name to value) into `model`'s table. Rows
+    whose `conflict_fields` match a stored row update it instead: columns in
+    `increment` are added to the stored value, columns in `update` replace it.
+    `conflict_fields` must be covered by a unique constraint.
+
+    Returns the `returning` columns of every inserted or updated row as
+    tuples of Python values (in no particular order), or an empty list.
+    """
+    if not rows:
+        return []
+    using = using or router.db_for_write(model)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    columns = list(rows[0].keys())
+
+    assignments = [f'{qn(column)} = {table}.{qn(column)} + EXCLUDED.{qn(column)}' for column in increment]
+    assignments += [f'{qn(column)} = EXCLUDED.{qn(column)}' for column in update]
+    row_sql = '(' + ', '.join(['%s'] * len(columns)) + ')'
+    sql_returning = f" RETURNING {', '.join(qn(column) for column in returning)}" if returning else ''
+
+    results = []
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), BATCH_SIZE):
+            batch = rows[start:start + BATCH_SIZE]
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(qn(column) for column in columns)}) "
+                f"VALUES {', '.join([row_sql] * len(batch))} "
+                f"ON CONFLICT ({', '.join(qn(column) for column in conflict_fields)}) "
+                f"DO UPDATE SET {', '.join(assignments)}{sql_returning}",
+                [connection.ops.adapt_unknown_value(row[column]) for row in batch for column in columns],
+            )
+            if returning:
+                results.extend(cursor.fetchall())
+
+    if returning:
+        results = convert_rows(model, returning, results, connection)
+    return results
+
+
+def convert_rows(model, columns, rows, connection):
+    # Apply the same database-to-Python conversions a query would
+    fields = {field.column: field for field in model._meta.concrete_fields}
+    converters = []
+    for column in columns:
+        col = fields[column].get_col(model._meta.db_table)
+        converters.append((col, connection.ops.get_db_converters(col) + col.get_db_converters(connection)))
+
+    converted = []
+    for row in rows:
+        values = []
+        for value, (col, column_converters) in zip(row, converters):
+            for converter in column_converters:
+                value = converter(value, col, connection)
+            values.append(value)
+        converted.append(tuple(values))
+    return converted
@@ -4,6 +4,7 @@ from rest_framework_simplejwt.views import (TokenObtainPairView,
                                             TokenRefreshView)
 
 from accounts.views import CustomLoginView, CustomLogoutView
+from ecommerce_backend.views import MetricsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -20,7 +21,10 @@ urlpatterns = [
     path('', include('accounts.urls')),
     path('api/', include('products.urls')),
     path('api/cart/', include('cart.urls')),
-    path('api/orders/', include('orders.urls'))
+    path('api/orders/', include('orders.urls')),
+    path('api/jobs/', include('jobs.urls')),
+    path('api/reports/', include('reports.urls')),
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
 ]
 
 from django.conf import settings
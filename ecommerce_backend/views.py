@@ -0,0 +1,19 @@
+from django.http import HttpResponse
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+
+from . import db_pool
+from .profiling import profile_stats
+
+
+class MetricsView(APIView):
+    """
+    Per-view request metrics (see ecommerce_backend.profiling) and database
+    pool metrics (see ecommerce_backend.db_pool) of this server process, in the
+    Prometheus text format.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        body = profile_stats.prometheus() + db_pool.prometheus(db_pool.pool_stats())
+        return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,12 @@
+from django.contrib import admin
+from .models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'kind', 'status', 'created_by', 'created_at', 'started_at', 'finished_at')
+    list_filter = ('status', 'kind', 'created_at')
+    readonly_fields = ('kind', 'payload', 'progress', 'result', 'error', 'created_by',
+                       'created_at', 'updated_at', 'started_at', 'finished_at')
+
+
+admin.site.register(Job, JobAdmin)
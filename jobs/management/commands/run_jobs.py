@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs.worker import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Runs queued background jobs. Polls the job table until stopped, or drains it once with --once.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Process the jobs that are currently queued, then exit.')
+        parser.add_argument('--poll_interval', type=float, default=2.0,
+                            help='Seconds to wait between polls when the queue is empty.')
+
+    def handle(self, *args, **options):
+        if options['once']:
+            processed = run_pending_jobs()
+            self.stdout.write(self.style.SUCCESS(f'Processed {processed} job(s).'))
+            return
+
+        self.stdout.write(self.style.SUCCESS('Job worker started.'))
+        try:
+            while True:
+                # Like a request cycle: drop connections that have gone stale between polls
+                close_old_connections()
+                if not run_pending_jobs():
+                    time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Job worker stopped.')
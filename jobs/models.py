@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    A unit of background work, stored in the database and executed by the
+    run_jobs worker command. No external broker is needed.
+    """
+    STATUS_CHOICES = [
+        ('Queued', 'Queued'),
+        ('Running', 'Running'),
+        ('Succeeded', 'Succeeded'),
+        ('Failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Queued')
+
+    # Counts reported by the handler while it runs, and its final return value
+    progress = models.JSONField(default=dict, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='jobs'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            # The worker polls for the oldest queued job
+            models.Index(fields=['status', 'created_at'], name='jobs_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Job {self.id} ({self.kind}, {self.status})"
+
+    def set_progress(self, progress):
+        """
+        Stores progress without touching the other columns, so it can be
+        called often from a running handler.
+        """
+        self.progress = progress
+        Job.objects.filter(pk=self.pk).update(progress=progress, updated_at=timezone.now())
@@ -0,0 +1,34 @@
+"""
+Maps job kinds to the functions that run them.
+
+Apps register handlers at import time (e.g. from AppConfig.ready):
+
+    @register('populate_products')
+    def populate_products(job):
+        ...
+
+A handler receives the Job, may call job.set_progress() while it works and
+returns a JSON-serializable result. Raising marks the job as failed. A handler
+running longer than JOB_STALE_SECONDS must report progress at least that
+often, or it is taken for a dead worker's job and failed.
+"""
+from .models import Job
+
+_handlers = {}
+
+
+def register(kind):
+    def decorator(func):
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def get_handler(kind):
+    return _handlers.get(kind)
+
+
+def enqueue(kind, payload=None, user=None):
+    if kind not in _handlers:
+        raise ValueError(f"No job handler registered for '{kind}'.")
+    return Job.objects.create(kind=kind, payload=payload or {}, created_by=user)
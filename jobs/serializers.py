@@ -0,0 +1,10 @@
+from rest_framework import serializers
+from .models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = ['id', 'kind', 'status', 'payload', 'progress', 'result', 'error',
+                  'created_at', 'started_at', 'finished_at', 'updated_at']
+        read_only_fields = fields
@@ -0,0 +1,130 @@
+import io
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from jobs.models import Job
+from jobs.registry import enqueue, register
+from jobs.worker import claim_next_job, run_pending_jobs
+from products.models import Product
+from django.contrib.auth import get_user_model
+User = get_user_model()
+
+
+@register('test_echo')
+def echo(job):
+    job.set_progress({'step': 1})
+    return {'echo': job.payload['value']}
+
+
+@register('test_fail')
+def fail(job):
+    raise RuntimeError('boom')
+
+
+@pytest.fixture
+def admin_headers(db):
+    admin = User.objects.create_superuser(username='admin', password='Adminpassword123')
+    return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(admin)}'}
+
+
+def test_worker_runs_jobs_in_order(db):
+    first = enqueue('test_echo', {'value': 1})
+    second = enqueue('test_echo', {'value': 2})
+
+    assert run_pending_jobs() == 2
+
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert (first.status, first.result, first.progress) == ('Succeeded', {'echo': 1}, {'step': 1})
+    assert second.result == {'echo': 2}
+    assert first.started_at <= second.started_at
+    assert first.finished_at is not None
+
+
+def test_failed_job_records_error(db):
+    job = enqueue('test_fail')
+
+    run_pending_jobs()
+
+    job.refresh_from_db()
+    assert job.status == 'Failed'
+    assert 'boom' in job.error
+
+
+def test_claimed_job_is_not_claimed_twice(db):
+    job = enqueue('test_echo', {'value': 1})
+
+    assert claim_next_job().pk == job.pk
+    assert claim_next_job() is None
+    assert Job.objects.get(pk=job.pk).status == 'Running'
+
+
+def test_stale_running_jobs_are_failed(db, settings):
+    settings.JOB_STALE_SECONDS = 60
+    stale = enqueue('test_echo', {'value': 1})
+    running = enqueue('test_echo', {'value': 2})
+    claim_next_job()
+    claim_next_job()
+    # The first worker died a while ago; the second is still reporting progress
+    Job.objects.filter(pk=stale.pk).update(updated_at=timezone.now() - timedelta(seconds=61))
+
+    assert run_pending_jobs() == 0
+
+    stale.refresh_from_db()
+    assert stale.status == 'Failed'
+    assert 'worker running the job stopped' in stale.error
+    assert Job.objects.get(pk=running.pk).status == 'Running'
+
+
+def test_enqueue_rejects_unknown_kind(db):
+    with pytest.raises(ValueError):
+        enqueue('no_such_job')
+
+
+def test_populate_products_job_end_to_end(client, admin_headers, tmp_path):
+    User.objects.create_user(username='seller', password='Sellerpassword123', role='SELLER')
+    path = tmp_path / 'products.json'
+    path.write_text(json.dumps([
+        {'name': f'Product {i}', 'price': 5, 'stock': 1, 'category_name': 'Books'} for i in range(3)
+    ] + [{'name': 'Broken'}]))
+
+    response = client.post(
+        '/api/products/populate_db/',
+        data={'seller_name': 'seller', 'json_path': str(path)},
+        content_type='application/json',
+        **admin_headers
+    )
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    status_url = response.json()['status_url']
+
+    call_command('run_jobs', once=True, stdout=io.StringIO())
+
+    data = client.get(status_url, **admin_headers).json()
+    assert data['status'] == 'Succeeded'
+    assert data['progress']['created'] == 3
+    assert data['result']['failed'] == 1
+    assert data['result']['errors'][0]['row'] == 4
+    assert Product.objects.count() == 3
+
+
+def test_populate_endpoint_rejects_unknown_seller(client, admin_headers, tmp_path):
+    response = client.post(
+        '/api/products/populate_db/',
+        data={'seller_name': 'nobody', 'json_path': str(tmp_path / 'products.json')},
+        content_type='application/json',
+        **admin_headers
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert not Job.objects.exists()
+
+
+def test_job_status_requires_admin(client, db):
+    job = enqueue('test_echo', {'value': 1})
+    response = client.get(f'/api/jobs/{job.id}/')
+    assert response.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,14 @@
+from rest_framework import generics
+from rest_framework.permissions import IsAdminUser
+
+from .models import Job
+from .serializers import JobSerializer
+
+
+class JobDetailView(generics.RetrieveAPIView):
+    """
+    API endpoint to poll the status, progress and errors of a background job.
+    """
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    permission_classes = [IsAdminUser]
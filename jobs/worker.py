@@ -0,0 +1,90 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Job
+from .registry import get_handler
+
+logger = logging.getLogger(__name__)
+
+
+def claim_next_job():
+    """
+    Atomically moves the oldest queued job to Running and returns it, or
+    returns None when the queue is empty. The conditional UPDATE makes it safe
+    to run several workers against the same database.
+    """
+    while True:
+        job = Job.objects.filter(status='Queued').order_by('created_at', 'id').first()
+        if job is None:
+            return None
+
+        now = timezone.now()
+        claimed = Job.objects.filter(pk=job.pk, status='Queued').update(
+            status='Running', started_at=now, updated_at=now
+        )
+        if claimed:
+            job.status = 'Running'
+            job.started_at = now
+            return job
+        # Another worker took it first; try the next one.
+
+
+def run_job(job):
+    handler = get_handler(job.kind)
+    try:
+        if handler is None:
+            raise LookupError(f"No job handler registered for '{job.kind}'.")
+        job.result = handler(job)
+        job.status = 'Succeeded'
+    except Exception as e:
+        logger.exception("Job %s (%s) failed.", job.id, job.kind)
+        job.status = 'Failed'
+        job.error = f'{e}\n\n{traceback.format_exc()}'
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'progress', 'finished_at', 'updated_at'])
+    logger.info("Job %s (%s) finished with status %s.", job.id, job.kind, job.status)
+    return job
+
+
+def fail_stale_jobs():
+    """
+    Fails Running jobs whose worker stopped without finishing them: those not
+    updated (claimed, or progress reported) for JOB_STALE_SECONDS. They are
+    not retried, as a job may have died half done or taken its worker down.
+    Returns the number of jobs failed.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status='Running', updated_at__lt=now - timedelta(seconds=settings.JOB_STALE_SECONDS)
+    )
+    pks = list(stale.values_list('pk', flat=True))
+    if not pks:
+        return 0
+    # Conditional, like claiming: a job reporting progress meanwhile is left alone
+    failed = stale.filter(pk__in=pks).update(
+        status='Failed', finished_at=now, updated_at=now,
+        error=f'The worker running the job stopped (no progress for {settings.JOB_STALE_SECONDS} seconds).',
+    )
+    logger.warning("Failed %s stale running job(s): %s.", failed, pks)
+    return failed
+
+
+def run_pending_jobs(max_jobs=None):
+    """
+    Fails stale running jobs, then runs queued jobs until the queue is empty
+    (or max_jobs have run). Returns the number of jobs processed.
+    """
+    fail_stale_jobs()
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        job = claim_next_job()
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+    return processed
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.contrib import messages
+from reports.rollups import update_status
 from .models import Order, OrderItem
 
 
@@ -49,7 +50,8 @@ class OrderAdmin(admin.ModelAdmin):
         """
         Admin action to mark selected orders as 'Processing'.
         """
-        updated_count = queryset.update(status='Processing')
+        # Restores cancelled orders to the sales rollups, which a plain update would skip
+        updated_count = update_status(queryset, 'Processing')
 
         if updated_count == 1:
             message = "1 order was successfully marked as Processing."
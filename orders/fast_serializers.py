@@ -0,0 +1,58 @@
+"""
+Fast-path OrderSerializer built from .values() rows (see products.fast_serializers).
+"""
+from collections import defaultdict
+
+from products.fast_serializers import FastProductSummarySerializer, FastSerializer
+from .models import OrderItem
+
+
+class FastOrderItemSerializer(FastSerializer):
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.product = FastProductSummarySerializer(request, prefix='product__')
+        self.columns = ['id', 'order', 'product_name', 'product_price', 'quantity', 'created_at', 'updated_at',
+                        *self.product.columns]
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'order': row['order'],
+            'product': self.product.to_representation(row),
+            'product_name': row['product_name'],
+            'product_price': self.decimal(row['product_price']),
+            'quantity': row['quantity'],
+            'get_total_item_price': row['product_price'] * row['quantity'],
+            'created_at': self.datetime(row['created_at']),
+            'updated_at': self.datetime(row['updated_at']),
+        }
+
+
+class FastOrderSerializer(FastSerializer):
+    """
+    Orders (in the queryset's order) with their items, in two queries.
+    """
+    columns = ['id', 'user__username', 'total_amount', 'status', 'created_at', 'updated_at']
+
+    def serialize(self, orders):
+        rows = list(self.values(orders))
+        item_serializer = FastOrderItemSerializer(self.request)
+        items = defaultdict(list)
+        item_rows = item_serializer.values(
+            OrderItem.objects.filter(order_id__in=[row['id'] for row in rows]).order_by('pk')
+        )
+        for item in item_rows:
+            items[item['order']].append(item_serializer.to_representation(item))
+
+        return [
+            {
+                'id': row['id'],
+                'user': row['user__username'],
+                'items': items[row['id']],
+                'total_amount': self.decimal(row['total_amount']),
+                'status': row['status'],
+                'created_at': self.datetime(row['created_at']),
+                'updated_at': self.datetime(row['updated_at']),
+            }
+            for row in rows
+        ]
@@ -0,0 +1,163 @@
+"""
+Idempotency-Key support for unsafe requests, used by checkout.
+
+The first request carrying a key claims it by inserting an IdempotencyKey
+row (unique per user and key), runs the view and stores the response on the
+row in the same transaction as the view's own writes. A retry with the same
+key gets the stored response back without running the view again; a retry
+arriving while the first request is still running waits for its response.
+Keys expire IDEMPOTENCY_KEY_TTL seconds after they were first used.
+"""
+import functools
+import hashlib
+import json
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+# How long a running request holds its key before a retry may take it over
+LOCK_TIMEOUT = timedelta(seconds=60)
+POLL_INTERVAL = 0.05
+
+
+class KeyInUse(Exception):
+    """The first request with the key is still running."""
+
+
+class KeyReused(Exception):
+    """The key was first used for a different request."""
+
+
+def request_hash(request):
+    digest = hashlib.sha256()
+    for part in (request.method.encode(), request.path.encode(), request.body):
+        digest.update(part)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def claim(user, key, fingerprint):
+    """
+    Returns (record, claimed). `claimed` is True when the caller must run the
+    request and then complete() or release() the record; otherwise the
+    record holds the stored response. Waits up to IDEMPOTENCY_WAIT seconds
+    for a running request with the same key, then raises KeyInUse.
+    """
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT
+    while True:
+        now = timezone.now()
+        try:
+            # Commits on its own, so concurrent retries see the claim at once
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    user=user, key=key, request_hash=fingerprint,
+                    locked_until=now + LOCK_TIMEOUT,
+                    expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+                )
+            # Evict the user's other expired keys while we are here
+            IdempotencyKey.objects.filter(user=user, expires_at__lte=now).exclude(pk=record.pk).delete()
+            return record, True
+        except IntegrityError:
+            pass
+
+        record = IdempotencyKey.objects.filter(user=user, key=key).first()
+        if record is None:
+            continue
+        if record.expires_at <= now:
+            IdempotencyKey.objects.filter(pk=record.pk, expires_at__lte=now).delete()
+            continue
+        if record.request_hash != fingerprint:
+            raise KeyReused(key)
+        if record.status_code is not None:
+            return record, False
+        if record.locked_until <= now:
+            # The request that claimed the key never finished
+            taken = IdempotencyKey.objects.filter(pk=record.pk, status_code__isnull=True, locked_until__lte=now) \
+                .update(locked_until=now + LOCK_TIMEOUT)
+            if taken:
+                return record, True
+            continue
+        if time.monotonic() > deadline:
+            raise KeyInUse(key)
+        time.sleep(POLL_INTERVAL)
+
+
+def complete(record, response):
+    # Store the data as the JSON renderer will output it, so a replay is identical
+    body = json.loads(json.dumps(response.data, cls=JSONEncoder))
+    IdempotencyKey.objects.filter(pk=record.pk).update(status_code=response.status_code, response_body=body)
+
+
+def release(record):
+    IdempotencyKey.objects.filter(pk=record.pk, status_code__isnull=True).delete()
+
+
+def replay(record):
+    response = Response(record.response_body, status=record.status_code)
+    response[REPLAYED_HEADER] = 'true'
+    return response
+
+
+def idempotent(view_method):
+    """
+    Makes a view method honour the Idempotency-Key header (requests without
+    the header run as usual). The view runs in one transaction together with
+    storing its response, so a committed result is always replayed and never
+    produced twice. Server errors are not stored: the key is released and the
+    client may retry with it.
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return view_method(self, request, *args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {"detail": f"{HEADER} must be 1 to {MAX_KEY_LENGTH} characters."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            record, claimed = claim(request.user, key, request_hash(request))
+        except KeyReused:
+            return Response(
+                {"detail": f"This {HEADER} was already used for a different request."},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+        except KeyInUse:
+            return Response(
+                {"detail": f"A request with this {HEADER} is still being processed."},
+                status=status.HTTP_409_CONFLICT
+            )
+        if not claimed:
+            logger.debug("Replaying response for idempotency key %s of user %s.", key, request.user.username)
+            return replay(record)
+
+        try:
+            with transaction.atomic():
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code < 500:
+                    complete(record, response)
+        except BaseException:
+            release(record)
+            raise
+        if response.status_code >= 500:
+            release(record)
+        return response
+
+    return wrapper
@@ -25,6 +25,10 @@ class Order(models.Model):
         ordering = [
             'created_at'
         ]
+        indexes = [
+            # A user's order history, newest first
+            models.Index(fields=['user', '-created_at'], name='order_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"Order {self.id} by {self.user.username}"
@@ -57,3 +61,32 @@ class OrderItem(models.Model):
         Uses the stored product_price at the time of order.
         """
         return self.product_price * self.quantity
+
+
+class IdempotencyKey(models.Model):
+    """
+    A client-chosen Idempotency-Key for an unsafe request (see
+    orders.idempotency). Holds the fingerprint of the request that claimed
+    it and, once that request finishes, its response for replay.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    key = models.CharField(max_length=255)
+    # SHA-256 of the method, path and body of the first request
+    request_hash = models.CharField(max_length=64)
+
+    # Empty while the first request is running
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+
+    # Another request may take the key over after this (the first one died)
+    locked_until = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='idempotency_key_user_key_uniq'),
+        ]
+
+    def __str__(self):
+        return f"Idempotency key {self.key} of user {self.user_id}"
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from products.serializers import ProductSerializer
+from products.serializers import ProductSummarySerializer
 from .models import Order, OrderItem
 
 
@@ -10,7 +10,7 @@ class OrderItemSerializer(serializers.ModelSerializer):
     Includes nested Product details for read operations.
     """
 
-    product = ProductSerializer(read_only=True)
+    product = ProductSummarySerializer(read_only=True)
     class Meta:
         model = OrderItem
         fields = ['id', 'order', 'product', 'product_name', 'product_price', 'quantity', 'get_total_item_price', 'created_at', 'updated_at']
@@ -0,0 +1,72 @@
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from products.cache import product_cache
+from products.models import Product
+
+
+class InsufficientStock(Exception):
+    """
+    Raised when one or more products do not have enough stock for an order.
+    `items` describes each shortfall.
+    """
+
+    def __init__(self, items):
+        super().__init__('Insufficient stock.')
+        self.items = items
+
+
+def reserve_stock(quantities):
+    """
+    Atomically decrements stock for {product_id: quantity}.
+
+    All lines are handled by one conditional UPDATE, so a product is only
+    decremented while `stock >= quantity` holds at write time. If any line
+    cannot be satisfied nothing is decremented and InsufficientStock is raised.
+    Must be called inside a transaction.
+    """
+    if not quantities:
+        return
+
+    needed = Case(
+        *[When(pk=pk, then=Value(quantity)) for pk, quantity in quantities.items()],
+        output_field=IntegerField(),
+    )
+
+    savepoint = transaction.savepoint()
+    updated = Product.objects.filter(pk__in=quantities.keys(), stock__gte=needed).update(
+        stock=F('stock') - needed,
+        updated_at=timezone.now(),
+    )
+
+    if updated != len(quantities):
+        transaction.savepoint_rollback(savepoint)
+        raise InsufficientStock(get_shortages(quantities))
+
+    transaction.savepoint_commit(savepoint)
+
+    # QuerySet.update() sends no signals, so invalidate cached products ourselves
+    def invalidate():
+        product_cache.delete_objects(quantities.keys())
+        product_cache.bump_version()
+
+    transaction.on_commit(invalidate)
+
+
+def get_shortages(quantities):
+    products = Product.objects.filter(pk__in=quantities.keys()).values('id', 'name', 'stock')
+    available = {product['id']: product for product in products}
+
+    shortages = []
+    for pk, quantity in quantities.items():
+        product = available.get(pk)
+        stock = product['stock'] if product else 0
+        if stock < quantity:
+            shortages.append({
+                'product_id': pk,
+                'product_name': product['name'] if product else None,
+                'requested': quantity,
+                'available': stock,
+            })
+    return shortages
@@ -1,3 +1,264 @@
-from django.test import TestCase
+import threading
 
-# Create your tests here.
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from products.models import Product, Category
+from cart.models import Cart, CartItem
+from orders.models import IdempotencyKey, Order
+from django.contrib.auth import get_user_model
+User = get_user_model()
+
+# Requests made by these tests fail them when they run N+1 queries
+pytestmark = pytest.mark.usefixtures('query_detector')
+
+
+@pytest.fixture
+def buyer(db):
+    return User.objects.create_user(username='buyer', password='Buyerpassword123')
+
+
+@pytest.fixture
+def auth_headers(buyer):
+    return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(buyer)}'}
+
+
+@pytest.fixture
+def products(db):
+    seller = User.objects.create_user(username='seller', password='Sellerpassword123', role='SELLER')
+    category = Category.objects.create(name='Books')
+    return [
+        Product.objects.create(name=f'Book {i}', price=10, stock=100, category=category, seller=seller)
+        for i in range(5)
+    ]
+
+
+def fill_cart(user, products, quantity=1):
+    cart = Cart.objects.get_or_create(user=user)[0]
+    for product in products:
+        CartItem.objects.create(cart=cart, product=product, quantity=quantity)
+    return cart
+
+
+def checkout(client, headers):
+    response = client.post('/api/orders/', **headers)
+    assert response.status_code == status.HTTP_201_CREATED, response.content
+    return response
+
+
+def count_queries(callable_):
+    with CaptureQueriesContext(connection) as context:
+        callable_()
+    return len(context)
+
+
+def test_order_list_query_count_is_constant(client, buyer, auth_headers, products):
+    fill_cart(buyer, products[:1])
+    checkout(client, auth_headers)
+    one_order = count_queries(lambda: client.get('/api/orders/', **auth_headers))
+
+    for _ in range(4):
+        fill_cart(buyer, products)
+        checkout(client, auth_headers)
+    many_orders = count_queries(lambda: client.get('/api/orders/', **auth_headers))
+
+    assert one_order == many_orders
+    # user lookup, orders joined with users, items joined with products
+    assert many_orders <= 3
+
+
+def test_checkout_query_count_does_not_grow_with_cart_size(client, buyer, auth_headers, products):
+    fill_cart(buyer, products[:1])
+    one_line = count_queries(lambda: checkout(client, auth_headers))
+
+    fill_cart(buyer, products)
+    five_lines = count_queries(lambda: checkout(client, auth_headers))
+
+    assert one_line == five_lines
+
+
+def test_checkout_copies_cart_into_order(client, buyer, auth_headers, products):
+    fill_cart(buyer, products[:2], quantity=3)
+
+    data = checkout(client, auth_headers).json()
+
+    assert len(data['items']) == 2
+    assert float(data['total_amount']) == 60.0
+    assert data['user'] == 'buyer'
+    assert Order.objects.filter(user=buyer).count() == 1
+    assert not CartItem.objects.filter(cart__user=buyer).exists()
+
+
+def test_checkout_decrements_stock(client, buyer, auth_headers, products):
+    fill_cart(buyer, products[:2], quantity=3)
+
+    checkout(client, auth_headers)
+
+    for product in products[:2]:
+        product.refresh_from_db()
+        assert product.stock == 97
+
+
+def test_checkout_reports_each_short_item_and_changes_nothing(client, buyer, auth_headers, products):
+    Product.objects.filter(pk=products[0].pk).update(stock=1)
+    Product.objects.filter(pk=products[2].pk).update(stock=0)
+    fill_cart(buyer, products[:3], quantity=2)
+
+    response = client.post('/api/orders/', **auth_headers)
+
+    assert response.status_code == status.HTTP_409_CONFLICT
+    shortages = {item['product_id']: item for item in response.json()['items']}
+    assert set(shortages) == {products[0].pk, products[2].pk}
+    assert shortages[products[0].pk]['requested'] == 2
+    assert shortages[products[0].pk]['available'] == 1
+
+    # Nothing was decremented, no order was placed and the cart is intact
+    assert list(Product.objects.order_by('pk').values_list('stock', flat=True))[:3] == [1, 100, 0]
+    assert not Order.objects.exists()
+    assert CartItem.objects.filter(cart__user=buyer).count() == 3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_checkouts_never_oversell():
+    """
+    Many buyers race to check out the last units of a product. Exactly as many
+    orders as there is stock must succeed and stock must never go negative.
+    """
+    seller = User.objects.create_user(username='seller', password='Sellerpassword123', role='SELLER')
+    category = Category.objects.create(name='Books')
+    product = Product.objects.create(name='Limited', price=10, stock=5, category=category, seller=seller)
+    buyers = [User.objects.create_user(username=f'buyer{i}', password='Buyerpassword123') for i in range(12)]
+    for buyer in buyers:
+        fill_cart(buyer, [product])
+
+    barrier = threading.Barrier(len(buyers))
+    results = []
+
+    def place_order(user):
+        client = Client()
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+        barrier.wait()
+        try:
+            results.append(client.post('/api/orders/', **headers).status_code)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=place_order, args=(buyer,)) for buyer in buyers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    product.refresh_from_db()
+    assert results.count(status.HTTP_201_CREATED) == 5
+    assert results.count(status.HTTP_409_CONFLICT) == len(buyers) - 5
+    assert product.stock == 0
+    assert Order.objects.count() == 5
+
+
+def keyed_checkout(client, headers, key):
+    return client.post('/api/orders/', HTTP_IDEMPOTENCY_KEY=key, **headers)
+
+
+def test_repeated_idempotency_key_replays_the_order(client, buyer, auth_headers, products):
+    fill_cart(buyer, products[:2])
+    first = keyed_checkout(client, auth_headers, 'checkout-1')
+    assert first.status_code == status.HTTP_201_CREATED
+
+    fill_cart(buyer, products[2:3])
+    with CaptureQueriesContext(connection) as context:
+        retry = keyed_checkout(client, auth_headers, 'checkout-1')
+
+    assert retry.status_code == status.HTTP_201_CREATED
+    assert retry.content == first.content
+    assert retry['Idempotent-Replayed'] == 'true'
+    assert Order.objects.filter(user=buyer).count() == 1
+    # The retry never looked at the cart or the orders
+    assert not any(table in query['sql'] for query in context.captured_queries
+                   for table in ('cart_', 'orders_order'))
+    assert CartItem.objects.filter(cart__user=buyer).count() == 1
+
+    # A new key places a new order
+    assert keyed_checkout(client, auth_headers, 'checkout-2').status_code == status.HTTP_201_CREATED
+    assert Order.objects.filter(user=buyer).count() == 2
+
+
+def test_idempotency_keys_are_per_user(client, buyer, auth_headers, products):
+    other = User.objects.create_user(username='other', password='Otherpassword123')
+    fill_cart(buyer, products[:1])
+    fill_cart(other, products[:1])
+
+    keyed_checkout(client, auth_headers, 'same-key')
+    other_headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(other)}'}
+    response = keyed_checkout(client, other_headers, 'same-key')
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert 'Idempotent-Replayed' not in response
+    assert Order.objects.count() == 2
+
+
+def test_idempotency_key_reused_for_another_request_is_rejected(client, buyer, auth_headers, products):
+    fill_cart(buyer, products[:1])
+    keyed_checkout(client, auth_headers, 'checkout-1')
+
+    response = client.post('/api/orders/', {'note': 'different'}, content_type='application/json',
+                           HTTP_IDEMPOTENCY_KEY='checkout-1', **auth_headers)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_expired_idempotency_key_is_evicted(client, buyer, auth_headers, products, settings):
+    settings.IDEMPOTENCY_KEY_TTL = 0
+    fill_cart(buyer, products[:1])
+    keyed_checkout(client, auth_headers, 'checkout-1')
+
+    fill_cart(buyer, products[:1])
+    assert keyed_checkout(client, auth_headers, 'checkout-1').status_code == status.HTTP_201_CREATED
+    assert Order.objects.filter(user=buyer).count() == 2
+    assert IdempotencyKey.objects.filter(user=buyer).count() == 1
+
+
+def test_failed_checkout_response_is_replayed(client, buyer, auth_headers, products):
+    Product.objects.filter(pk=products[0].pk).update(stock=0)
+    fill_cart(buyer, products[:1])
+    assert keyed_checkout(client, auth_headers, 'checkout-1').status_code == status.HTTP_409_CONFLICT
+
+    Product.objects.filter(pk=products[0].pk).update(stock=10)
+    retry = keyed_checkout(client, auth_headers, 'checkout-1')
+    assert retry.status_code == status.HTTP_409_CONFLICT
+    assert retry['Idempotent-Replayed'] == 'true'
+    assert not Order.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_duplicates_wait_for_the_first_request():
+    buyer = User.objects.create_user(username='buyer', password='Buyerpassword123')
+    seller = User.objects.create_user(username='seller', password='Sellerpassword123', role='SELLER')
+    product = Product.objects.create(name='Book', price=10, stock=100, seller=seller)
+    fill_cart(buyer, [product], quantity=2)
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(buyer)}'}
+
+    barrier = threading.Barrier(6)
+    responses = []
+
+    def submit():
+        client = Client()
+        barrier.wait()
+        try:
+            responses.append(keyed_checkout(client, headers, 'double-tap'))
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=submit) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [response.status_code for response in responses] == [status.HTTP_201_CREATED] * 6
+    assert len({response.json()['id'] for response in responses}) == 1
+    assert Order.objects.count() == 1
+    product.refresh_from_db()
+    assert product.stock == 98
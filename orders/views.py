@@ -1,16 +1,34 @@
+import logging
+
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.views import APIView 
 from django.db import transaction 
-from django.core.exceptions import ObjectDoesNotExist 
+from django.db.models import Prefetch, prefetch_related_objects
 
 from .serializers import OrderSerializer # Only need OrderSerializer for the response
 from .models import Order, OrderItem # Need Order and OrderItem models
 
-from cart.models import Cart # Need Cart model to fetch the user's cart
+from cart.store import get_cart_store
+from .fast_serializers import FastOrderSerializer
+from .idempotency import idempotent
+from .stock import InsufficientStock, reserve_stock
+from accounts.dashboard import invalidate_summaries
+from reports.rollups import record_order
 
 from rest_framework import generics
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def order_items_prefetch():
+    """
+    Prefetch for an order's items and their products, so serializing any
+    number of orders costs a fixed number of queries.
+    """
+    return Prefetch('items', queryset=OrderItem.objects.select_related('product').order_by('pk'))
 
 
 class OrderListCreateView(generics.ListCreateAPIView):
@@ -29,72 +47,97 @@ class OrderListCreateView(generics.ListCreateAPIView):
         Returns the list of orders for the currently authenticated user.
         """
         # Filter orders to only include those belonging to the current user
-        return Order.objects.filter(user=self.request.user).order_by('-created_at') # Order by newest first
+        return (
+            Order.objects.filter(user=self.request.user)
+            .select_related('user')
+            .prefetch_related(order_items_prefetch())
+            .order_by('-created_at') # Order by newest first
+        )
+
+    def list(self, request, *args, **kwargs):
+        if settings.FAST_READ_SERIALIZERS:
+            return Response(FastOrderSerializer(request).serialize(self.get_queryset()))
+        return super().list(request, *args, **kwargs)
 
     # Method for handling POST requests (Creating Order from Cart)
     # This logic is adapted from the previous OrderCreateView's post method
+    @idempotent
     def create(self, request, *args, **kwargs):
         """
         Handles POST requests to create an order from the user's cart.
         This overrides the default create method of ListCreateAPIView.
+        With an Idempotency-Key header, retries of the request return the
+        first response instead of placing another order.
         """
-        # 1. Get the authenticated user's cart
-        try:
-            cart = Cart.objects.get(user=request.user)
-            print(f"Fetched cart for user {request.user.username}.")
-        except ObjectDoesNotExist:
-            print(f"User {request.user.username} does not have a cart.")
+        # 1. Get a snapshot of the authenticated user's cart (from the cart store)
+        store = get_cart_store()
+        snapshot = store.snapshot(request.user)
+        if snapshot is None:
+            logger.debug("User %s does not have a cart.", request.user.username)
             return Response({"detail": "User does not have a cart."}, status=status.HTTP_400_BAD_REQUEST)
+        logger.debug("Fetched cart for user %s.", request.user.username)
 
         # 2. Check if the cart has items
-        cart_items = cart.items.select_related('product').all()
-        if not cart_items:
-            print("Cart is empty. Cannot create order.")
+        if not snapshot.lines:
+            logger.debug("Cart is empty. Cannot create order.")
             return Response({"detail": "Your cart is empty. Add items before creating an order."}, status=status.HTTP_400_BAD_REQUEST)
 
         # 3. Start a Database Transaction
-        with transaction.atomic():
-            # 4. Create the Order (Instantiate without saving immediately)
-            order = Order(user=request.user, status='Pending')
-            print(f"Instantiated Order for user {request.user.username}.")
-
-            # Initialize total amount calculation
-            calculated_total_amount = 0
-
-            # 5. Process Cart Items and Create Order Items
-            order_items_to_create = []
-            for cart_item in cart_items:
-                 # Optional: Add stock check here if needed
-                order_item = OrderItem(
-                    order=order,
-                    product=cart_item.product,
-                    product_name=cart_item.product.name,
-                    product_price=cart_item.product.price,
-                    quantity=cart_item.quantity
-                )
-                order_items_to_create.append(order_item)
-                calculated_total_amount += order_item.get_total_item_price
-
-                print(f"Prepared OrderItem for product: {order_item.product_name} (Quantity: {order_item.quantity}, Price: {order_item.product_price}).")
-
-
-            # 6. Calculate and Save the Order Total
-            order.total_amount = calculated_total_amount
-            order.save() # Save the Order instance to get its primary key
-
-            # Bulk create OrderItems
-            OrderItem.objects.bulk_create(order_items_to_create)
-            print(f"Bulk created {len(order_items_to_create)} OrderItems for Order {order.id}.")
-
-            # 7. Clear the Cart
-            cart_items.delete()
-            print(f"Cart items for cart {cart.id} deleted.")
-
-            # 8. Return Response
-            # Use the serializer_class defined on the ListCreateAPIView
-            serializer = self.get_serializer(order) # Use self.get_serializer()
-
-            # Return the serialized order data with a 201 Created status
-            print(f"Order {order.id} creation successful. Returning response.")
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-
+        try:
+            with transaction.atomic():
+                # 4. Create the Order (Instantiate without saving immediately)
+                order = Order(user=request.user, status='Pending')
+
+                # Initialize total amount calculation
+                calculated_total_amount = 0
+
+                # 5. Process Cart Items and Create Order Items
+                order_items_to_create = []
+                quantities = {}
+                for product, quantity in snapshot.lines:
+                    quantities[product.pk] = quantities.get(product.pk, 0) + quantity
+                    order_item = OrderItem(
+                        order=order,
+                        product=product,
+                        product_name=product.name,
+                        product_price=product.price,
+                        quantity=quantity
+                    )
+                    order_items_to_create.append(order_item)
+                    calculated_total_amount += order_item.get_total_item_price
+
+                # Reserve stock for every line in one conditional UPDATE. Raises
+                # InsufficientStock (rolling back the whole order) if any line is short.
+                reserve_stock(quantities)
+
+                # 6. Calculate and Save the Order Total
+                order.total_amount = calculated_total_amount
+                order.save() # Save the Order instance to get its primary key
+
+                # Bulk create OrderItems
+                OrderItem.objects.bulk_create(order_items_to_create)
+                logger.debug("Bulk created %d OrderItems for Order %s.", len(order_items_to_create), order.id)
+                # bulk_create sends no signals: add the sales to the daily rollups and
+                # refresh the sellers' dashboard figures on commit
+                record_order(order, order_items_to_create)
+                invalidate_summaries(product.seller_id for product, quantity in snapshot.lines)
+
+                # 7. Clear the checked-out lines from the cart
+                store.consume(request.user, snapshot)
+                logger.debug("Cart items for cart %s cleared.", snapshot.cart_id)
+
+                # 8. Return Response
+                # Load the new items with their products in one query for the serializer
+                prefetch_related_objects([order], order_items_prefetch())
+                # Use the serializer_class defined on the ListCreateAPIView
+                serializer = self.get_serializer(order) # Use self.get_serializer()
+
+                # Return the serialized order data with a 201 Created status
+                logger.debug("Order %s creation successful. Returning response.", order.id)
+                return Response(serializer.data, status=status.HTTP_201_CREATED)
+        except InsufficientStock as exc:
+            logger.info("Checkout for user %s rejected: insufficient stock for %d item(s).", request.user.username, len(exc.items))
+            return Response(
+                {"detail": "Insufficient stock for one or more items.", "items": exc.items},
+                status=status.HTTP_409_CONFLICT
+            )
@@ -48,4 +48,4 @@ curl -X POST \
 
 echo ""
 echo "-----------------------------------"
-echo "Script finished. Check your backend logs for the output."
+echo "Import job queued. Poll the status_url in the response above for progress and errors."
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class ProductsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'products'
+
+    def ready(self):
+        # Connect the catalog cache invalidation handlers
+        from . import signals  # noqa: F401
+        # Register background job handlers
+        from . import tasks  # noqa: F401
@@ -0,0 +1,130 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class CatalogCache:
+    """
+    Read-through cache for serialized catalog payloads.
+
+    Detail payloads are stored per object and deleted when that object changes.
+    List pages are stored under a version number which is bumped on any write,
+    so every cached page of a namespace goes stale at once without having to
+    find and delete them.
+
+    Entries live in the 'catalog' cache alias (local memory by default, Redis in
+    production via CATALOG_CACHE_URL).
+    """
+    alias = 'catalog'
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    @property
+    def timeout(self):
+        return settings.CATALOG_CACHE_TIMEOUT
+
+    # Per-object entries
+    def object_key(self, pk):
+        return f'{self.namespace}:obj:{pk}'
+
+    def get_object(self, pk):
+        return self._record(self.backend.get(self.object_key(pk)))
+
+    def set_object(self, pk, data):
+        self.backend.set(self.object_key(pk), data, self.timeout)
+
+    def delete_objects(self, pks):
+        keys = [self.object_key(pk) for pk in pks]
+        self.backend.delete_many([*keys, *(self.validators_key(key) for key in keys)])
+
+    # Versioned list entries
+    def version_key(self):
+        return f'{self.namespace}:list:version'
+
+    def get_version(self):
+        # Seed with the current time rather than 1 so that a version key lost to
+        # eviction can never bring back pages cached under an earlier version.
+        self.backend.add(self.version_key(), time.time_ns(), None)
+        return self.backend.get(self.version_key())
+
+    def bump_version(self):
+        try:
+            self.backend.incr(self.version_key())
+        except ValueError:
+            # Key is missing; the next read seeds a fresh version.
+            pass
+
+    def list_key(self, request, user=None):
+        """
+        Key of the list at the request's URL; per user for lists that depend
+        on who asks (`user`).
+        """
+        digest = hashlib.md5(request.build_absolute_uri().encode('utf-8')).hexdigest()
+        scope = f'user:{user.pk}:' if user is not None else ''
+        return f'{self.namespace}:list:{self.get_version()}:{scope}{digest}'
+
+    def get_list(self, key):
+        return self._record(self.backend.get(key))
+
+    def set_list(self, key, data):
+        self.backend.set(key, data, self.timeout)
+
+    # HTTP validators of the rows behind an object or list entry, stored next
+    # to it so they go stale with it
+    def validators_key(self, key):
+        return f'{key}:validators'
+
+    def get_validators(self, key):
+        return self.backend.get(self.validators_key(key))
+
+    def set_validators(self, key, validators):
+        self.backend.set(self.validators_key(key), validators, self.timeout)
+
+    def clear(self):
+        self.backend.clear()
+
+    def _record(self, value):
+        stats.record(self.namespace, hit=value is not None)
+        return value
+
+
+class CacheStats:
+    """
+    Hit/miss counters per namespace. Counts are kept per process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    def record(self, namespace, hit):
+        with self._lock:
+            self._counts[(namespace, 'hits' if hit else 'misses')] += 1
+
+    def snapshot(self):
+        with self._lock:
+            counts = dict(self._counts)
+
+        result = {}
+        for (namespace, kind), value in counts.items():
+            result.setdefault(namespace, {'hits': 0, 'misses': 0})[kind] = value
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+stats = CacheStats()
+
+product_cache = CatalogCache('products')
+category_cache = CatalogCache('categories')
@@ -0,0 +1,131 @@
+"""
+Read-only fast-path serializers for the read-heavy endpoints.
+
+They produce the same output as the DRF serializers they stand in for
+(ProductSerializer and ProductListSerializer here, CartSerializer and
+OrderSerializer in their apps), but build it straight from .values() rows:
+no model instances and no per-field DRF machinery. Views use them when
+FAST_READ_SERIALIZERS is on. The conformance tests compare the rendered
+responses of both paths byte for byte, so a field added to a DRF
+serializer must be added here too.
+
+They assume DRF's default output settings: ISO 8601 datetimes, decimals
+coerced to strings and file fields as absolute URLs.
+"""
+import datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import Product
+from .serializers import FIELDS_PARAM, ProductListSerializer, ProductSerializer, ProductSummarySerializer, requested_fields
+
+
+class FastSerializer:
+    """
+    Base class: subclasses list the `columns` to fetch and build one
+    representation per row in to_representation().
+    """
+    columns = []
+
+    def __init__(self, request=None):
+        self.request = request
+        self.timezone = timezone.get_current_timezone() if settings.USE_TZ else None
+
+    def values(self, queryset):
+        # Keep annotations (e.g. search_rank) in the rows: pagination may need them
+        return queryset.prefetch_related(None).values(*self.columns, *queryset.query.annotations)
+
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+    def to_representation(self, row):
+        raise NotImplementedError
+
+    # Conversions matching the DRF fields
+    def decimal(self, value, exponent=Decimal('0.01')):
+        if value is None:
+            return ''
+        return '{:f}'.format(value.quantize(exponent))
+
+    def datetime(self, value):
+        if not value:
+            return None
+        if self.timezone is not None:
+            value = value.astimezone(self.timezone) if timezone.is_aware(value) else timezone.make_aware(value, self.timezone)
+        elif timezone.is_aware(value):
+            value = timezone.make_naive(value, datetime.timezone.utc)
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+
+class FastProductSerializer(FastSerializer):
+    """
+    ProductSerializer from .values() rows, including ?fields= selection.
+    With a `prefix` (e.g. 'product__') it reads the product's columns from
+    rows of a related model, and represents a missing product as None.
+    """
+    # Output field -> (column, conversion method), in ProductSerializer's order
+    field_map = {
+        'id': ('id', None),
+        'name': ('name', None),
+        'description': ('description', None),
+        'price': ('price', 'decimal'),
+        'stock': ('stock', None),
+        'category': ('category', None),
+        'image': ('image', 'image_url'),
+        'seller': ('seller', None),
+        'created_at': ('created_at', 'datetime'),
+        'updated_at': ('updated_at', 'datetime'),
+    }
+    fields = ProductSerializer.Meta.fields
+    default_fields = None
+    sparse = True
+
+    def __init__(self, request=None, prefix=''):
+        super().__init__(request)
+        self.prefix = prefix
+        self.storage = Product._meta.get_field('image').storage
+
+        names = requested_fields(request) if self.sparse else None
+        if names is None:
+            names = self.default_fields or self.fields
+        unknown = set(names) - set(self.fields)
+        if unknown:
+            raise serializers.ValidationError({FIELDS_PARAM: f"Unknown field(s): {', '.join(sorted(unknown))}."})
+
+        self.plan = []
+        for name in self.fields:
+            if name in names:
+                column, conversion = self.field_map[name]
+                self.plan.append((name, prefix + column, getattr(self, conversion) if conversion else None))
+        self.columns = [column for name, column, convert in self.plan]
+
+    def image_url(self, name):
+        if not name:
+            return None
+        url = self.storage.url(name)
+        if self.request is not None:
+            return self.request.build_absolute_uri(url)
+        return url
+
+    def to_representation(self, row):
+        if self.prefix and row[self.prefix + 'id'] is None:
+            return None
+        return {
+            name: convert(row[column]) if convert is not None else row[column]
+            for name, column, convert in self.plan
+        }
+
+
+class FastProductListSerializer(FastProductSerializer):
+    default_fields = ProductListSerializer.default_fields
+
+
+class FastProductSummarySerializer(FastProductSerializer):
+    fields = ProductSummarySerializer.Meta.fields
+    sparse = False
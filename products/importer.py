@@ -0,0 +1,296 @@
+"""
+Bulk product import engine used by the populate_products command and the
+populate_db endpoint.
+"""
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.dashboard import invalidate_summaries
+from accounts.models import User
+from ecommerce_backend.routers import use_primary
+from .cache import product_cache
+from .models import Category, Product
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# Fields overwritten when an imported row matches an existing product
+UPDATE_FIELDS = ['description', 'price', 'stock', 'category', 'updated_at']
+
+# Only the first few row errors are kept in full; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+
+class ProductImportError(Exception):
+    """
+    Raised when an import cannot start (unknown seller, missing or malformed file).
+    """
+
+
+def iter_json_array(fp, chunk_size=64 * 1024):
+    """
+    Yields the elements of a top-level JSON array one at a time, reading the
+    file in chunks so memory stays bounded by the chunk size plus one element.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    eof = False
+
+    def read_more():
+        nonlocal buffer, pos, eof
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            eof = True
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def peek():
+        # Returns the next non-whitespace character without consuming it ('' at EOF)
+        nonlocal pos
+        while True:
+            pos = WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer) or eof:
+                return buffer[pos:pos + 1]
+            read_more()
+
+    if peek() != '[':
+        raise ValueError('Expected a JSON array.')
+    pos += 1
+    if peek() == ']':
+        return
+
+    while True:
+        peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                read_more()
+                continue
+            # A value ending exactly at the end of the buffer (e.g. a number)
+            # may continue in the next chunk.
+            if end == len(buffer) and not eof:
+                read_more()
+                continue
+            break
+
+        yield value
+        pos = end
+
+        separator = peek()
+        if separator == ',':
+            pos += 1
+        elif separator == ']':
+            return
+        else:
+            raise ValueError(f'Expected "," or "]" in JSON array, got {separator!r}.')
+
+
+@dataclass
+class ImportStats:
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: list = field(default_factory=list)
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started_at
+
+    @property
+    def rows_per_second(self):
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    def add_error(self, row_number, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row_number, 'error': message})
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'updated': self.updated,
+            'failed': self.failed,
+            'errors': self.errors,
+            'elapsed_seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1),
+        }
+
+
+def get_seller(username):
+    try:
+        seller = User.objects.get(username=username)
+    except User.DoesNotExist:
+        raise ProductImportError(f"Seller user with username '{username}' not found. Please create one.")
+    if not seller.is_seller():
+        raise ProductImportError(f"User '{username}' is not a seller.")
+    return seller
+
+
+class ProductImporter:
+    """
+    Streams products from a JSON array file and upserts them in batches.
+
+    Products are matched on the natural key (seller, name): unknown names are
+    inserted with bulk_create, known ones updated with bulk_update. Categories
+    are resolved from an in-memory map, so each batch costs a fixed number of
+    queries regardless of its size. `progress` is called with the running
+    ImportStats after every batch.
+    """
+
+    def __init__(self, seller, batch_size=500, progress=None, chunk_size=64 * 1024):
+        self.seller = seller
+        self.batch_size = max(1, batch_size)
+        self.progress = progress
+        self.chunk_size = chunk_size
+        self.categories = {}
+
+    def run(self, json_path):
+        if not json_path:
+            raise ProductImportError('json_path is a required field.')
+        if not os.path.exists(json_path):
+            raise ProductImportError(f'JSON file not found at {json_path}')
+
+        stats = ImportStats()
+        # Matching reads back earlier batches and categories, which the replicas may not have yet
+        with use_primary():
+            self.categories = {category.name: category for category in Category.objects.all()}
+
+            batch = []
+            with open(json_path, 'r') as fp:
+                try:
+                    for row in iter_json_array(fp, self.chunk_size):
+                        stats.rows += 1
+                        batch.append((stats.rows, row))
+                        if len(batch) >= self.batch_size:
+                            self.write_batch(batch, stats)
+                            batch = []
+                except ValueError as e:
+                    # Rows before the malformed part have already been written.
+                    raise ProductImportError(f'Malformed JSON in {json_path}: {e}')
+
+            if batch:
+                self.write_batch(batch, stats)
+
+        logger.info(
+            "Imported %d rows for seller %s (%d created, %d updated, %d failed) at %.1f rows/s.",
+            stats.rows, self.seller.username, stats.created, stats.updated, stats.failed, stats.rows_per_second,
+        )
+        return stats
+
+    def write_batch(self, batch, stats):
+        # Later rows with the same name win, as they would with row-by-row upserts.
+        rows = {}
+        for row_number, row in batch:
+            try:
+                values = self.clean_row(row)
+            except (AttributeError, KeyError, TypeError, ValueError, InvalidOperation) as e:
+                stats.add_error(row_number, f'Invalid product data: {e!r}')
+                continue
+            rows[values['name']] = values
+
+        if not rows:
+            self.report(stats)
+            return
+
+        now = timezone.now()
+        existing = {
+            product.name: product
+            for product in Product.objects.filter(seller=self.seller, name__in=rows.keys())
+        }
+
+        to_create = []
+        to_update = []
+        for name, values in rows.items():
+            product = existing.get(name)
+            if product is None:
+                to_create.append(Product(
+                    name=name,
+                    description=values['description'],
+                    price=values['price'],
+                    stock=values['stock'],
+                    category=values['category'],
+                    seller=self.seller,
+                    image=self.load_image(values['image_path']),
+                ))
+            else:
+                product.description = values['description']
+                product.price = values['price']
+                product.stock = values['stock']
+                product.category = values['category']
+                product.updated_at = now
+                to_update.append(product)
+
+        with transaction.atomic():
+            Product.objects.bulk_create(to_create)
+            Product.objects.bulk_update(to_update, UPDATE_FIELDS)
+
+        # Bulk writes send no model signals, so invalidate cached products here
+        product_cache.delete_objects([product.pk for product in to_update])
+        product_cache.bump_version()
+        invalidate_summaries([self.seller.pk])
+
+        stats.created += len(to_create)
+        stats.updated += len(to_update)
+        self.report(stats)
+
+    def clean_row(self, row):
+        name = row['name'].strip()
+        if not name:
+            raise ValueError('name must not be empty')
+        price = Decimal(str(row['price']))
+        if not price > 0:
+            raise ValueError('price must be positive')
+        stock = int(row.get('stock', 0))
+        if stock < 0:
+            raise ValueError('stock must not be negative')
+        return {
+            'name': name,
+            'description': row.get('description'),
+            'price': price,
+            'stock': stock,
+            'category': self.get_category(row.get('category_name')),
+            'image_path': row.get('image_path'),
+        }
+
+    def get_category(self, name):
+        if not name:
+            return None
+        category = self.categories.get(name)
+        if category is None:
+            category, created = Category.objects.get_or_create(name=name)
+            self.categories[name] = category
+        return category
+
+    def load_image(self, image_path):
+        if not image_path:
+            return None
+        full_image_path = os.path.join(settings.MEDIA_ROOT, 'products', image_path)
+        try:
+            with open(full_image_path, 'rb') as f:
+                return ContentFile(f.read(), name=os.path.basename(full_image_path))
+        except FileNotFoundError:
+            logger.warning("Local image file not found at %s. Skipping image upload.", full_image_path)
+            return None
+
+    def report(self, stats):
+        if self.progress is not None:
+            self.progress(stats)
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from ecommerce_backend.query_plans import QueryPlanError, check_query_plans
+
+
+class Command(BaseCommand):
+    help = ('Runs EXPLAIN on the canonical queries of the product, order and cart views and fails '
+            'when any of them scans a whole table holding more than --max_rows rows.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max_rows', type=int, default=1000,
+                            help='Largest table that may be scanned sequentially (default: 1000).')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS,
+                            help='Database alias to explain the queries on.')
+
+    def handle(self, *args, **options):
+        max_rows = options['max_rows']
+        failed = []
+
+        try:
+            reports = check_query_plans(options['database'])
+        except QueryPlanError as e:
+            raise CommandError(f'Error: {e}')
+
+        for report in reports:
+            failures = report.failures(max_rows)
+            if failures:
+                failed.append(report.name)
+                scans = ', '.join(f'{scan.table} ({scan.rows} rows)' for scan in failures)
+                self.stdout.write(self.style.ERROR(f'FAIL {report.name}: sequential scan of {scans}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'ok   {report.name}'))
+
+            if failures or options['verbosity'] > 1:
+                self.stdout.write(f'     {report.sql}')
+                for line in report.plan:
+                    self.stdout.write(f'       {line}')
+
+        if failed:
+            raise CommandError(f'{len(failed)} query plan(s) scan large tables: {", ".join(failed)}')
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from products.search import install_search_index
+
+
+class Command(BaseCommand):
+    help = ('(Re)creates the product full-text search triggers and index and re-indexes every product. '
+            'Run it after a migration that rebuilds the products table on SQLite, which drops its triggers.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS,
+                            help='Database alias to rebuild the index on.')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        with connection.schema_editor() as schema_editor:
+            install_search_index(schema_editor)
+        self.stdout.write(self.style.SUCCESS(f'Search index rebuilt on {connection.vendor}.'))
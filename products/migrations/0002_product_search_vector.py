@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-18 19:05
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def install_search_index(apps, schema_editor):
+    from products.search import install_search_index
+    install_search_index(schema_editor)
+
+
+def uninstall_search_index(apps, schema_editor):
+    from products.search import uninstall_search_index
+    uninstall_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # tsvector trigger + GIN index on PostgreSQL, FTS5 table + triggers on SQLite
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-18 21:10
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def check_duplicate_products(apps, schema_editor):
+    """
+    Refuses to go on while products share a (seller, name), which 0005 makes
+    unique. Which duplicate to keep (stock, price, images, the cart and
+    order lines pointing at each) is for an operator to decide, so they are
+    listed rather than merged.
+    """
+    Product = apps.get_model('products', 'Product')
+    groups = list(
+        Product.objects.using(schema_editor.connection.alias)
+        .values('seller', 'name')
+        .annotate(count=Count('id'))
+        .filter(count__gt=1)
+        .order_by('seller', 'name')
+    )
+    if not groups:
+        return
+
+    lines = []
+    for group in groups:
+        ids = Product.objects.using(schema_editor.connection.alias).filter(
+            seller=group['seller'], name=group['name'],
+        ).order_by('id').values_list('id', flat=True)
+        lines.append(f"  seller {group['seller']}, name {group['name']!r}: products {', '.join(map(str, ids))}")
+    raise RuntimeError(
+        f'{len(groups)} (seller, name) pair(s) are used by more than one product. Rename or delete the '
+        'duplicates, then migrate again:\n' + '\n'.join(lines)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_products, migrations.RunPython.noop),
+    ]
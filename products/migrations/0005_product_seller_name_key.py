@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-18 21:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def reinstall_sqlite_search_index(apps, schema_editor):
+    # SQLite rebuilds the table to change its constraints, which drops the search triggers
+    if schema_editor.connection.vendor == 'sqlite':
+        from products.search import install_search_index
+        install_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_check_duplicate_products'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, reinstall_sqlite_search_index),
+        migrations.AddConstraint(
+            model_name='product',
+            constraint=models.UniqueConstraint(fields=('seller', 'name'), name='product_seller_name_key'),
+        ),
+        migrations.RunPython(reinstall_sqlite_search_index, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,4 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
 from django.db import models
 from decimal import Decimal
@@ -41,9 +42,23 @@ class Product(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by a database trigger on PostgreSQL (see products.search);
+    # unused on other databases.
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering  = ['name']
+        indexes = [
+            # Keyset-paginated listings: all products, a seller's own products
+            # and products of a category, each ordered by (name, id)
+            models.Index(fields=['name', 'id'], name='product_name_id_idx'),
+            models.Index(fields=['seller', 'name', 'id'], name='product_seller_name_idx'),
+            models.Index(fields=['category', 'name', 'id'], name='product_category_name_idx'),
+        ]
+        constraints = [
+            # The natural key bulk imports match products on
+            models.UniqueConstraint(fields=['seller', 'name'], name='product_seller_name_key'),
+        ]
 
     def __str__(self):
         return self.name
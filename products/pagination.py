@@ -0,0 +1,170 @@
+import base64
+import binascii
+import json
+import math
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on (ordering field, id).
+
+    Each page is fetched with a WHERE clause on the last key seen instead of an
+    OFFSET, so page N costs the same as page 1. Cursors are opaque base64 tokens.
+    Search results (querysets annotated with `search_rank`) are paged by
+    relevance instead.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    # The last field must be unique so that every row has a distinct key.
+    ordering = ('name', 'id')
+    ranked_ordering = ('-search_rank', 'id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        page_size = settings.PRODUCT_PAGE_SIZE
+        max_page_size = settings.PRODUCT_MAX_PAGE_SIZE
+
+        requested = request.query_params.get(self.page_size_query_param)
+        if requested:
+            try:
+                page_size = int(requested)
+            except ValueError:
+                pass
+
+        return max(1, min(page_size, max_page_size))
+
+    def get_ordering(self, queryset):
+        if 'search_rank' in queryset.query.annotations:
+            return self.ranked_ordering
+        return self.ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.current_ordering = self.get_ordering(queryset)
+        self.cursor = self.decode_cursor(request, queryset)
+
+        if self.cursor is None:
+            reverse = False
+            queryset = queryset.order_by(*self.current_ordering)
+        else:
+            value, pk, reverse = self.cursor
+            ordering = self.current_ordering
+            if reverse:
+                ordering = [name[1:] if name.startswith('-') else f'-{name}' for name in ordering]
+            queryset = queryset.filter(self.get_position_filter(value, pk, reverse)).order_by(*ordering)
+
+        # Fetch one extra row to find out whether there is another page.
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_previous = has_more
+            self.has_next = True
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        self.page = results
+        return results
+
+    def get_position_filter(self, value, pk, reverse):
+        """
+        Rows strictly after (value, pk) in the current ordering, or strictly
+        before it when paging backwards.
+        """
+        (field, field_desc), (tiebreaker, tiebreaker_desc) = [
+            (name.lstrip('-'), name.startswith('-')) for name in self.current_ordering
+        ]
+
+        def lookup(descending):
+            return 'lt' if descending != reverse else 'gt'
+
+        return (
+            Q(**{f'{field}__{lookup(field_desc)}': value})
+            | Q(**{field: value, f'{tiebreaker}__{lookup(tiebreaker_desc)}': pk})
+        )
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def decode_cursor(self, request, queryset):
+        """
+        Returns a (value, pk, reverse) tuple, or None when no cursor was sent.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            decoded = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8')
+            position = json.loads(decoded)
+            value = self.clean_cursor_value(position['v'], queryset)
+            return value, int(position['i']), bool(position.get('r', False))
+        except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def clean_cursor_value(self, value, queryset):
+        """
+        Converts the cursor value to the type of the ordering field, so that a
+        forged cursor is rejected instead of reaching the database.
+        """
+        if value is None or isinstance(value, (bool, list, dict)):
+            raise ValueError(value)
+
+        field = self.current_ordering[0].lstrip('-')
+        try:
+            model_field = queryset.model._meta.get_field(field)
+        except FieldDoesNotExist:
+            # Annotations such as search_rank are floats
+            if not isinstance(value, (int, float)) or not math.isfinite(value):
+                raise ValueError(value)
+            return float(value)
+        return model_field.to_python(value)
+
+    def encode_cursor(self, obj, reverse):
+        field, tiebreaker = [name.lstrip('-') for name in self.current_ordering]
+        # Pages hold model instances, or dicts on the fast path (.values() rows)
+        key = obj.get if isinstance(obj, dict) else lambda name: getattr(obj, name)
+        position = {'v': key(field), 'i': key(tiebreaker)}
+        if reverse:
+            position['r'] = True
+
+        encoded = base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
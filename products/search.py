@@ -0,0 +1,198 @@
+"""
+Full-text product search.
+
+PostgreSQL: products_product.search_vector holds a weighted tsvector of name (A)
+and description (B). A trigger keeps it current and a GIN index serves queries.
+SQLite (local development): an FTS5 table, products_product_fts, is kept in sync
+with products_product by triggers.
+Other databases fall back to icontains matching.
+
+Every backend supports prefix matching of each term (all terms must match) and
+annotates results with `search_rank`, where higher is more relevant.
+"""
+import re
+
+from django.db import connections
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+TERM = re.compile(r'[^\W_]+')
+MAX_TERMS = 10
+
+PRODUCT_TABLE = 'products_product'
+SEARCH_CONFIG = 'english'
+FTS_TABLE = 'products_product_fts'
+
+
+def get_terms(query):
+    """
+    Splits user input into lowercase word tokens. Anything else is dropped, so
+    terms are always safe to embed in tsquery/FTS5 query syntax.
+    """
+    return TERM.findall(query.lower())[:MAX_TERMS]
+
+
+def postgres_search_vector(row=''):
+    """
+    SQL for the weighted tsvector of a product row (`row` is 'NEW.' in the trigger).
+    """
+    return (
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({row}name, '')), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({row}description, '')), 'B')"
+    )
+
+
+class PostgresSearchBackend:
+    install_sql = [
+        f"""
+        CREATE OR REPLACE FUNCTION {PRODUCT_TABLE}_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            -- Only re-parse the text when it changed. Otherwise keep the vector
+            -- written (the rebuild's), or the stored one when an instance that
+            -- never loaded it is saved back with NULL (e.g. a stock update).
+            IF TG_OP = 'UPDATE'
+                AND NEW.name IS NOT DISTINCT FROM OLD.name
+                AND NEW.description IS NOT DISTINCT FROM OLD.description
+                AND coalesce(NEW.search_vector, OLD.search_vector) IS NOT NULL THEN
+                NEW.search_vector := coalesce(NEW.search_vector, OLD.search_vector);
+            ELSE
+                NEW.search_vector := {postgres_search_vector('NEW.')};
+            END IF;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        f"DROP TRIGGER IF EXISTS {PRODUCT_TABLE}_search_vector_trigger ON {PRODUCT_TABLE}",
+        f"""
+        CREATE TRIGGER {PRODUCT_TABLE}_search_vector_trigger
+            BEFORE INSERT OR UPDATE ON {PRODUCT_TABLE}
+            FOR EACH ROW EXECUTE FUNCTION {PRODUCT_TABLE}_search_vector_update()
+        """,
+        # (Re)index existing rows. The vector is computed here: the trigger
+        # keeps the stored one for rows whose text did not change.
+        f"UPDATE {PRODUCT_TABLE} SET search_vector = {postgres_search_vector()}",
+        f"CREATE INDEX IF NOT EXISTS {PRODUCT_TABLE}_search_vector_gin ON {PRODUCT_TABLE} USING GIN (search_vector)",
+    ]
+    uninstall_sql = [
+        f"DROP INDEX IF EXISTS {PRODUCT_TABLE}_search_vector_gin",
+        f"DROP TRIGGER IF EXISTS {PRODUCT_TABLE}_search_vector_trigger ON {PRODUCT_TABLE}",
+        f"DROP FUNCTION IF EXISTS {PRODUCT_TABLE}_search_vector_update()",
+    ]
+
+    def search(self, queryset, terms):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        query = SearchQuery(' & '.join(f'{term}:*' for term in terms), search_type='raw', config=SEARCH_CONFIG)
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query)
+        )
+
+
+class SQLiteSearchBackend:
+    install_sql = [
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+            name, description, content='{PRODUCT_TABLE}', content_rowid='id', tokenize='porter unicode61'
+        )
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON {PRODUCT_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON {PRODUCT_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+                VALUES ('delete', old.id, old.name, old.description);
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE OF name, description ON {PRODUCT_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+                VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+        END
+        """,
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+    ]
+    uninstall_sql = [
+        f"DROP TRIGGER IF EXISTS {FTS_TABLE}_insert",
+        f"DROP TRIGGER IF EXISTS {FTS_TABLE}_delete",
+        f"DROP TRIGGER IF EXISTS {FTS_TABLE}_update",
+        f"DROP TABLE IF EXISTS {FTS_TABLE}",
+    ]
+
+    def search(self, queryset, terms):
+        match = ' '.join(f'"{term}"*' for term in terms)
+        # Join the FTS table so bm25() is computed during the single MATCH scan;
+        # a correlated subquery would re-run the MATCH for every candidate row.
+        # bm25() is lower for better matches; name hits weigh twice as much as
+        # description hits.
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = {PRODUCT_TABLE}.id', f'{FTS_TABLE} MATCH %s'],
+            params=[match],
+        ).annotate(
+            search_rank=RawSQL(f'-bm25({FTS_TABLE}, 10.0, 5.0)', [], output_field=FloatField())
+        )
+
+
+class BasicSearchBackend:
+    install_sql = []
+    uninstall_sql = []
+
+    def search(self, queryset, terms):
+        for term in terms:
+            queryset = queryset.filter(Q(name__icontains=term) | Q(description__icontains=term))
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+def get_search_backend(using='default'):
+    vendor = connections[using].vendor
+    if vendor == 'postgresql':
+        return PostgresSearchBackend()
+    if vendor == 'sqlite':
+        return SQLiteSearchBackend()
+    return BasicSearchBackend()
+
+
+def install_search_index(schema_editor):
+    """
+    Creates the search triggers and index for the connection's database and
+    indexes existing products. Safe to run repeatedly.
+    """
+    backend = get_search_backend(schema_editor.connection.alias)
+    for sql in backend.install_sql:
+        schema_editor.execute(sql)
+
+
+def uninstall_search_index(schema_editor):
+    backend = get_search_backend(schema_editor.connection.alias)
+    for sql in backend.uninstall_sql:
+        schema_editor.execute(sql)
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    Drop-in replacement for SearchFilter (same ?search= parameter) that uses the
+    full-text index and orders results by relevance.
+    """
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        terms = get_terms(request.query_params.get(self.search_param, ''))
+        if not terms:
+            return queryset
+        backend = get_search_backend(queryset.db)
+        return backend.search(queryset, terms).order_by('-search_rank', 'id')
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': self.search_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Full-text search over name and description (prefix matching, ranked).',
+            'schema': {'type': 'string'},
+        }]
@@ -1,8 +1,49 @@
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 from .models import Product, Category
 
+# Query parameter selecting the fields of a response, e.g. ?fields=id,name,price
+FIELDS_PARAM = 'fields'
 
-class CategorySerializer(serializers.ModelSerializer):
+
+def requested_fields(request):
+    """
+    The field names listed in the request's ?fields= parameter, or None when
+    the parameter is absent (or the request is not a read).
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    value = request.query_params.get(FIELDS_PARAM)
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class SparseFieldsMixin:
+    """
+    Limits the output to the fields named in ?fields= (sparse fieldsets), or
+    else to `default_fields` when the serializer sets them. Only applies to
+    the top-level serializer of a response: nested serializers have no
+    request in their context when they are built.
+    """
+    default_fields = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        names = requested_fields(self.context.get('request'))
+        if names is None:
+            names = self.default_fields
+        if names is None:
+            return
+
+        unknown = set(names) - set(self.fields)
+        if unknown:
+            raise serializers.ValidationError({FIELDS_PARAM: f"Unknown field(s): {', '.join(sorted(unknown))}."})
+        for name in set(self.fields) - set(names):
+            self.fields.pop(name)
+
+
+class CategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ['id', 'name', 'description', 'created_at', 'updated_at']
@@ -12,14 +53,15 @@ class CategorySerializer(serializers.ModelSerializer):
 
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     category = serializers.PrimaryKeyRelatedField(
         queryset=Category.objects.all(),
         required=True
     )
     # Add seller to the list of fields. It will be automatically set by the view but should
     # be shown in the response.
-    seller = serializers.PrimaryKeyRelatedField(read_only=True)
+    # The default lets the (seller, name) uniqueness be validated
+    seller = serializers.PrimaryKeyRelatedField(read_only=True, default=serializers.CurrentUserDefault())
     class Meta:
         model = Product
         fields = ['id', 'name', 'description', 'price', 'stock', 'category', 'image', 'seller', 'created_at', 'updated_at']
@@ -30,3 +72,21 @@ class ProductSerializer(serializers.ModelSerializer):
         if value <= 0:
             raise serializers.ValidationError("Price must be positive.")
         return value
+
+
+class ProductListSerializer(ProductSerializer):
+    """
+    Compact representation for product listings: leaves out the description
+    and timestamps, which can still be requested with ?fields=.
+    """
+    default_fields = ['id', 'name', 'price', 'stock', 'category', 'image', 'seller']
+
+
+class ProductSummarySerializer(serializers.ModelSerializer):
+    """
+    The product as nested in cart and order items.
+    """
+    class Meta:
+        model = Product
+        fields = ['id', 'name', 'price', 'stock', 'image']
+        read_only_fields = fields
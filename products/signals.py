@@ -0,0 +1,39 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import category_cache, product_cache
+from .models import Category, Product
+
+
+def invalidate(cache, pks):
+    """
+    Drops the cached objects and list pages once the transaction commits:
+    invalidating earlier lets a concurrent request cache the old rows again
+    before the change is visible, or cache a change that is rolled back.
+    """
+    def run():
+        cache.delete_objects(pks)
+        cache.bump_version()
+
+    transaction.on_commit(run)
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_product_cache(sender, instance, **kwargs):
+    invalidate(product_cache, [instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category_cache(sender, instance, **kwargs):
+    invalidate(category_cache, [instance.pk])
+
+
+@receiver(pre_delete, sender=Category)
+def invalidate_products_of_category(sender, instance, **kwargs):
+    # Deleting a category sets product.category to NULL with a bulk UPDATE,
+    # which sends no Product signals and leaves updated_at alone, so drop
+    # those products here and mark them changed for the HTTP validators.
+    invalidate(product_cache, list(instance.products.values_list('id', flat=True)))
+    instance.products.update(updated_at=timezone.now())
@@ -0,0 +1,18 @@
+"""
+Background job handlers for the products app (see jobs.registry).
+"""
+from jobs.registry import register
+from .importer import ProductImporter, get_seller
+
+
+@register('populate_products')
+def populate_products(job):
+    seller = get_seller(job.payload['seller_name'])
+    importer = ProductImporter(
+        seller,
+        batch_size=job.payload.get('batch_size', 500),
+        progress=lambda stats: job.set_progress(stats.as_dict()),
+    )
+    stats = importer.run(job.payload['json_path'])
+    job.progress = stats.as_dict()
+    return stats.as_dict()
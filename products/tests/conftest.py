@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def detect_query_problems(query_detector):
+    """
+    Every request made by the catalog tests is checked for N+1 queries.
+    """
+    yield
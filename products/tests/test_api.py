@@ -36,8 +36,9 @@ def test_product_list(client):
     # First check the status code (200)ok
     assert response.status_code == status.HTTP_200_OK
 
-    # Second, check the content of the response. It should be a JSON array
-    data = response.json()
+    # Second, check the content of the response. Products are paginated,
+    # so the JSON array lives under 'results'
+    data = response.json()['results']
     assert isinstance(data, list) # check if its a list for multiple products
     assert len(data) == 2 # check if the no.of products from above were created
 
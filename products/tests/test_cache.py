@@ -0,0 +1,124 @@
+import pytest
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from products.cache import stats
+from products.models import Product, Category
+from django.contrib.auth import get_user_model
+User = get_user_model()
+
+
+@pytest.fixture
+def product(db):
+    seller = User.objects.create_user(username='seller', password='Sellerpassword123', role='SELLER')
+    category = Category.objects.create(name='Books')
+    return Product.objects.create(name='Dune', price=10, stock=3, category=category, seller=seller)
+
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    stats.reset()
+
+
+def test_product_detail_is_served_from_cache(client, product, django_assert_num_queries):
+    first = client.get(f'/api/products/{product.id}/')
+    assert first['X-Cache'] == 'MISS'
+
+    # The payload and its ETag/Last-Modified validators come from the cache
+    with django_assert_num_queries(0):
+        second = client.get(f'/api/products/{product.id}/')
+
+    assert second['X-Cache'] == 'HIT'
+    assert second.json() == first.json()
+    assert stats.snapshot()['products'] == {'hits': 1, 'misses': 1}
+
+
+def test_product_save_invalidates_detail_and_list(client, product, django_capture_on_commit_callbacks):
+    client.get(f'/api/products/{product.id}/')
+    client.get('/api/products/')
+
+    product.name = 'Dune Messiah'
+    with django_capture_on_commit_callbacks(execute=True):
+        product.save()
+
+    detail = client.get(f'/api/products/{product.id}/')
+    listing = client.get('/api/products/')
+    assert detail['X-Cache'] == 'MISS'
+    assert detail.json()['name'] == 'Dune Messiah'
+    assert listing['X-Cache'] == 'MISS'
+    assert listing.json()['results'][0]['name'] == 'Dune Messiah'
+
+
+def test_product_delete_invalidates_list(client, product, django_capture_on_commit_callbacks):
+    assert len(client.get('/api/products/').json()['results']) == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        product.delete()
+
+    assert client.get('/api/products/').json()['results'] == []
+
+
+def test_invalidation_waits_for_commit(client, product, django_capture_on_commit_callbacks):
+    client.get(f'/api/products/{product.id}/')
+
+    product.name = 'Dune Messiah'
+    with django_capture_on_commit_callbacks() as callbacks:
+        product.save()
+        # Not committed yet: concurrent readers keep the cached product
+        assert client.get(f'/api/products/{product.id}/')['X-Cache'] == 'HIT'
+
+    for callback in callbacks:
+        callback()
+    assert client.get(f'/api/products/{product.id}/')['X-Cache'] == 'MISS'
+
+
+def test_list_pages_are_cached_per_query(client, product):
+    assert client.get('/api/products/')['X-Cache'] == 'MISS'
+    assert client.get('/api/products/?search=dune')['X-Cache'] == 'MISS'
+    assert client.get('/api/products/')['X-Cache'] == 'HIT'
+    assert client.get('/api/products/?search=dune')['X-Cache'] == 'HIT'
+
+
+def test_authenticated_listing_bypasses_cache(client, product):
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(product.seller)}'}
+
+    client.get('/api/products/', **headers)
+    response = client.get('/api/products/', **headers)
+
+    assert 'X-Cache' not in response
+    assert 'products' not in stats.snapshot()
+
+
+def test_category_delete_invalidates_its_products(client, product, django_capture_on_commit_callbacks):
+    client.get(f'/api/products/{product.id}/')
+
+    with django_capture_on_commit_callbacks(execute=True):
+        product.category.delete()
+
+    response = client.get(f'/api/products/{product.id}/')
+    assert response['X-Cache'] == 'MISS'
+    assert response.json()['category'] is None
+
+
+def test_category_list_invalidated_on_create(client, db, django_capture_on_commit_callbacks):
+    Category.objects.create(name='Books')
+    assert len(client.get('/api/categories/').json()) == 1
+    assert client.get('/api/categories/')['X-Cache'] == 'HIT'
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Category.objects.create(name='Games')
+
+    response = client.get('/api/categories/')
+    assert response['X-Cache'] == 'MISS'
+    assert len(response.json()) == 2
+
+
+def test_cache_stats_requires_admin(client, product):
+    client.get(f'/api/products/{product.id}/')
+    assert client.get('/api/products/cache_stats/').status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
+
+    admin = User.objects.create_superuser(username='admin', password='Adminpassword123')
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(admin)}'}
+    response = client.get('/api/products/cache_stats/', **headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['products'] == {'hits': 0, 'misses': 1}
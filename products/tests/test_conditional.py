@@ -0,0 +1,139 @@
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from orders.stock import reserve_stock
+from products.models import Product, Category
+from django.contrib.auth import get_user_model
+User = get_user_model()
+
+
+@pytest.fixture
+def seller(db):
+    return User.objects.create_user(username='seller', password='Sellerpassword123', role='SELLER')
+
+
+@pytest.fixture
+def catalog(seller):
+    category = Category.objects.create(name='Books')
+    return [
+        Product.objects.create(name=name, price=10, stock=3, category=category, seller=seller)
+        for name in ('Atlas', 'Bible', 'Cookbook')
+    ]
+
+
+@pytest.mark.parametrize('url', ['/api/products/', '/api/categories/'])
+def test_list_not_modified(client, catalog, url):
+    first = client.get(url)
+    assert first.status_code == status.HTTP_200_OK
+    assert first['ETag'].startswith('W/"')
+    assert first['Last-Modified']
+
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b''
+    assert response['ETag'] == first['ETag']
+    # The validators were cached with the page: no query, nothing serialized
+    assert len(context) == 0
+
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.parametrize('url', ['/api/products/abc/', '/api/categories/abc/'])
+def test_detail_with_malformed_pk_is_not_found(client, catalog, url):
+    assert client.get(url).status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_detail_not_modified_until_product_changes(client, catalog, django_capture_on_commit_callbacks):
+    url = f'/api/products/{catalog[0].id}/'
+    etag = client.get(url)['ETag']
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+    catalog[0].stock = 1
+    with django_capture_on_commit_callbacks(execute=True):
+        catalog[0].save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['stock'] == 1
+    assert response['ETag'] != etag
+
+
+def test_list_etag_changes_on_update_and_delete(client, catalog, django_capture_on_commit_callbacks):
+    etag = client.get('/api/products/')['ETag']
+
+    catalog[1].price = 12
+    with django_capture_on_commit_callbacks(execute=True):
+        catalog[1].save()
+    updated = client.get('/api/products/', HTTP_IF_NONE_MATCH=etag)
+    assert updated.status_code == status.HTTP_200_OK
+
+    with django_capture_on_commit_callbacks(execute=True):
+        catalog[2].delete()
+    deleted = client.get('/api/products/', HTTP_IF_NONE_MATCH=updated['ETag'])
+    assert deleted.status_code == status.HTTP_200_OK
+    assert len(deleted.json()['results']) == 2
+
+
+def test_deleting_category_changes_product_etag(client, catalog, django_capture_on_commit_callbacks):
+    url = f'/api/products/{catalog[0].id}/'
+    etag = client.get(url)['ETag']
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Category.objects.get(name='Books').delete()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['category'] is None
+
+
+def test_stock_reservation_changes_cached_product_etag(client, catalog, django_capture_on_commit_callbacks):
+    url = f'/api/products/{catalog[0].id}/'
+    etag = client.get(url)['ETag']
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+    # A bulk UPDATE, invalidated by hand like the cached payload
+    with django_capture_on_commit_callbacks(execute=True), transaction.atomic():
+        reserve_stock({catalog[0].id: 1})
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['stock'] == 2
+
+
+def test_etag_depends_on_query_and_user(client, seller, catalog):
+    public = client.get('/api/products/')['ETag']
+    assert client.get('/api/products/?fields=id,name')['ETag'] != public
+
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(seller)}'}
+    own = client.get('/api/products/', HTTP_IF_NONE_MATCH=public, **headers)
+    assert own.status_code == status.HTTP_200_OK
+
+
+def test_seller_listing_validators_are_cached(client, seller, catalog, django_capture_on_commit_callbacks):
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(seller)}'}
+    etag = client.get('/api/products/', **headers)['ETag']
+
+    with CaptureQueriesContext(connection) as context:
+        response = client.get('/api/products/', HTTP_IF_NONE_MATCH=etag, **headers)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not any('MAX' in query['sql'].upper() for query in context.captured_queries)
+
+    # Cached per user: another seller's listing has its own validators
+    other = User.objects.create_user(username='other', password='Otherpassword123', role='SELLER')
+    response = client.get('/api/products/', HTTP_IF_NONE_MATCH=etag,
+                          HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(other)}')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['results'] == []
+
+    with django_capture_on_commit_callbacks(execute=True):
+        catalog[0].delete()
+    response = client.get('/api/products/', HTTP_IF_NONE_MATCH=etag, **headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()['results']) == 2
+
+
+def test_missing_product_is_still_404(client, catalog):
+    response = client.get('/api/products/999999/', HTTP_IF_NONE_MATCH='W/"anything"')
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert 'ETag' not in response
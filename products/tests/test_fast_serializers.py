@@ -0,0 +1,103 @@
+"""
+Conformance of the fast-path serializers (FAST_READ_SERIALIZERS): every
+endpoint must render byte-identical responses with and without them.
+"""
+from decimal import Decimal
+
+import pytest
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from cart.models import Cart, CartItem
+from orders.models import Order, OrderItem
+from products.cache import product_cache
+from products.models import Product, Category
+from django.contrib.auth import get_user_model
+User = get_user_model()
+
+
+@pytest.fixture
+def seller(db):
+    return User.objects.create_user(username='seller', password='Sellerpassword123', role='SELLER')
+
+
+@pytest.fixture
+def catalog(seller):
+    category = Category.objects.create(name='Books')
+    return [
+        Product.objects.create(name='Dune', description='Épopée — «sable»', price=Decimal('10.50'), stock=3,
+                               category=category, seller=seller, image='products/images/dune.jpg'),
+        Product.objects.create(name='Atlas', description='', price=Decimal('1234.00'), stock=0,
+                               category=category, seller=seller),
+        Product.objects.create(name='Zine', description='No category', price=Decimal('0.99'), stock=12,
+                               seller=seller, image='products/images/zine.png'),
+    ]
+
+
+@pytest.fixture
+def buyer(db):
+    return User.objects.create_user(username='buyer', password='Buyerpassword123')
+
+
+def headers_for(user):
+    return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+
+
+def assert_conforms(client, settings, url, **headers):
+    responses = []
+    for fast in (False, True):
+        settings.FAST_READ_SERIALIZERS = fast
+        product_cache.clear()
+        responses.append(client.get(url, **headers))
+    slow, fast = responses
+    assert slow.status_code == fast.status_code == status.HTTP_200_OK
+    assert fast.content == slow.content
+    return slow.json()
+
+
+@pytest.mark.parametrize('query', [
+    '',
+    '?fields=id,name,price',
+    '?fields=description,image,created_at,updated_at,category',
+    '?page_size=2',
+])
+def test_product_list_conforms(client, settings, catalog, query):
+    assert assert_conforms(client, settings, f'/api/products/{query}')['results']
+
+
+def test_product_list_pages_conform(client, settings, seller, catalog):
+    first = assert_conforms(client, settings, '/api/products/?page_size=2', **headers_for(seller))
+    assert first['next']
+    second = assert_conforms(client, settings, first['next'], **headers_for(seller))
+    assert [product['name'] for product in second['results']] == ['Zine']
+
+
+def test_unknown_field_is_rejected_on_fast_path(client, settings, catalog):
+    settings.FAST_READ_SERIALIZERS = True
+    assert client.get('/api/products/?fields=secret').status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_cart_conforms(client, settings, buyer, catalog):
+    cart = Cart.objects.create(user=buyer)
+    CartItem.objects.create(cart=cart, product=catalog[0], quantity=3)
+    CartItem.objects.create(cart=cart, product=catalog[2], quantity=1)
+
+    data = assert_conforms(client, settings, '/api/cart/', **headers_for(buyer))
+    assert len(data['items']) == 2
+
+
+def test_empty_cart_conforms(client, settings, buyer):
+    assert assert_conforms(client, settings, '/api/cart/', **headers_for(buyer))['items'] == []
+
+
+def test_orders_conform(client, settings, buyer, catalog):
+    for lines in ([(catalog[0], 2), (catalog[1], 1)], [(catalog[2], 5)]):
+        order = Order.objects.create(user=buyer, total_amount=sum(p.price * q for p, q in lines))
+        for product, quantity in lines:
+            OrderItem.objects.create(order=order, product=product, product_name=product.name,
+                                     product_price=product.price, quantity=quantity)
+    # Order lines outlive deleted products
+    catalog[1].delete()
+
+    data = assert_conforms(client, settings, '/api/orders/', **headers_for(buyer))
+    assert len(data) == 2
+    assert None in [item['product'] for order in data for item in order['items']]
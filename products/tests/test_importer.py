@@ -0,0 +1,117 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from products.importer import ProductImporter, iter_json_array
+from products.models import Product, Category
+from django.contrib.auth import get_user_model
+User = get_user_model()
+
+
+@pytest.fixture
+def seller(db):
+    return User.objects.create_user(username='seller', password='Sellerpassword123', role='SELLER')
+
+
+def write_products(tmp_path, rows):
+    path = tmp_path / 'products.json'
+    path.write_text(json.dumps(rows, indent=2))
+    return str(path)
+
+
+def make_rows(count, category_count=3, price=10):
+    return [
+        {
+            'name': f'Product {i}',
+            'description': f'Description {i}',
+            'price': price,
+            'stock': i,
+            'category_name': f'Category {i % category_count}',
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64 * 1024])
+def test_iter_json_array_across_chunk_boundaries(chunk_size):
+    data = [{'name': 'a', 'price': 1.5}, 12345, 'text with ] and ,', [1, [2]], {}, None]
+    fp = io.StringIO(json.dumps(data, indent=4))
+
+    assert list(iter_json_array(fp, chunk_size)) == data
+
+
+def test_iter_json_array_rejects_non_arrays():
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO('{"name": "a"}')))
+    assert list(iter_json_array(io.StringIO(' [ ] '))) == []
+
+
+def test_import_creates_products_and_categories_in_batches(seller, tmp_path, django_assert_max_num_queries):
+    path = write_products(tmp_path, make_rows(50))
+    progress = []
+
+    # categories + per batch: existing lookup, insert (+ savepoint bookkeeping)
+    with django_assert_max_num_queries(40):
+        stats = ProductImporter(seller, batch_size=20, progress=lambda s: progress.append(s.rows)).run(path)
+
+    assert (stats.rows, stats.created, stats.updated, stats.failed) == (50, 50, 0, 0)
+    assert progress == [20, 40, 50]
+    assert Product.objects.filter(seller=seller).count() == 50
+    assert Category.objects.count() == 3
+    assert Product.objects.get(name='Product 4').category.name == 'Category 1'
+
+
+def test_import_upserts_on_seller_and_name(seller, tmp_path):
+    ProductImporter(seller).run(write_products(tmp_path, make_rows(5)))
+
+    stats = ProductImporter(seller).run(write_products(tmp_path, make_rows(8, price=20)))
+
+    assert (stats.created, stats.updated) == (3, 5)
+    assert Product.objects.count() == 8
+    assert set(Product.objects.values_list('price', flat=True)) == {20}
+
+
+def test_import_reports_bad_rows_and_keeps_going(seller, tmp_path):
+    rows = make_rows(3)
+    rows.insert(1, {'name': 'No price'})
+    rows.append({'name': 'Negative', 'price': -1})
+
+    stats = ProductImporter(seller).run(write_products(tmp_path, rows))
+
+    assert (stats.created, stats.failed) == (3, 2)
+    assert [error['row'] for error in stats.errors] == [2, 5]
+
+
+def test_command_uses_importer(seller, tmp_path):
+    out = io.StringIO()
+    call_command('populate_products', 'seller', json_path=write_products(tmp_path, make_rows(4)), batch_size=2, stdout=out)
+
+    assert Product.objects.count() == 4
+    assert 'Processed 4 rows' in out.getvalue()
+
+
+def test_command_rejects_non_seller(db, tmp_path):
+    User.objects.create_user(username='buyer', password='Buyerpassword123')
+    with pytest.raises(CommandError):
+        call_command('populate_products', 'buyer', json_path=write_products(tmp_path, make_rows(1)), stdout=io.StringIO())
+
+
+def test_populate_endpoint_queues_import_job(client, seller, tmp_path):
+    admin = User.objects.create_superuser(username='admin', password='Adminpassword123')
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(admin)}'}
+
+    response = client.post(
+        '/api/products/populate_db/',
+        data={'seller_name': 'seller', 'json_path': write_products(tmp_path, make_rows(3))},
+        content_type='application/json',
+        **headers
+    )
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.json()['status'] == 'Queued'
+    # Nothing is imported until a worker runs the job
+    assert Product.objects.count() == 0
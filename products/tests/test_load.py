@@ -0,0 +1,50 @@
+import json
+import random
+
+import pytest
+from django.core.signals import request_finished, request_started
+from django.core.wsgi import get_wsgi_application
+from django.db import close_old_connections
+from rest_framework_simplejwt.tokens import AccessToken
+from benchmarks.data import generate
+from benchmarks.load import Recorder, VirtualUser, WSGIClient
+
+
+class RecordingClient(WSGIClient):
+    def __init__(self, application, token):
+        super().__init__(application, token)
+        self.responses = []
+
+    def request(self, method, path, query='', data=None, auth=True):
+        status, content = super().request(method, path, query, data, auth)
+        self.responses.append((method, path, query, json.loads(content) if content else None))
+        return status, content
+
+
+@pytest.fixture
+def application():
+    # Like the test client: the connection must survive the request, which runs in the test transaction
+    request_started.disconnect(close_old_connections)
+    request_finished.disconnect(close_old_connections)
+    yield get_wsgi_application()
+    request_started.connect(close_old_connections)
+    request_finished.connect(close_old_connections)
+
+
+@pytest.fixture
+def dataset(db, settings):
+    settings.ALLOWED_HOSTS = ['*']
+    return generate(sellers=2, categories=2, products=20, buyers=1, carts=0, orders=0)
+
+
+def test_load_test_browses_the_whole_catalog(application, dataset):
+    client = RecordingClient(application, AccessToken.for_user(dataset.buyers[0]))
+    recorder = Recorder()
+
+    VirtualUser(client, random.Random(1), dataset, recorder).shop()
+
+    assert not recorder.errors
+    listing = next(body for method, path, query, body in client.responses if path == '/api/products/' and not query)
+    assert len(listing['results']) == 20
+    category = next(body for method, path, query, body in client.responses if query.startswith('category='))
+    assert category['results']
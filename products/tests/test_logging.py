@@ -0,0 +1,25 @@
+import io
+import logging
+import logging.config
+
+from django.conf import settings
+
+
+def test_queue_handler_writes_formatted_records_from_listener_thread():
+    stream = io.StringIO()
+    logging.config.dictConfig({
+        'version': 1,
+        'disable_existing_loggers': False,
+        'handlers': {'queue': {**settings.LOGGING['handlers']['queue'], 'stream': stream}},
+        'loggers': {'logging_test': {'handlers': ['queue'], 'level': 'INFO', 'propagate': False}},
+    })
+    logger = logging.getLogger('logging_test')
+    handler = logger.handlers[0]
+
+    logger.info('checked out %s', 'cart 1')
+    # Stopping the listener flushes the queue
+    handler.listener.stop()
+    logger.removeHandler(handler)
+
+    assert 'level=INFO logger=logging_test' in stream.getvalue()
+    assert 'msg="checked out cart 1"' in stream.getvalue()
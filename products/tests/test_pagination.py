@@ -0,0 +1,96 @@
+import base64
+import json
+
+import pytest
+from django.test import override_settings
+from rest_framework import status
+from products.models import Product, Category
+from django.contrib.auth import get_user_model
+User = get_user_model()
+
+
+@pytest.fixture
+def catalog(db):
+    seller = User.objects.create_user(username='seller', password='Sellerpassword123', role='SELLER')
+    others = [User.objects.create_user(username=f'seller{i}', role='SELLER') for i in range(2)]
+    books = Category.objects.create(name='Books')
+    games = Category.objects.create(name='Games')
+    for name in ['Alpha', 'Bravo', 'Charlie', 'Delta', 'Echo']:
+        Product.objects.create(name=name, price=10, stock=1, category=books, seller=seller)
+    # Duplicate names (of other sellers) make sure the id tiebreaker is used
+    for other in others:
+        Product.objects.create(name='Bravo', price=10, stock=1, category=books, seller=other)
+    Product.objects.create(name='Bravo game', price=10, stock=1, category=games, seller=seller)
+    return {'books': books, 'games': games}
+
+
+def collect_pages(client, url):
+    """Follows 'next' links and returns every page of results."""
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        pages.append(data)
+        url = data['next']
+    return pages
+
+
+@override_settings(PRODUCT_PAGE_SIZE=3)
+def test_cursor_walks_whole_catalog_in_order(client, catalog):
+    pages = collect_pages(client, '/api/products/')
+
+    ids = [product['id'] for page in pages for product in page['results']]
+    expected = list(Product.objects.order_by('name', 'id').values_list('id', flat=True))
+    assert ids == expected
+    assert len(pages) == 3
+    assert pages[0]['previous'] is None
+    assert pages[-1]['next'] is None
+
+
+@override_settings(PRODUCT_PAGE_SIZE=3)
+def test_previous_cursor_returns_preceding_page(client, catalog):
+    first = client.get('/api/products/').json()
+    second = client.get(first['next']).json()
+
+    back = client.get(second['previous']).json()
+    assert [p['id'] for p in back['results']] == [p['id'] for p in first['results']]
+    assert back['previous'] is None
+    assert back['next'] is not None
+
+
+@override_settings(PRODUCT_PAGE_SIZE=2, PRODUCT_MAX_PAGE_SIZE=4)
+def test_page_size_is_capped(client, catalog):
+    assert len(client.get('/api/products/').json()['results']) == 2
+    assert len(client.get('/api/products/?page_size=3').json()['results']) == 3
+    assert len(client.get('/api/products/?page_size=500').json()['results']) == 4
+
+
+@override_settings(PRODUCT_PAGE_SIZE=2)
+def test_cursor_works_with_filter_and_search(client, catalog):
+    pages = collect_pages(client, f'/api/products/?category={catalog["books"].id}&search=bravo')
+
+    names = [product['name'] for page in pages for product in page['results']]
+    assert names == ['Bravo', 'Bravo', 'Bravo']
+    # The filters are carried over in the cursor links
+    assert 'search=bravo' in pages[0]['next']
+
+
+def test_invalid_cursor_returns_404(client, catalog):
+    response = client.get('/api/products/?cursor=not-a-cursor')
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def forged_cursor(position):
+    return base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+
+
+@pytest.mark.parametrize('query, position', [
+    ('', {'v': None, 'i': 1}),
+    ('', {'v': ['Alpha'], 'i': 1}),
+    ('search=bravo&', {'v': 'high', 'i': 1}),
+    ('search=bravo&', {'v': None, 'i': 1}),
+])
+def test_forged_cursor_returns_404(client, catalog, query, position):
+    response = client.get(f'/api/products/?{query}cursor={forged_cursor(position)}')
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,122 @@
+import pytest
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from products.models import Product, Category
+from ecommerce_backend import db_pool
+from ecommerce_backend.profiling import percentile, profile_stats
+from django.contrib.auth import get_user_model
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def empty_stats():
+    profile_stats.reset()
+    yield
+    profile_stats.reset()
+
+
+@pytest.fixture
+def product(db):
+    seller = User.objects.create_user(username='seller', password='Sellerpassword123', role='SELLER')
+    category = Category.objects.create(name='Books')
+    return Product.objects.create(name='Atlas', price=10, stock=3, category=category, seller=seller)
+
+
+@pytest.fixture
+def admin_headers(db):
+    admin = User.objects.create_user(username='admin', password='Adminpassword123', is_staff=True)
+    return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(admin)}'}
+
+
+def test_server_timing_header(client, product):
+    response = client.get('/api/products/')
+    assert response.status_code == status.HTTP_200_OK
+    timing = response['Server-Timing']
+    assert timing.startswith('total;dur=')
+    assert 'db;dur=' in timing and 'queries"' in timing
+    assert 'render;dur=' in timing
+
+
+def test_server_timing_header_can_be_turned_off(client, product, settings):
+    settings.PROFILING_SERVER_TIMING = False
+    response = client.get('/api/products/')
+    assert response.status_code == status.HTTP_200_OK
+    assert 'Server-Timing' not in response
+    # The request is still profiled
+    assert 'ProductViewSet.list' in profile_stats.snapshot()
+
+
+def test_requests_are_recorded_per_view(client, product):
+    client.get('/api/products/')
+    client.get('/api/products/')
+    client.get(f'/api/products/{product.id}/')
+    client.get('/api/orders/')
+
+    snapshot = profile_stats.snapshot()
+    listing = snapshot['ProductViewSet.list']
+    assert listing['http_view_duration_seconds']['count'] == 2
+    # The second request is a cache hit
+    assert listing['http_view_db_queries']['quantiles'][0.99] >= 1
+    assert listing['http_view_response_size_bytes']['sum'] > 0
+    assert listing['http_view_render_duration_seconds']['sum'] > 0
+    assert snapshot['ProductViewSet.retrieve']['http_view_duration_seconds']['count'] == 1
+    # Generic views are named after the action their handler runs
+    assert 'OrderListCreateView.list' in snapshot
+
+
+def test_window_keeps_the_latest_samples(settings):
+    settings.PROFILING_WINDOW = 3
+    for duration in (100, 1, 2, 3):
+        profile_stats.record('View.list', (duration, 0, 0, 0, 0))
+
+    metric = profile_stats.snapshot()['View.list']['http_view_duration_seconds']
+    assert metric['count'] == 4
+    assert metric['sum'] == pytest.approx(0.106)
+    assert metric['quantiles'][0.99] == pytest.approx(0.003)
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([7], 0.9) == 7
+
+
+def test_metrics_endpoint_is_admin_only(client, product):
+    user = User.objects.create_user(username='buyer', password='Buyerpassword123')
+    response = client.get('/api/metrics/', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_metrics_endpoint_prometheus_format(client, product, admin_headers):
+    client.get('/api/products/')
+    response = client.get('/api/metrics/', **admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+
+    body = response.content.decode()
+    assert '# TYPE http_view_duration_seconds summary' in body
+    assert 'http_view_duration_seconds{view="ProductViewSet.list",quantile="0.5"}' in body
+    assert 'http_view_db_queries_count{view="ProductViewSet.list"} 1' in body
+
+
+def test_disabled(client, product, settings):
+    settings.PROFILING_ENABLED = False
+    response = client.get('/api/products/')
+    assert 'Server-Timing' not in response
+    assert profile_stats.snapshot() == {}
+
+
+def test_pool_metrics_format():
+    body = db_pool.prometheus({'default': {'pool_size': 4, 'pool_available': 3, 'requests_num': 120}})
+    assert '# TYPE db_pool_pool_size gauge' in body
+    assert 'db_pool_pool_available{alias="default"} 3' in body
+    assert '# TYPE db_pool_requests_num_total counter' in body
+    assert 'db_pool_requests_num_total{alias="default"} 120' in body
+
+
+def test_unpooled_databases_have_no_pool_metrics(client, product, admin_headers):
+    # The tests run on SQLite, which has no pool
+    assert db_pool.pool_stats() == {}
+    response = client.get('/api/metrics/', **admin_headers)
+    assert 'db_pool_' not in response.content.decode()
@@ -0,0 +1,78 @@
+import logging
+
+import pytest
+from products.models import Product, Category
+from ecommerce_backend.query_detector import QueryDetector, fingerprint
+from django.contrib.auth import get_user_model
+User = get_user_model()
+
+
+@pytest.fixture
+def products(db):
+    seller = User.objects.create_user(username='seller', password='Sellerpassword123', role='SELLER')
+    return [
+        Product.objects.create(name=f'Book {i}', price=10, stock=3, seller=seller,
+                               category=Category.objects.create(name=f'Category {i}'))
+        for i in range(4)
+    ]
+
+
+def test_fingerprint_ignores_parameters_and_list_lengths():
+    assert fingerprint('SELECT * FROM t WHERE id IN (%s, %s)') == fingerprint('SELECT * FROM t WHERE id IN (%s)')
+    assert fingerprint("SELECT * FROM t WHERE name = 'a' LIMIT 21") == fingerprint("SELECT * FROM t WHERE name = 'bb' LIMIT 1")
+    assert fingerprint('SELECT a FROM t') != fingerprint('SELECT b FROM t')
+
+
+def test_detects_n_plus_one(products):
+    with QueryDetector(repeat_threshold=3, slow_query_ms=10_000) as detector:
+        names = [product.category.name for product in Product.objects.all()]
+
+    assert len(names) == 4
+    [problem] = detector.problems
+    assert problem.kind == 'repeated'
+    assert problem.count == 4
+    assert 'products_category' in problem.sql
+    # The stack points at the offending line of our code
+    assert any(frame.name == 'test_detects_n_plus_one' for frame in problem.stack)
+
+
+def test_select_related_is_not_flagged(products):
+    with QueryDetector(repeat_threshold=2, slow_query_ms=10_000) as detector:
+        [product.category.name for product in Product.objects.select_related('category')]
+    assert detector.problems == []
+
+
+def test_detects_slow_queries(products):
+    with QueryDetector(slow_query_ms=0) as detector:
+        Product.objects.count()
+    [problem] = detector.problems
+    assert problem.kind == 'slow'
+    assert 'COUNT' in problem.sql
+
+
+def test_slow_query_check_is_off_in_tests():
+    # Timings vary between machines; tests opt in with a query_budget marker
+    detector = QueryDetector()
+    detector.record('SELECT * FROM products_product', duration_ms=60_000)
+    assert detector.problems == []
+
+
+@pytest.mark.query_budget(slow_query_ms=0)
+def test_middleware_reports_offending_view(client, products, query_detector, caplog):
+    with caplog.at_level(logging.WARNING, logger='ecommerce_backend.query_detector'):
+        client.get('/api/products/')
+
+    assert query_detector
+    view, problem = query_detector[0]
+    assert view == 'ProductViewSet.list'
+    assert problem.kind == 'slow'
+    assert 'ProductViewSet.list' in caplog.text
+    # Expected problems: keep them from failing the test
+    query_detector.clear()
+
+
+def test_catalog_endpoints_have_no_query_problems(client, products):
+    # Checked by the autouse query_detector of products/tests
+    client.get('/api/products/')
+    client.get('/api/categories/')
+    client.get(f'/api/products/{products[0].id}/')
@@ -0,0 +1,52 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from ecommerce_backend import query_plans
+from products.models import Product, Category
+from django.contrib.auth import get_user_model
+User = get_user_model()
+
+
+@pytest.fixture
+def catalog(db):
+    seller = User.objects.create_user(username='seller', password='Sellerpassword123', role='SELLER')
+    category = Category.objects.create(name='Books')
+    for i in range(5):
+        Product.objects.create(name=f'Book {i}', description='Paperback', price=10, stock=1, category=category, seller=seller)
+
+
+def test_canonical_queries_use_indexes(catalog):
+    out = io.StringIO()
+    # Any full scan of a non-empty table fails with max_rows=0
+    call_command('check_query_plans', max_rows=0, stdout=out)
+
+    output = out.getvalue()
+    assert 'FAIL' not in output
+    assert 'ok   products.list.seller' in output
+    assert 'ok   orders.list' in output
+
+
+def test_sequential_scan_above_threshold_fails(catalog, monkeypatch):
+    def unindexed(using):
+        return {'products.by_description': Product.objects.using(using).filter(description='Paperback').order_by()}
+
+    monkeypatch.setattr(query_plans, 'CANONICAL_QUERIES', [unindexed])
+
+    out = io.StringIO()
+    with pytest.raises(CommandError, match='products.by_description'):
+        call_command('check_query_plans', max_rows=0, stdout=out)
+    assert 'FAIL products.by_description: sequential scan of products_product (5 rows)' in out.getvalue()
+
+    # Small tables may be scanned
+    call_command('check_query_plans', max_rows=5, stdout=io.StringIO())
+
+
+def test_unsupported_database_is_a_command_error(catalog, monkeypatch):
+    monkeypatch.setattr(connection, 'vendor', 'mysql')
+    monkeypatch.setattr(connection, 'display_name', 'MySQL')
+
+    with pytest.raises(CommandError, match="database 'default' is MySQL"):
+        call_command('check_query_plans', stdout=io.StringIO())
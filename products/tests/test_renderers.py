@@ -0,0 +1,88 @@
+import datetime
+import io
+import uuid
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.serializer_helpers import ReturnDict
+from ecommerce_backend import parsers, renderers
+from ecommerce_backend.parsers import FastJSONParser
+from ecommerce_backend.renderers import FastJSONRenderer
+
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def backend(request, monkeypatch):
+    if request.param == 'orjson':
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(renderers, 'orjson', None)
+        monkeypatch.setattr(parsers, 'orjson', None)
+    return request.param
+
+
+PAYLOAD = {
+    'results': [
+        ReturnDict({
+            'id': 1,
+            'name': 'Épée «longue»',
+            'price': '10.50',
+            'total': Decimal('12.30'),
+            'created_at': datetime.datetime(2025, 5, 1, 12, 30, 5, 123456, tzinfo=datetime.timezone.utc),
+            'updated_at': datetime.datetime(2025, 5, 1, 14, 0, tzinfo=ZoneInfo('Europe/Paris')),
+            'day': datetime.date(2025, 5, 1),
+            'token': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'label': gettext_lazy('Pending'),
+            'image': None,
+            'tags': ('a', 'b'),
+            'note': 'line\u2028separator\u2029paragraph',
+            'rating': 4.5,
+        }, serializer=None),
+    ],
+    'next': None,
+}
+
+
+def test_renderer_matches_drf_output(backend):
+    assert FastJSONRenderer().render(PAYLOAD) == JSONRenderer().render(PAYLOAD)
+
+
+@pytest.mark.parametrize('value', [float('nan'), float('inf'), -float('inf')])
+def test_renderer_rejects_non_finite_floats(backend, value):
+    with pytest.raises(ValueError):
+        FastJSONRenderer().render({'results': [{'rating': value, 'image': None}]})
+
+
+def test_renderer_handles_empty_data(backend):
+    assert FastJSONRenderer().render(None) == b''
+
+
+def test_renderer_indents_through_stdlib(backend):
+    rendered = FastJSONRenderer().render({'a': 1}, 'application/json; indent=2', {})
+    assert rendered == b'{\n  "a": 1\n}'
+
+
+def test_renderer_falls_back_for_huge_integers(backend):
+    assert FastJSONRenderer().render({'n': 2 ** 70}) == b'{"n":1180591620717411303424}'
+
+
+def test_parser_matches_drf(backend):
+    body = '{"items": [{"product_id": 1, "quantity": 2.5, "note": "ünïcode"}]}'.encode()
+    assert FastJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(io.BytesIO(body))
+
+
+def test_parser_rejects_invalid_json(backend):
+    with pytest.raises(ParseError):
+        FastJSONParser().parse(io.BytesIO(b'{"items": [1, }'))
+    with pytest.raises(ParseError):
+        FastJSONParser().parse(io.BytesIO(b'{"price": NaN}'))
+
+
+def test_fast_renderer_and_parser_are_the_defaults():
+    assert api_settings.DEFAULT_RENDERER_CLASSES[0] is FastJSONRenderer
+    assert api_settings.DEFAULT_PARSER_CLASSES[0] is FastJSONParser
@@ -0,0 +1,177 @@
+import json
+
+import pytest
+from django.db import transaction
+from django.test import Client
+from rest_framework import status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+from products.models import Product, Category
+from orders.models import Order
+from orders.views import OrderListCreateView
+from ecommerce_backend.routers import use_primary
+from products.importer import ProductImporter
+from django.contrib.auth import get_user_model
+User = get_user_model()
+
+# Two SQLite files stand in for the primary and a replica (see settings/test.py).
+# Nothing replicates between them, so a read shows which one it went to. The
+# tests are transactional: reads inside the usual per-test transaction stay on
+# the primary.
+pytestmark = pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+
+
+@pytest.fixture(autouse=True)
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ['replica']
+    settings.REPLICA_STICKY_SECONDS = 60
+
+
+def replicated(*objects):
+    # What the replica has caught up with
+    for obj in objects:
+        obj.save(using='replica')
+    return objects
+
+
+@pytest.fixture
+def shop():
+    seller = User.objects.create_user(username='seller', password='Sellerpassword123', role='SELLER')
+    buyer = User.objects.create_user(username='buyer', password='Buyerpassword123')
+    category = Category.objects.create(name='Books')
+    product = Product.objects.create(name='Atlas', price=10, stock=5, category=category, seller=seller)
+    replicated(seller, buyer, category, product)
+    return buyer, product
+
+
+def test_reads_go_to_the_replica_and_writes_to_the_primary():
+    category = Category.objects.create(name='Books')
+    assert Category.objects.using('default').filter(pk=category.pk).exists()
+    assert not Category.objects.exists()
+
+
+def test_primary_reads_in_transactions_and_use_primary():
+    with transaction.atomic():
+        Category.objects.create(name='Books')
+        assert Category.objects.count() == 1
+    with use_primary():
+        assert Category.objects.count() == 1
+
+
+def test_related_objects_come_from_their_instance_database(shop):
+    buyer, product = shop
+    with use_primary():
+        product = Product.objects.get(pk=product.pk)
+    Category.objects.using('default').filter(pk=product.category_id).update(name='Maps')
+    assert product.category.name == 'Maps'
+
+
+def test_uncached_catalog_reads_use_the_replica(client, shop):
+    buyer, product = shop
+    seller = product.seller
+    Product.objects.create(name='Bible', price=10, stock=1, category=product.category, seller=seller)
+
+    # A seller's own listing is not cached
+    response = client.get('/api/products/', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(seller)}')
+    assert [item['name'] for item in response.json()['results']] == ['Atlas']
+
+
+def test_catalog_cache_is_filled_from_the_primary(client, shop):
+    buyer, product = shop
+    Product.objects.create(name='Bible', price=10, stock=1, category=product.category, seller=product.seller)
+
+    response = client.get('/api/products/')
+    assert response['X-Cache'] == 'MISS'
+    assert [item['name'] for item in response.json()['results']] == ['Atlas', 'Bible']
+
+
+def test_client_reads_its_own_writes(client, shop):
+    buyer, product = shop
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(buyer)}'}
+
+    response = client.post('/api/cart/items/', {'product_id': product.id, 'quantity': 2},
+                           content_type='application/json', **headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    response = client.post('/api/orders/', **headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert not Order.objects.using('replica').exists()
+
+    # Pinned to the primary after the write
+    response = client.get('/api/orders/', **headers)
+    assert len(response.json()) == 1
+
+
+@pytest.mark.parametrize('fast', [False, True])
+def test_first_cart_view_creates_and_returns_the_cart(client, shop, settings, fast):
+    settings.FAST_READ_SERIALIZERS = fast
+    buyer, product = shop
+    response = client.get('/api/cart/', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(buyer)}')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['items'] == []
+
+
+def test_pin_follows_the_user_across_tokens(client, shop):
+    buyer, product = shop
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(buyer)}'}
+    client.post('/api/cart/items/', {'product_id': product.id, 'quantity': 2},
+                content_type='application/json', **headers)
+    assert client.post('/api/orders/', **headers).status_code == status.HTTP_201_CREATED
+
+    # A refreshed token, from a client without the pin cookie
+    client.cookies.clear()
+    response = client.get('/api/orders/', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(buyer)}')
+    assert len(response.json()) == 1
+
+
+def test_pin_covers_the_users_sessions(client, shop, monkeypatch):
+    # Session authentication, as in the base settings (dj-rest-auth login)
+    monkeypatch.setattr(OrderListCreateView, 'authentication_classes', [SessionAuthentication, JWTAuthentication])
+    buyer, product = shop
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(buyer)}'}
+    client.post('/api/cart/items/', {'product_id': product.id, 'quantity': 2},
+                content_type='application/json', **headers)
+    assert client.post('/api/orders/', **headers).status_code == status.HTTP_201_CREATED
+
+    # Another device of the same user, logged in to a session and without the pin cookie
+    browser = Client()
+    browser.force_login(buyer)
+    response = browser.get('/api/orders/')
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 1
+
+
+def test_anonymous_writes_pin_the_client(client, shop):
+    # Registered just now: the replica does not have the user yet
+    User.objects.create_user(username='newcomer', password='Newcomerpassword123')
+
+    response = client.post('/api/token/', {'username': 'newcomer', 'password': 'Newcomerpassword123'},
+                           content_type='application/json')
+    assert response.status_code == status.HTTP_200_OK
+    response = client.get('/api/cart/', HTTP_AUTHORIZATION=f'Bearer {response.json()["access"]}')
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_reads_return_to_the_replica_after_the_window(client, shop, settings):
+    settings.REPLICA_STICKY_SECONDS = 0
+    buyer, product = shop
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(buyer)}'}
+
+    client.post('/api/cart/items/', {'product_id': product.id, 'quantity': 2},
+                content_type='application/json', **headers)
+    assert client.post('/api/orders/', **headers).status_code == status.HTTP_201_CREATED
+
+    # The replica has not seen the order yet
+    response = client.get('/api/orders/', **headers)
+    assert response.json() == []
+
+
+def test_reimport_matches_products_on_the_primary(shop, tmp_path):
+    buyer, product = shop
+    path = tmp_path / 'products.json'
+    path.write_text(json.dumps([{'name': 'Globe', 'price': 20, 'stock': 1, 'category_name': 'Maps'}]))
+
+    ProductImporter(product.seller).run(str(path))
+    stats = ProductImporter(product.seller).run(str(path))
+    assert (stats.created, stats.updated) == (0, 1)
+    assert Product.objects.using('default').filter(name='Globe').count() == 1
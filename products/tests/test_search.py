@@ -0,0 +1,85 @@
+import pytest
+from django.test import override_settings
+from products.models import Product, Category
+from django.contrib.auth import get_user_model
+User = get_user_model()
+
+
+@pytest.fixture
+def catalog(db):
+    seller = User.objects.create_user(username='seller', password='Sellerpassword123', role='SELLER')
+    electronics = Category.objects.create(name='Electronics')
+    books = Category.objects.create(name='Books')
+
+    def create(name, description, category=electronics):
+        return Product.objects.create(
+            name=name, description=description, price=10, stock=1, category=category, seller=seller
+        )
+
+    return {
+        'electronics': electronics,
+        'books': books,
+        'laptop': create('Gaming Laptop', 'Fast machine with a great keyboard'),
+        'keyboard': create('Mechanical Keyboard', 'Clicky keys for your laptop'),
+        'mouse': create('Wireless Mouse', 'Ergonomic mouse'),
+        'book': create('Laptop Repair Guide', 'Fix any notebook', category=books),
+    }
+
+
+def search(client, query, **params):
+    params['search'] = query
+    response = client.get('/api/products/', params)
+    assert response.status_code == 200
+    return [product['name'] for product in response.json()['results']]
+
+
+def test_name_matches_rank_above_description_matches(client, catalog):
+    names = search(client, 'laptop')
+
+    assert set(names) == {'Gaming Laptop', 'Laptop Repair Guide', 'Mechanical Keyboard'}
+    assert names[-1] == 'Mechanical Keyboard'
+
+
+def test_prefix_matching(client, catalog):
+    assert search(client, 'wirel') == ['Wireless Mouse']
+    assert search(client, 'mech key') == ['Mechanical Keyboard']
+
+
+def test_all_terms_must_match(client, catalog):
+    assert search(client, 'laptop repair') == ['Laptop Repair Guide']
+    assert search(client, 'laptop unicorn') == []
+
+
+def test_search_combines_with_category_filter(client, catalog):
+    names = search(client, 'laptop', category=catalog['books'].id)
+
+    assert names == ['Laptop Repair Guide']
+
+
+def test_index_follows_updates_and_deletes(client, catalog):
+    mouse = catalog['mouse']
+    mouse.name = 'Trackball'
+    mouse.save()
+    catalog['book'].delete()
+
+    assert search(client, 'trackball') == ['Trackball']
+    assert search(client, 'wireless') == []
+    assert 'Laptop Repair Guide' not in search(client, 'laptop')
+
+
+def test_punctuation_only_query_is_ignored(client, catalog):
+    assert len(search(client, '"*:() & |')) == 4
+
+
+@override_settings(PRODUCT_PAGE_SIZE=1)
+def test_ranked_results_paginate_with_cursor(client, catalog):
+    expected = search(client, 'laptop', page_size=10)
+
+    names = []
+    url = '/api/products/?search=laptop'
+    while url:
+        data = client.get(url).json()
+        names += [product['name'] for product in data['results']]
+        url = data['next']
+
+    assert names == expected
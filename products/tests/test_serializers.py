@@ -0,0 +1,68 @@
+import pytest
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from cart.models import Cart, CartItem
+from products.models import Product, Category
+from django.contrib.auth import get_user_model
+User = get_user_model()
+
+
+@pytest.fixture
+def product(db):
+    seller = User.objects.create_user(username='seller', password='Sellerpassword123', role='SELLER')
+    category = Category.objects.create(name='Books')
+    return Product.objects.create(
+        name='Dune', description='A long description. ' * 50, price=10, stock=3, category=category, seller=seller
+    )
+
+
+def test_product_list_is_compact(client, product):
+    [row] = client.get('/api/products/').json()['results']
+    assert set(row) == {'id', 'name', 'price', 'stock', 'category', 'image', 'seller'}
+
+
+def test_product_list_with_sparse_fields(client, product):
+    [row] = client.get('/api/products/?fields=id,name,price').json()['results']
+    assert row == {'id': product.id, 'name': 'Dune', 'price': '10.00'}
+
+    # Fields left out of the compact listing can still be requested
+    [row] = client.get('/api/products/?fields=id,description').json()['results']
+    assert row['description'] == product.description
+
+
+def test_product_detail_with_sparse_fields_bypasses_cache(client, product):
+    sparse = client.get(f'/api/products/{product.id}/?fields=id,name')
+    assert sparse.json() == {'id': product.id, 'name': 'Dune'}
+
+    full = client.get(f'/api/products/{product.id}/')
+    assert 'description' in full.json()
+    assert client.get(f'/api/products/{product.id}/?fields=stock').json() == {'stock': 3}
+
+
+def test_unknown_sparse_field_is_rejected(client, product):
+    response = client.get('/api/products/?fields=id,secret')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'secret' in str(response.json()['fields'])
+
+
+def test_cart_items_nest_a_product_summary(client, product):
+    buyer = User.objects.create_user(username='buyer', password='Buyerpassword123')
+    CartItem.objects.create(cart=Cart.objects.create(user=buyer), product=product, quantity=1)
+
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(buyer)}'}
+    [item] = client.get('/api/cart/', **headers).json()['items']
+    assert set(item['product']) == {'id', 'name', 'price', 'stock', 'image'}
+
+
+def test_seller_cannot_create_two_products_with_the_same_name(client, product):
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(product.seller)}'}
+    data = {'name': 'Dune', 'price': '12.00', 'stock': 1, 'category': product.category_id}
+
+    response = client.post('/api/products/', data, content_type='application/json', **headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    other = User.objects.create_user(username='other', password='Otherpassword123', role='SELLER')
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(other)}'}
+    response = client.post('/api/products/', data, content_type='application/json', **headers)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()['seller'] == other.id
@@ -2,7 +2,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter # Import DefaultRouter
 
-from .views import ProductViewSet, CategoryViewSet, PopulateProductsView
+from .views import ProductViewSet, CategoryViewSet, PopulateProductsView, CatalogCacheStatsView
 
 # Create a router and register our viewsets with it.
 # DefaultRouter automatically sets up URLs for list, create, retrieve, update, partial_update, and destroy actions.
@@ -12,6 +12,7 @@ router.register(r'categories', CategoryViewSet) # Register CategoryViewSet at '/
 
 urlpatterns = [
     path('products/populate_db/', PopulateProductsView.as_view(), name='populate_db'),
+    path('products/cache_stats/', CatalogCacheStatsView.as_view(), name='catalog_cache_stats'),
     path('', include(router.urls)),
 ]
 
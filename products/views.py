@@ -1,45 +1,211 @@
+import hashlib
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import viewsets, filters, permissions, status
+from rest_framework.generics import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from django.shortcuts import get_object_or_404
+from django.db.models import Count, Max
+from django.core.exceptions import ValidationError
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from .models import Product,Category
-from .serializers import ProductSerializer,CategorySerializer
+from .fast_serializers import FastProductListSerializer
+from .serializers import ProductListSerializer, ProductSerializer, CategorySerializer, requested_fields
 from .permissions import IsOwnerOrReadOnly
+from .pagination import KeysetPagination
+from .search import FullTextSearchFilter
+from .cache import category_cache, product_cache, stats as cache_stats
 from rest_framework.permissions import IsAuthenticatedOrReadOnly,IsAdminUser
-from django.core.management import call_command
-from django.core.management.base import CommandError
+from .importer import ProductImportError, get_seller
+from django.urls import reverse
+from jobs.registry import enqueue
+from django.conf import settings
+from ecommerce_backend.routers import use_primary
+
+class ConditionalCatalogMixin:
+    """
+    Sends ETag and Last-Modified validators with list and detail responses
+    and answers matching If-None-Match / If-Modified-Since requests with 304
+    before anything is serialized or read from the catalog cache.
+
+    The validators come from one aggregate query over the rows the response
+    is built from: MAX(updated_at), plus COUNT(*) so that deleting a row
+    changes the ETag. With a catalog cache, the result is kept next to the
+    cached payload and invalidated with it, so cache hits skip the query.
+    Lists that are not shared through the cache (a seller's own products)
+    still have their validators cached, per user, under the list version.
+    The ETag also covers the URL (filters, cursor, fields) and the user,
+    which decide what a list contains. If-None-Match takes precedence over
+    If-Modified-Since, which cannot notice deletions.
+    """
+
+    def get_detail_queryset(self):
+        return self.get_queryset()
+
+    def validators_cache_key(self, request, pk=None):
+        # The catalog cache comes with CachedCatalogMixin, which only shares some lists
+        cache = getattr(self, 'catalog_cache', None)
+        if cache is None:
+            return None
+        if pk is not None:
+            return cache.object_key(pk)
+        if self.use_list_cache(request):
+            return cache.list_key(request)
+        return cache.list_key(request, user=request.user)
+
+    def get_validators(self, request, queryset, cache_key=None):
+        stats = self.catalog_cache.get_validators(cache_key) if cache_key else None
+        if stats is None:
+            stats = queryset.order_by().aggregate(last_modified=Max('updated_at'), count=Count('pk'))
+            if cache_key:
+                self.catalog_cache.set_validators(cache_key, stats)
+        last_modified = stats['last_modified']
+        parts = [request.user.pk or '', request.get_full_path(), last_modified.isoformat() if last_modified else '', stats['count']]
+        etag = 'W/"%s"' % hashlib.md5('|'.join(map(str, parts)).encode('utf-8')).hexdigest()
+        return etag, int(last_modified.timestamp()) if last_modified else None
+
+    def conditional(self, request, validators, respond):
+        etag, last_modified = validators
+        response = get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = respond()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        validators = self.get_validators(request, self.filter_queryset(self.get_queryset()),
+                                         self.validators_cache_key(request))
+        return self.conditional(request, validators, lambda: super(ConditionalCatalogMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        respond = lambda: super(ConditionalCatalogMixin, self).retrieve(request, *args, **kwargs)
+        try:
+            validators = self.get_validators(request, self.get_detail_queryset().filter(pk=kwargs['pk']),
+                                             self.validators_cache_key(request, kwargs['pk']))
+        except (TypeError, ValueError, ValidationError):
+            # Not a valid pk: the lookup in get_object() answers 404
+            return respond()
+        return self.conditional(request, validators, respond)
+
+
+class CachedCatalogMixin:
+    """
+    Serves list and retrieve responses from the catalog cache, serializing
+    and storing the payload on a miss. Writes invalidate it via signals.
+    """
+    catalog_cache = None
+
+    def use_list_cache(self, request):
+        return True
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_list_cache(request):
+            return super().list(request, *args, **kwargs)
+
+        key = self.catalog_cache.list_key(request)
+        data = self.catalog_cache.get_list(key)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        # Fill from the primary: a page read from a lagging replica would be
+        # served until the next write or the timeout
+        with use_primary():
+            response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            self.catalog_cache.set_list(key, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        # The cache holds full representations only
+        if requested_fields(request) is not None:
+            return super().retrieve(request, *args, **kwargs)
+
+        pk = kwargs['pk']
+        data = self.catalog_cache.get_object(pk)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        with use_primary():
+            response = super().retrieve(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            self.catalog_cache.set_object(pk, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class FastListMixin:
+    """
+    With FAST_READ_SERIALIZERS on, builds list responses with
+    `fast_serializer_class` from .values() rows instead of the DRF serializer.
+    """
+    fast_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        if not settings.FAST_READ_SERIALIZERS or self.fast_serializer_class is None:
+            return super().list(request, *args, **kwargs)
+
+        serializer = self.fast_serializer_class(request)
+        rows = serializer.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(rows))
+
 
 # Viewset for the cateogry model
 # Provides CRUD operations for categories
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ConditionalCatalogMixin, CachedCatalogMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows categories to be viewed or edited.
     """
     queryset = Category.objects.all().order_by('name') # define base queryset
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    catalog_cache = category_cache
 
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ConditionalCatalogMixin, CachedCatalogMixin, FastListMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows products to be viewed or edited.
     """
     permission_classes = [IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
     serializer_class = ProductSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    fast_serializer_class = FastProductListSerializer
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter]
     filterset_fields = ['category']
-    search_fields = ['name', 'description']
+    catalog_cache = product_cache
+
+    def use_list_cache(self, request):
+        # Authenticated sellers see only their own products, so only the
+        # public listing is shared through the cache.
+        return not request.user.is_authenticated
+
+    def get_serializer_class(self):
+        # Listings use the compact representation (?fields= still picks any field)
+        if self.action == 'list':
+            return ProductListSerializer
+        return ProductSerializer
 
     def get_queryset(self):
         if self.request.user.is_authenticated:
-            return Product.objects.filter(seller=self.request.user).order_by('name')
+            return Product.objects.filter(seller=self.request.user).order_by('name', 'id')
 
-        return Product.objects.all().order_by('name')
+        return Product.objects.all().order_by('name', 'id')
+
+    def get_detail_queryset(self):
+        # Any product can be viewed; sellers may only change their own (IsOwnerOrReadOnly)
+        return Product.objects.all()
 
     def get_object(self):
-        queryset = Product.objects.all()
+        queryset = self.get_detail_queryset()
         obj = get_object_or_404(queryset, pk=self.kwargs['pk'])
         self.check_object_permissions(self.request, obj)
         return obj
@@ -74,20 +240,37 @@ class PopulateProductsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        # The import runs in the background (python manage.py run_jobs);
+        # poll the returned status URL for progress, row counts and errors.
         try:
-            # Pass both seller_name and json_path as named arguments to the command
-            call_command('populate_products', seller_name, json_path=json_path)
-            return Response(
-                {'message': 'Database population command successfully executed.'},
-                status=status.HTTP_200_OK
-            )
-        except CommandError as e:
+            get_seller(seller_name)
+        except ProductImportError as e:
             return Response(
                 {'error': f'An error occured: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-        except Exception as e:
-            return Response(
-                {'error': f'An unexpected error occured: {str(e)}'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                status=status.HTTP_400_BAD_REQUEST
             )
+
+        job = enqueue(
+            'populate_products',
+            {'seller_name': seller_name, 'json_path': json_path},
+            user=request.user
+        )
+        return Response(
+            {
+                'message': 'Database population job queued.',
+                'job_id': job.id,
+                'status': job.status,
+                'status_url': request.build_absolute_uri(reverse('job-detail', args=[job.id])),
+            },
+            status=status.HTTP_202_ACCEPTED
+        )
+
+
+class CatalogCacheStatsView(APIView):
+    """
+    Hit/miss counters of the catalog cache for this server process.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(cache_stats.snapshot())
@@ -0,0 +1,13 @@
+from django.contrib import admin
+from .models import CategoryDailySales, ProductDailySales, SellerDailySales
+
+
+class DailySalesAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'day', 'units_sold', 'revenue', 'order_count')
+    list_filter = ('day',)
+    date_hierarchy = 'day'
+
+
+admin.site.register(SellerDailySales, DailySalesAdmin)
+admin.site.register(ProductDailySales, DailySalesAdmin)
+admin.site.register(CategoryDailySales, DailySalesAdmin)
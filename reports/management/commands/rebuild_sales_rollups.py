@@ -0,0 +1,42 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from reports.rollups import rebuild
+
+
+def parse_day(value, option):
+    if value is None:
+        return None
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Error: --{option} must be a date (YYYY-MM-DD), not '{value}'.")
+
+
+class Command(BaseCommand):
+    help = ('Recomputes the daily sales rollups from the order history, processing orders in chunks. '
+            'Limit the work to a range of days with --since/--until (YYYY-MM-DD). '
+            'Run it after changing order statuses with a bulk queryset.update(), which skips the rollups.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='First day to rebuild (inclusive).')
+        parser.add_argument('--until', help='Last day to rebuild (inclusive).')
+        parser.add_argument('--chunk_size', type=int, default=1000,
+                            help='Number of orders read and written per chunk (default: 1000).')
+
+    def handle(self, *args, **options):
+        since = parse_day(options['since'], 'since')
+        until = parse_day(options['until'], 'until')
+        if since and until and since > until:
+            raise CommandError(f'Error: --since ({since}) is after --until ({until}).')
+
+        def progress(processed):
+            self.stdout.write(f'Processed {processed} orders...')
+
+        processed = rebuild(
+            since=since,
+            until=until,
+            chunk_size=max(1, options['chunk_size']),
+            progress=progress if options['verbosity'] > 1 else None,
+        )
+        self.stdout.write(self.style.SUCCESS(f'Sales rollups rebuilt from {processed} orders.'))
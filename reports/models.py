@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.db import models
+
+
+class DailySales(models.Model):
+    """
+    Sales totals for one key and day, maintained incrementally at checkout
+    (see reports.rollups) so reports read one row per day instead of every
+    order line. Cancelled orders are not counted.
+
+    Keys are plain ids without foreign key constraints so history survives
+    when a product, category or seller is deleted.
+    """
+    day = models.DateField()
+    units_sold = models.BigIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    order_count = models.BigIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class SellerDailySales(DailySales):
+    seller = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['seller', 'day'], name='seller_daily_sales_key'),
+        ]
+
+    def __str__(self):
+        return f"Seller {self.seller_id} on {self.day}"
+
+
+class ProductDailySales(DailySales):
+    product = models.ForeignKey('products.Product', on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    seller = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'day'], name='product_daily_sales_key'),
+        ]
+        indexes = [
+            # Per-product breakdown of one seller's sales over a date range
+            models.Index(fields=['seller', 'day'], name='product_sales_seller_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"Product {self.product_id} on {self.day}"
+
+
+class CategoryDailySales(DailySales):
+    """
+    Per seller and category. Sales of uncategorized products are not included.
+    """
+    seller = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    category = models.ForeignKey('products.Category', on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['seller', 'category', 'day'], name='category_daily_sales_key'),
+        ]
+
+    def __str__(self):
+        return f"Category {self.category_id} of seller {self.seller_id} on {self.day}"
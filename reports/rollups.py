@@ -0,0 +1,183 @@
+"""
+Incremental maintenance of the daily sales rollups.
+
+Order lines are folded into per-seller, per-product and per-category totals
+for the order's (local) day and added to the stored rows with
+INSERT ... ON CONFLICT DO UPDATE, so concurrent checkouts never lose an
+increment and no row has to be read first. Cancelling or deleting an order
+subtracts its lines again.
+
+Status changes reach the rollups through the Order signals (see
+reports.signals), so they must go through Order.save() or, for many orders
+at once, update_status(). A plain queryset.update(status=...) to or from
+Cancelled skips the rollups; repair them with the rebuild_sales_rollups
+command.
+"""
+import logging
+from collections import namedtuple
+from decimal import Decimal
+
+from django.db import router, transaction
+from django.utils import timezone
+
+from ecommerce_backend.upsert import upsert
+from orders.models import Order, OrderItem
+from .models import CategoryDailySales, ProductDailySales, SellerDailySales
+
+logger = logging.getLogger(__name__)
+
+SaleLine = namedtuple('SaleLine', 'order_id day product_id seller_id category_id quantity revenue')
+
+TOTALS = ['units_sold', 'revenue', 'order_count']
+
+CANCELLED = 'Cancelled'
+
+
+def order_day(created_at):
+    return timezone.localdate(created_at)
+
+
+def lines_for_items(order, items):
+    """
+    SaleLines for `items` of `order`. Each item's product must be loaded;
+    lines whose product has been deleted cannot be attributed and are skipped.
+    """
+    day = order_day(order.created_at)
+    return [
+        SaleLine(order.pk, day, item.product.pk, item.product.seller_id, item.product.category_id,
+                 item.quantity, item.product_price * item.quantity)
+        for item in items
+        if item.product is not None
+    ]
+
+
+def fold(lines):
+    """
+    Sums lines into {model: {key: [units, revenue, order ids]}}. An order with
+    several lines for the same key counts once towards order_count.
+    """
+    totals = {SellerDailySales: {}, ProductDailySales: {}, CategoryDailySales: {}}
+
+    def add(model, key, line):
+        entry = totals[model].setdefault(key, [0, Decimal('0'), set()])
+        entry[0] += line.quantity
+        entry[1] += line.revenue
+        entry[2].add(line.order_id)
+
+    for line in lines:
+        add(SellerDailySales, (('seller_id', line.seller_id), ('day', line.day)), line)
+        add(ProductDailySales, (('product_id', line.product_id), ('day', line.day), ('seller_id', line.seller_id)), line)
+        if line.category_id is not None:
+            add(CategoryDailySales, (('seller_id', line.seller_id), ('category_id', line.category_id), ('day', line.day)), line)
+    return totals
+
+
+CONFLICT_FIELDS = {
+    SellerDailySales: ['seller_id', 'day'],
+    ProductDailySales: ['product_id', 'day'],
+    CategoryDailySales: ['seller_id', 'category_id', 'day'],
+}
+
+
+def apply_lines(lines, sign=1, using=None):
+    using = using or router.db_for_write(SellerDailySales)
+    with transaction.atomic(using=using):
+        for model, entries in fold(lines).items():
+            rows = [
+                dict(key, units_sold=sign * units, revenue=sign * revenue, order_count=sign * len(order_ids))
+                for key, (units, revenue, order_ids) in entries.items()
+            ]
+            upsert(model, rows, CONFLICT_FIELDS[model], increment=TOTALS, using=using)
+
+
+def record_order(order, items=None):
+    """
+    Adds a new order to the rollups. Call inside the transaction that creates
+    the order so the rollups commit or roll back with it.
+    """
+    if order.status == CANCELLED:
+        return
+    if items is None:
+        items = order.items.select_related('product')
+    apply_lines(lines_for_items(order, items))
+
+
+def unrecord_order(order):
+    """
+    Subtracts an order that is being cancelled or deleted.
+    """
+    apply_lines(lines_for_items(order, order.items.select_related('product')), sign=-1)
+
+
+def iter_order_lines(orders, chunk_size):
+    """
+    Yields the SaleLines of `orders` (excluding cancelled ones) in chunks of
+    at most `chunk_size` orders, walking them by primary key.
+    """
+    orders = orders.exclude(status=CANCELLED).order_by('pk')
+    last_pk = 0
+    while True:
+        pks = list(orders.filter(pk__gt=last_pk).values_list('pk', flat=True)[:chunk_size])
+        if not pks:
+            return
+        last_pk = pks[-1]
+        rows = (
+            OrderItem.objects.filter(order_id__in=pks, product__isnull=False)
+            .values_list('order_id', 'order__created_at', 'product_id', 'product__seller_id',
+                         'product__category_id', 'quantity', 'product_price')
+        )
+        yield len(pks), [
+            SaleLine(order_id, order_day(created_at), product_id, seller_id, category_id, quantity, price * quantity)
+            for order_id, created_at, product_id, seller_id, category_id, quantity, price in rows
+        ]
+
+
+def update_status(orders, status, chunk_size=1000):
+    """
+    Bulk equivalent of saving each of `orders` with `status`: one UPDATE, with
+    the rollups adjusted for the orders that are cancelled or restored.
+    Returns the number of orders updated.
+    """
+    with transaction.atomic():
+        if status == CANCELLED:
+            for count, lines in iter_order_lines(orders, chunk_size):
+                apply_lines(lines, sign=-1)
+            return orders.update(status=status)
+
+        restored = list(orders.filter(status=CANCELLED).values_list('pk', flat=True))
+        updated = orders.update(status=status)
+        for count, lines in iter_order_lines(Order.objects.filter(pk__in=restored), chunk_size):
+            apply_lines(lines)
+        return updated
+
+
+def rebuild(since=None, until=None, chunk_size=1000, progress=None):
+    """
+    Recomputes the rollups from the order history, for all days or for the
+    days between `since` and `until` (inclusive). The range is cleared first
+    and refilled chunk by chunk; checkouts landing in the range meanwhile are
+    counted again, so rebuild past days or run it while checkout is quiet.
+    Returns the number of orders processed.
+    """
+    orders = Order.objects.all()
+    day_filter = {}
+    if since:
+        orders = orders.filter(created_at__date__gte=since)
+        day_filter['day__gte'] = since
+    if until:
+        orders = orders.filter(created_at__date__lte=until)
+        day_filter['day__lte'] = until
+
+    with transaction.atomic():
+        for model in CONFLICT_FIELDS:
+            model.objects.filter(**day_filter).delete()
+
+    processed = 0
+    for count, lines in iter_order_lines(orders, chunk_size):
+        apply_lines(lines)
+        processed += count
+        if progress is not None:
+            progress(processed)
+
+    logger.info("Rebuilt sales rollups from %d orders.", processed)
+    return processed
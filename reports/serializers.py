@@ -0,0 +1,16 @@
+from rest_framework import serializers
+
+
+class SalesFiguresSerializer(serializers.Serializer):
+    units_sold = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    order_count = serializers.IntegerField()
+
+
+class SalesReportRowSerializer(SalesFiguresSerializer):
+    # Only the fields of the requested grouping are present in a row
+    day = serializers.DateField(required=False)
+    product = serializers.IntegerField(required=False)
+    product_name = serializers.CharField(required=False, allow_null=True)
+    category = serializers.IntegerField(required=False)
+    category_name = serializers.CharField(required=False, allow_null=True)
@@ -0,0 +1,33 @@
+from django.db.models.signals import post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from orders.models import Order
+from .rollups import CANCELLED, record_order, unrecord_order
+
+
+@receiver(pre_save, sender=Order)
+def remember_previous_status(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None or (update_fields is not None and 'status' not in update_fields):
+        instance._previous_status = instance.status
+        return
+    previous = Order.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+    instance._previous_status = previous if previous is not None else instance.status
+
+
+@receiver(post_save, sender=Order)
+def apply_status_change(sender, instance, created, **kwargs):
+    # New orders are recorded by checkout once their items exist
+    previous = getattr(instance, '_previous_status', instance.status)
+    if created or previous == instance.status:
+        return
+    if instance.status == CANCELLED:
+        unrecord_order(instance)
+    elif previous == CANCELLED:
+        record_order(instance)
+
+
+@receiver(pre_delete, sender=Order)
+def remove_deleted_order(sender, instance, **kwargs):
+    # Before the delete, while the order's items still exist
+    if instance.status != CANCELLED:
+        unrecord_order(instance)
@@ -0,0 +1,185 @@
+import datetime
+import io
+from decimal import Decimal
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from cart.models import Cart, CartItem
+from orders.models import Order, OrderItem
+from products.models import Product, Category
+from reports.models import CategoryDailySales, ProductDailySales, SellerDailySales
+from reports.rollups import record_order, update_status
+from django.contrib.auth import get_user_model
+User = get_user_model()
+
+
+@pytest.fixture
+def seller(db):
+    return User.objects.create_user(username='seller', password='Sellerpassword123', role='SELLER')
+
+
+@pytest.fixture
+def seller_headers(seller):
+    return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(seller)}'}
+
+
+@pytest.fixture
+def buyer(db):
+    return User.objects.create_user(username='buyer', password='Buyerpassword123')
+
+
+@pytest.fixture
+def buyer_headers(buyer):
+    return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(buyer)}'}
+
+
+@pytest.fixture
+def products(seller):
+    books = Category.objects.create(name='Books')
+    games = Category.objects.create(name='Games')
+    return [
+        Product.objects.create(name='Atlas', price=10, stock=100, category=books, seller=seller),
+        Product.objects.create(name='Bible', price=20, stock=100, category=books, seller=seller),
+        Product.objects.create(name='Chess', price=30, stock=100, category=games, seller=seller),
+    ]
+
+
+def checkout(client, buyer, headers, lines):
+    cart = Cart.objects.get_or_create(user=buyer)[0]
+    for product, quantity in lines:
+        CartItem.objects.create(cart=cart, product=product, quantity=quantity)
+    response = client.post('/api/orders/', **headers)
+    assert response.status_code == status.HTTP_201_CREATED, response.content
+    return Order.objects.get(pk=response.json()['id'])
+
+
+def place_order(buyer, lines, days_ago=0):
+    # An order as it would have been created in the past, without touching the rollups
+    order = Order.objects.create(user=buyer, total_amount=0)
+    Order.objects.filter(pk=order.pk).update(created_at=timezone.now() - datetime.timedelta(days=days_ago))
+    order.refresh_from_db()
+    for product, quantity in lines:
+        OrderItem.objects.create(order=order, product=product, product_name=product.name,
+                                 product_price=product.price, quantity=quantity)
+    return order
+
+
+def rollup_snapshot():
+    return {
+        'seller': sorted(SellerDailySales.objects.values_list('seller_id', 'day', 'units_sold', 'revenue', 'order_count')),
+        'product': sorted(ProductDailySales.objects.values_list('product_id', 'day', 'units_sold', 'revenue', 'order_count')),
+        'category': sorted(CategoryDailySales.objects.values_list('category_id', 'day', 'units_sold', 'revenue', 'order_count')),
+    }
+
+
+def test_checkout_updates_rollups_incrementally(client, seller, buyer, buyer_headers, products):
+    atlas, bible, chess = products
+    checkout(client, buyer, buyer_headers, [(atlas, 2), (bible, 1)])
+    checkout(client, buyer, buyer_headers, [(atlas, 1), (chess, 1)])
+
+    today = timezone.localdate()
+    seller_day = SellerDailySales.objects.get(seller=seller, day=today)
+    assert (seller_day.units_sold, seller_day.revenue, seller_day.order_count) == (5, Decimal('80.00'), 2)
+
+    atlas_day = ProductDailySales.objects.get(product=atlas, day=today)
+    assert (atlas_day.units_sold, atlas_day.revenue, atlas_day.order_count) == (3, Decimal('30.00'), 2)
+
+    books_day = CategoryDailySales.objects.get(category=atlas.category, day=today)
+    # Both orders contain books; the first one two different titles
+    assert (books_day.units_sold, books_day.revenue, books_day.order_count) == (4, Decimal('50.00'), 2)
+
+
+def test_cancelling_and_restoring_an_order(client, seller, buyer, buyer_headers, products):
+    order = checkout(client, buyer, buyer_headers, [(products[0], 2)])
+    today = timezone.localdate()
+
+    order.status = 'Cancelled'
+    order.save()
+    assert SellerDailySales.objects.get(seller=seller, day=today).units_sold == 0
+
+    order.status = 'Processing'
+    order.save()
+    assert SellerDailySales.objects.get(seller=seller, day=today).units_sold == 2
+
+    order.delete()
+    assert SellerDailySales.objects.get(seller=seller, day=today).order_count == 0
+
+
+def test_rebuild_matches_incremental_updates(client, buyer, buyer_headers, products):
+    checkout(client, buyer, buyer_headers, [(products[0], 2), (products[2], 1)])
+    checkout(client, buyer, buyer_headers, [(products[1], 3)])
+    cancelled = checkout(client, buyer, buyer_headers, [(products[1], 1)])
+    cancelled.status = 'Cancelled'
+    cancelled.save()
+    incremental = rollup_snapshot()
+
+    call_command('rebuild_sales_rollups', chunk_size=1, stdout=io.StringIO())
+    assert rollup_snapshot() == incremental
+
+
+def test_rebuild_range_only_touches_those_days(buyer, products):
+    place_order(buyer, [(products[0], 1)], days_ago=10)
+    place_order(buyer, [(products[0], 4)], days_ago=1)
+    call_command('rebuild_sales_rollups', stdout=io.StringIO())
+
+    yesterday = timezone.localdate() - datetime.timedelta(days=1)
+    # Drift the rollup for yesterday, then rebuild only that day
+    ProductDailySales.objects.filter(day=yesterday).update(units_sold=99)
+    call_command('rebuild_sales_rollups', since=str(yesterday), stdout=io.StringIO())
+
+    units = dict(ProductDailySales.objects.values_list('day', 'units_sold'))
+    assert units == {yesterday - datetime.timedelta(days=9): 1, yesterday: 4}
+
+
+@pytest.mark.parametrize('options, message', [
+    ({'since': '2026-13-01'}, '--since must be a date'),
+    ({'until': 'yesterday'}, '--until must be a date'),
+    ({'since': '2026-10-18', 'until': '2026-10-17'}, 'is after --until'),
+])
+def test_rebuild_rejects_invalid_ranges(db, options, message):
+    with pytest.raises(CommandError, match=message):
+        call_command('rebuild_sales_rollups', stdout=io.StringIO(), **options)
+
+
+def test_bulk_status_updates_keep_rollups_current(client, buyer, buyer_headers, products):
+    checkout(client, buyer, buyer_headers, [(products[0], 2)])
+    checkout(client, buyer, buyer_headers, [(products[1], 1), (products[2], 1)])
+    expected = rollup_snapshot()
+
+    assert update_status(Order.objects.all(), 'Cancelled') == 2
+    assert all(row[2:] == (0, Decimal('0.00'), 0) for row in rollup_snapshot()['seller'])
+
+    assert update_status(Order.objects.all(), 'Processing') == 2
+    assert rollup_snapshot() == expected
+    assert set(Order.objects.values_list('status', flat=True)) == {'Processing'}
+
+
+def test_sales_report_by_day_product_and_category(client, buyer, seller_headers, products):
+    atlas, bible, chess = products
+    for order in [place_order(buyer, [(atlas, 1), (chess, 2)], days_ago=2), place_order(buyer, [(bible, 1)])]:
+        record_order(order)
+
+    by_day = client.get('/api/reports/sales/', **seller_headers).json()
+    assert by_day['totals'] == {'units_sold': 4, 'revenue': '90.00', 'order_count': 2}
+    assert [row['units_sold'] for row in by_day['results']] == [3, 1]
+
+    by_product = client.get('/api/reports/sales/?by=product', **seller_headers).json()
+    assert [(row['product_name'], row['revenue']) for row in by_product['results']] == [
+        ('Chess', '60.00'), ('Bible', '20.00'), ('Atlas', '10.00'),
+    ]
+
+    by_category = client.get('/api/reports/sales/?by=category', **seller_headers).json()
+    assert [(row['category_name'], row['units_sold']) for row in by_category['results']] == [('Games', 2), ('Books', 2)]
+
+    today = timezone.localdate()
+    only_today = client.get(f'/api/reports/sales/?start={today}&end={today}', **seller_headers).json()
+    assert only_today['totals']['units_sold'] == 1
+
+
+def test_sales_report_validates_parameters(client, seller_headers):
+    assert client.get('/api/reports/sales/?start=yesterday', **seller_headers).status_code == status.HTTP_400_BAD_REQUEST
+    assert client.get('/api/reports/sales/?by=month', **seller_headers).status_code == status.HTTP_400_BAD_REQUEST
+    assert client.get('/api/reports/sales/?start=2024-02-01&end=2024-01-01', **seller_headers).status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,79 @@
+import datetime
+
+from django.db.models import Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from accounts.permissions import IsSeller
+from products.models import Category, Product
+from .models import CategoryDailySales, ProductDailySales, SellerDailySales
+from .serializers import SalesFiguresSerializer, SalesReportRowSerializer
+
+FIGURES = {'units_sold': Sum('units_sold'), 'revenue': Sum('revenue'), 'order_count': Sum('order_count')}
+
+
+class SalesReportView(APIView):
+    """
+    The seller's sales between ?start= and ?end= (YYYY-MM-DD, inclusive; the
+    last 30 days by default), grouped ?by=day, product or category.
+    Reads the daily rollups, so the cost depends on the number of days and
+    keys in the range rather than on the number of order lines.
+    """
+    permission_classes = [IsAuthenticated, IsSeller]
+    default_days = 30
+    groupings = ('day', 'product', 'category')
+
+    def get_date(self, name, default):
+        value = self.request.query_params.get(name)
+        if not value:
+            return default
+        parsed = parse_date(value) if len(value) == 10 else None
+        if parsed is None:
+            raise ValidationError({name: 'Enter a date in YYYY-MM-DD format.'})
+        return parsed
+
+    def get(self, request, *args, **kwargs):
+        end = self.get_date('end', timezone.localdate())
+        start = self.get_date('start', end - datetime.timedelta(days=self.default_days - 1))
+        if start > end:
+            raise ValidationError({'start': 'start must not be after end.'})
+        group = request.query_params.get('by', 'day')
+        if group not in self.groupings:
+            raise ValidationError({'by': f'Choose one of: {", ".join(self.groupings)}.'})
+
+        seller_days = SellerDailySales.objects.filter(seller=request.user, day__range=(start, end))
+        totals = seller_days.aggregate(**FIGURES)
+        totals = {name: value or 0 for name, value in totals.items()}
+
+        if group == 'day':
+            rows = list(seller_days.order_by('day').values('day', 'units_sold', 'revenue', 'order_count'))
+        elif group == 'product':
+            rows = self.group_by(ProductDailySales, 'product', Product, start, end)
+        else:
+            rows = self.group_by(CategoryDailySales, 'category', Category, start, end)
+
+        return Response({
+            'start': start,
+            'end': end,
+            'by': group,
+            'totals': SalesFiguresSerializer(totals).data,
+            'results': SalesReportRowSerializer(rows, many=True).data,
+        })
+
+    def group_by(self, rollup, key, model, start, end):
+        rows = list(
+            rollup.objects.filter(seller=self.request.user, day__range=(start, end))
+            .values(key)
+            .annotate(**FIGURES)
+            .order_by('-revenue', key)
+        )
+        # Names come from the live table; deleted products/categories show null
+        names = model.objects.in_bulk([row[key] for row in rows])
+        for row in rows:
+            obj = names.get(row[key])
+            row[f'{key}_name'] = obj.name if obj else None
+        return rows